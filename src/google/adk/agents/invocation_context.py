@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+from typing import Any
 from typing import Optional
 import uuid
 
@@ -23,8 +24,13 @@ from pydantic import ConfigDict
 
 from ..artifacts.base_artifact_service import BaseArtifactService
 from ..memory.base_memory_service import BaseMemoryService
+from ..memory.base_memory_service import SearchMemoryResponse
+from ..memory.cached_memory_service import record_avoided_search
+from ..models.llm_request import LlmRequest
+from ..models.token_estimator import estimate_request_tokens
 from ..sessions.base_session_service import BaseSessionService
 from ..sessions.session import Session
+from ..tools.tool_executor import ToolExecutor
 from .active_streaming_tool import ActiveStreamingTool
 from .base_agent import BaseAgent
 from .live_request_queue import LiveRequestQueue
@@ -36,6 +42,10 @@ class LlmCallsLimitExceededError(Exception):
   """Error thrown when the number of LLM calls exceed the limit."""
 
 
+class TokenLimitExceededError(Exception):
+  """Error thrown when the number of tokens exceed the limit."""
+
+
 class _InvocationCostManager(BaseModel):
   """A container to keep track of the cost of invocation.
 
@@ -47,6 +57,19 @@ class _InvocationCostManager(BaseModel):
   _number_of_llm_calls: int = 0
   """A counter that keeps track of number of llm calls made."""
 
+  _prompt_token_count: int = 0
+  """The number of request tokens of the llm calls made."""
+
+  _candidates_token_count: int = 0
+  """The number of response tokens of the llm calls made."""
+
+  _total_token_count: int = 0
+  """The number of tokens of the llm calls made."""
+
+  _previous_session_token_count: Optional[int] = None
+  """The number of tokens of the previous invocations of the session, counted
+  when a session limit is first enforced."""
+
   def increment_and_enforce_llm_calls_limit(
       self, run_config: Optional[RunConfig]
   ):
@@ -65,6 +88,63 @@ class _InvocationCostManager(BaseModel):
           f" `{run_config.max_llm_calls}` exceeded"
       )
 
+  def enforce_token_limits(
+      self,
+      run_config: Optional[RunConfig],
+      session: Session,
+      invocation_id: str,
+      llm_request: LlmRequest,
+  ):
+    """Enforces the token limits before making an llm call."""
+    if not run_config or (
+        run_config.max_invocation_tokens <= 0
+        and run_config.max_session_tokens <= 0
+    ):
+      return
+    tokens = self._total_token_count + estimate_request_tokens(llm_request)
+    if (
+        run_config.max_invocation_tokens > 0
+        and tokens > run_config.max_invocation_tokens
+    ):
+      raise TokenLimitExceededError(
+          "Max number of invocation tokens limit of"
+          f" `{run_config.max_invocation_tokens}` exceeded: {tokens} tokens"
+          " including the next llm call"
+      )
+    if run_config.max_session_tokens <= 0:
+      return
+    if self._previous_session_token_count is None:
+      self._previous_session_token_count = sum(
+          _get_total_token_count(event.usage_metadata)
+          for event in session.events
+          if event.usage_metadata and event.invocation_id != invocation_id
+      )
+    tokens += self._previous_session_token_count
+    if tokens > run_config.max_session_tokens:
+      raise TokenLimitExceededError(
+          "Max number of session tokens limit of"
+          f" `{run_config.max_session_tokens}` exceeded: {tokens} tokens"
+          " including the next llm call"
+      )
+
+  def record_token_usage(
+      self, usage_metadata: types.GenerateContentResponseUsageMetadata
+  ):
+    """Adds the token usage of an llm call."""
+    self._prompt_token_count += usage_metadata.prompt_token_count or 0
+    self._candidates_token_count += usage_metadata.candidates_token_count or 0
+    self._total_token_count += _get_total_token_count(usage_metadata)
+
+
+def _get_total_token_count(
+    usage_metadata: types.GenerateContentResponseUsageMetadata,
+) -> int:
+  if usage_metadata.total_token_count is not None:
+    return usage_metadata.total_token_count
+  return (usage_metadata.prompt_token_count or 0) + (
+      usage_metadata.candidates_token_count or 0
+  )
+
 
 class InvocationContext(BaseModel):
   """An invocation context represents the data of a single invocation of an agent.
@@ -150,11 +230,24 @@ class InvocationContext(BaseModel):
   run_config: Optional[RunConfig] = None
   """Configurations for live agents under this invocation."""
 
+  tool_executor: Optional[ToolExecutor] = None
+  """The executor to run blocking tool calls off the event loop. If not set,
+  sync tools run on the event loop."""
+
   _invocation_cost_manager: _InvocationCostManager = _InvocationCostManager()
   """A container to keep track of different kinds of costs incurred as a part
   of this invocation.
   """
 
+  _contents_caches: dict[tuple[str, Optional[str]], Any] = {}
+  """The incrementally built LLM request contents of this invocation, keyed by
+  agent name and branch. Owned by the contents request processor.
+  """
+
+  _memory_searches: dict[tuple[str, str, str], SearchMemoryResponse] = {}
+  """The memory searches of this invocation, keyed by app name, user id and
+  query."""
+
   def increment_llm_call_count(
       self,
   ):
@@ -168,6 +261,62 @@ class InvocationContext(BaseModel):
         self.run_config
     )
 
+  def enforce_token_limits(self, llm_request: LlmRequest):
+    """Checks that an llm call fits in the token limits.
+
+    Args:
+      llm_request: The request of the llm call.
+
+    Raises:
+      TokenLimitExceededError: If the tokens used so far plus the request
+        tokens exceed the limit of the invocation or of the session.
+    """
+    self._invocation_cost_manager.enforce_token_limits(
+        self.run_config,
+        self.session,
+        self.invocation_id,
+        llm_request,
+    )
+
+  def record_token_usage(
+      self, usage_metadata: types.GenerateContentResponseUsageMetadata
+  ):
+    """Tracks the number of tokens of an llm call."""
+    self._invocation_cost_manager.record_token_usage(usage_metadata)
+
+  @property
+  def token_usage(self) -> types.GenerateContentResponseUsageMetadata:
+    """The number of tokens of the llm calls made in this invocation."""
+    cost_manager = self._invocation_cost_manager
+    return types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=cost_manager._prompt_token_count,
+        candidates_token_count=cost_manager._candidates_token_count,
+        total_token_count=cost_manager._total_token_count,
+    )
+
+  def search_memory(self, query: str) -> SearchMemoryResponse:
+    """Searches the memory of the current user.
+
+    The user content doesn't change during an invocation, so each query is
+    only searched once per invocation, e.g. by the `PreloadMemoryTool` at each
+    llm call.
+
+    Raises:
+      ValueError: If the memory service is not available.
+    """
+    if self.memory_service is None:
+      raise ValueError("Memory service is not available.")
+    key = (self.app_name, self.user_id, query)
+    response = self._memory_searches.get(key)
+    if response is not None:
+      record_avoided_search(self.app_name, "invocation")
+      return response
+    response = self.memory_service.search_memory(
+        app_name=self.app_name, user_id=self.user_id, query=query
+    )
+    self._memory_searches[key] = response
+    return response
+
   @property
   def app_name(self) -> str:
     return self.session.app_name
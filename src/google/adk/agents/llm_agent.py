@@ -31,6 +31,7 @@ from typing_extensions import override
 from typing_extensions import TypeAlias
 
 from ..code_executors.base_code_executor import BaseCodeExecutor
+from ..compaction.base_history_compactor import BaseHistoryCompactor
 from ..events.event import Event
 from ..examples.base_example_provider import BaseExampleProvider
 from ..examples.example import Example
@@ -45,6 +46,8 @@ from ..planners.base_planner import BasePlanner
 from ..tools.base_tool import BaseTool
 from ..tools.function_tool import FunctionTool
 from ..tools.tool_context import ToolContext
+from ..tools.tool_manifest import ToolManifest
+from ..tools.tool_selector import BaseToolSelector
 from .base_agent import BaseAgent
 from .callback_context import CallbackContext
 from .invocation_context import InvocationContext
@@ -108,6 +111,12 @@ class LlmAgent(BaseAgent):
 
   tools: list[ToolUnion] = Field(default_factory=list)
   """Tools available to this agent."""
+  tool_selector: Optional[BaseToolSelector] = None
+  """Selects the tools relevant to each model call, for agents with many
+  tools, e.g. from an OpenAPIToolset.
+
+  If not set, all the tools are declared to the model on every call.
+  """
 
   generate_content_config: Optional[types.GenerateContentConfig] = None
   """The additional content generation configurations.
@@ -169,6 +178,14 @@ class LlmAgent(BaseAgent):
   NOTE: to use model's built-in code executor, don't set this field, add
   `google.adk.tools.built_in_code_execution` to tools instead.
   """
+
+  history_compactor: Optional[BaseHistoryCompactor] = None
+  """Bounds the conversation history sent to the model on each call.
+
+  Check out available history compactors in `google.adk.compaction` package.
+
+  NOTE: only applies when include_contents is 'default'.
+  """
   # Advance features - End
 
   # TODO: remove below fields after migration. - Start
@@ -225,6 +242,9 @@ class LlmAgent(BaseAgent):
   """
   # Callbacks - End
 
+  _tool_manifest: Optional[ToolManifest] = None
+  """The manifest of the tools, built from `tools` on first use."""
+
   @override
   async def _run_async_impl(
       self, ctx: InvocationContext
@@ -252,7 +272,7 @@ class LlmAgent(BaseAgent):
     if isinstance(self.model, BaseLlm):
       return self.model
     elif self.model:  # model is non-empty str
-      return LLMRegistry.new_llm(self.model)
+      return LLMRegistry.get_llm(self.model)
     else:  # find model from ancestors.
       ancestor_agent = self.parent_agent
       while ancestor_agent is not None:
@@ -287,7 +307,20 @@ class LlmAgent(BaseAgent):
 
     This method is only for use by Agent Development Kit.
     """
-    return [_convert_tool_union_to_tool(tool) for tool in self.tools]
+    return list(self._get_tool_manifest().tools)
+
+  def _get_tool_manifest(self) -> ToolManifest:
+    """Returns the manifest of the tools, rebuilt when self.tools changes.
+
+    This method is only for use by Agent Development Kit.
+    """
+    if not self._tool_manifest or not self._tool_manifest.is_built_from(
+        self.tools
+    ):
+      self._tool_manifest = ToolManifest(
+          self.tools, [_convert_tool_union_to_tool(tool) for tool in self.tools]
+      )
+    return self._tool_manifest
 
   @property
   def _llm_flow(self) -> BaseLlmFlow:
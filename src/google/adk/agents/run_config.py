@@ -31,6 +31,21 @@ class StreamingMode(Enum):
   BIDI = 'bidi'
 
 
+class EventWriteMode(Enum):
+  """How the runner persists the events of an invocation."""
+
+  SYNC = 'sync'
+  """Each event is persisted before it is yielded."""
+  WRITE_BEHIND = 'write_behind'
+  """Events are yielded right away and persisted in batches.
+
+  A batch is persisted with a single group commit when it reaches
+  `max_buffered_events`, when its oldest event is older than
+  `max_event_buffer_delay`, or when the invocation ends. Buffered events are
+  lost if the process dies before they are flushed.
+  """
+
+
 class RunConfig(BaseModel):
   """Configs for runtime behavior of agents."""
 
@@ -64,6 +79,32 @@ class RunConfig(BaseModel):
   output_audio_transcription: Optional[types.AudioTranscriptionConfig] = None
   """Output transcription for live agents with audio response."""
 
+  event_write_mode: EventWriteMode = EventWriteMode.SYNC
+  """How the runner persists events, EventWriteMode.SYNC or
+  EventWriteMode.WRITE_BEHIND."""
+
+  max_buffered_events: int = 20
+  """The max number of events to buffer before persisting them. Only applicable
+  for EventWriteMode.WRITE_BEHIND."""
+
+  max_event_buffer_delay: float = 1.0
+  """The max number of seconds an event stays buffered before the buffer is
+  persisted, even if the agent is idle, e.g. waiting for a slow tool or model
+  call. Only applicable for EventWriteMode.WRITE_BEHIND."""
+
+  max_concurrent_tool_calls: int = 10
+  """The max number of function calls from one model response that run
+  concurrently. Set it to 1 to run the function calls one at a time."""
+
+  tool_call_timeout: Optional[float] = None
+  """The max number of seconds to wait for each tool call. A tool call that
+  times out gets an error response. If not set, tool calls never time out."""
+
+  max_llm_call_wait: Optional[float] = None
+  """The max number of seconds an llm call waits in the rate limiter of the
+  model, including the delays before retries. Only applicable if the model
+  has a rate_limiter. If not set, calls wait as long as needed."""
+
   max_llm_calls: int = 500
   """
   A limit on the total number of llm calls for a given run.
@@ -74,6 +115,33 @@ class RunConfig(BaseModel):
     - Less than or equal to 0: This allows for unbounded number of llm calls.
   """
 
+  max_invocation_tokens: int = 0
+  """
+  A limit on the total number of tokens of the llm calls of a run, counting
+  both the requests and the responses.
+
+  A call is rejected before it is sent if its estimated request tokens would
+  exceed the limit. The tokens of the responses are taken from their usage
+  metadata, or estimated if the model doesn't report it.
+
+  Valid Values:
+    - More than 0: The bound on the number of tokens is enforced.
+    - Less than or equal to 0: This allows for unbounded number of tokens.
+  """
+
+  max_session_tokens: int = 0
+  """
+  A limit on the total number of tokens of the llm calls of a session, across
+  all of its runs. The tokens of the previous runs are taken from the usage
+  metadata of the events of the session. VertexAiSessionService doesn't store
+  the usage metadata of events, so only the tokens of the current run count
+  with it.
+
+  Valid Values:
+    - More than 0: The bound on the number of tokens is enforced.
+    - Less than or equal to 0: This allows for unbounded number of tokens.
+  """
+
   @field_validator('max_llm_calls', mode='after')
   @classmethod
   def validate_max_llm_calls(cls, value: int) -> int:
@@ -89,3 +157,17 @@ class RunConfig(BaseModel):
       )
 
     return value
+
+  @field_validator('max_buffered_events', mode='after')
+  @classmethod
+  def validate_max_buffered_events(cls, value: int) -> int:
+    if value <= 0:
+      raise ValueError('max_buffered_events should be greater than 0.')
+    return value
+
+  @field_validator('max_concurrent_tool_calls', mode='after')
+  @classmethod
+  def validate_max_concurrent_tool_calls(cls, value: int) -> int:
+    if value <= 0:
+      raise ValueError('max_concurrent_tool_calls should be greater than 0.')
+    return value
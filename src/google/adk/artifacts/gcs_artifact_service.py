@@ -17,6 +17,7 @@
 import logging
 from typing import Optional
 
+from google.api_core import exceptions
 from google.cloud import storage
 from google.genai import types
 from typing_extensions import override
@@ -25,9 +26,28 @@ from .base_artifact_service import BaseArtifactService
 
 logger = logging.getLogger(__name__)
 
+# The prefix of the version indexes, outside of the artifact blobs.
+_VERSION_INDEX_PREFIX = ".adk/version_index"
+# The metadata key of the latest version of an artifact in its index.
+_LATEST_VERSION_KEY = "latest_version"
+# The max number of attempts to save an artifact concurrently saved by others.
+_MAX_SAVE_ATTEMPTS = 10
+# The max number of requests in a GCS batch request.
+_MAX_BATCH_SIZE = 100
+
 
 class GcsArtifactService(BaseArtifactService):
-  """An artifact service implementation using Google Cloud Storage (GCS)."""
+  """An artifact service implementation using Google Cloud Storage (GCS).
+
+  The latest version of each artifact is kept in the metadata of an empty
+  index object, so saving or loading the latest version doesn't list the
+  versions of the artifact. Versions are created with conditional writes, so
+  concurrent saves of an artifact never overwrite each other, and the index
+  only moves forward.
+
+  The service can be tested against a local GCS emulator by setting the
+  `STORAGE_EMULATOR_HOST` environment variable.
+  """
 
   def __init__(self, bucket_name: str, **kwargs):
     """Initializes the GcsArtifactService.
@@ -39,6 +59,9 @@ class GcsArtifactService(BaseArtifactService):
     self.bucket_name = bucket_name
     self.storage_client = storage.Client(**kwargs)
     self.bucket = self.storage_client.bucket(self.bucket_name)
+    # The latest version of the artifacts saved or loaded by this service and
+    # the generation of their index, keyed by artifact prefix.
+    self._known_versions: dict[str, tuple[int, int]] = {}
 
   def _file_has_user_namespace(self, filename: str) -> bool:
     """Checks if the filename has a user namespace.
@@ -86,26 +109,37 @@ class GcsArtifactService(BaseArtifactService):
       filename: str,
       artifact: types.Part,
   ) -> int:
-    versions = self.list_versions(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        filename=filename,
-    )
-    version = 0 if not versions else max(versions) + 1
-
-    blob_name = self._get_blob_name(
-        app_name, user_id, session_id, filename, version
-    )
-    blob = self.bucket.blob(blob_name)
+    prefix = self._get_blob_name(app_name, user_id, session_id, filename, "")
+    known_version = self._known_versions.get(prefix)
+    if known_version is None:
+      known_version = self._get_latest_version(
+          app_name, user_id, session_id, filename
+      )
+    latest_version, index_generation = known_version
+    version = latest_version + 1
 
-    blob.upload_from_string(
-        data=artifact.inline_data.data,
-        content_type=artifact.inline_data.mime_type,
+    for _ in range(_MAX_SAVE_ATTEMPTS):
+      blob = self.bucket.blob(prefix + str(version))
+      try:
+        # Fails if the version was created by a concurrent save.
+        blob.upload_from_string(
+            data=artifact.inline_data.data,
+            content_type=artifact.inline_data.mime_type,
+            if_generation_match=0,
+        )
+      except exceptions.PreconditionFailed:
+        latest_version, index_generation = self._get_latest_version(
+            app_name, user_id, session_id, filename
+        )
+        version = max(version, latest_version) + 1
+        continue
+      self._update_index(prefix, version, index_generation)
+      return version
+    raise RuntimeError(
+        f"Failed to save artifact {filename} after {_MAX_SAVE_ATTEMPTS}"
+        " attempts, because of concurrent saves."
     )
 
-    return version
-
   @override
   def load_artifact(
       self,
@@ -117,15 +151,11 @@ class GcsArtifactService(BaseArtifactService):
       version: Optional[int] = None,
   ) -> Optional[types.Part]:
     if version is None:
-      versions = self.list_versions(
-          app_name=app_name,
-          user_id=user_id,
-          session_id=session_id,
-          filename=filename,
+      version, _ = self._get_latest_version(
+          app_name, user_id, session_id, filename
       )
-      if not versions:
+      if version < 0:
         return None
-      version = max(versions)
 
     blob_name = self._get_blob_name(
         app_name, user_id, session_id, filename, version
@@ -174,12 +204,18 @@ class GcsArtifactService(BaseArtifactService):
         session_id=session_id,
         filename=filename,
     )
-    for version in versions:
-      blob_name = self._get_blob_name(
-          app_name, user_id, session_id, filename, version
-      )
-      blob = self.bucket.blob(blob_name)
-      blob.delete()
+    prefix = self._get_blob_name(app_name, user_id, session_id, filename, "")
+    for start in range(0, len(versions), _MAX_BATCH_SIZE):
+      with self.storage_client.batch(raise_exception=False):
+        for version in versions[start : start + _MAX_BATCH_SIZE]:
+          self.bucket.blob(prefix + str(version)).delete()
+    # The index is deleted last, so an interrupted delete is completed by
+    # deleting the artifact again.
+    self._known_versions.pop(prefix, None)
+    try:
+      self.bucket.blob(self._get_index_name(prefix)).delete()
+    except exceptions.NotFound:
+      pass
     return
 
   @override
@@ -193,3 +229,64 @@ class GcsArtifactService(BaseArtifactService):
       _, _, _, _, version = blob.name.split("/")
       versions.append(int(version))
     return versions
+
+  def _get_index_name(self, prefix: str) -> str:
+    """Returns the name of the version index of the artifact with the prefix."""
+    return f"{_VERSION_INDEX_PREFIX}/{prefix}"
+
+  def _get_latest_version(
+      self, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> tuple[int, int]:
+    """Returns the latest version of an artifact and the generation of its
+    index.
+
+    The version is -1 if the artifact doesn't exist, and the generation is 0
+    if the index doesn't exist.
+    """
+    prefix = self._get_blob_name(app_name, user_id, session_id, filename, "")
+    index = self.bucket.get_blob(self._get_index_name(prefix))
+    if index is not None and index.metadata:
+      known_version = (
+          int(index.metadata[_LATEST_VERSION_KEY]),
+          index.generation,
+      )
+      self._known_versions[prefix] = known_version
+      return known_version
+    # The artifact was saved without an index.
+    versions = self.list_versions(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    return max(versions, default=-1), index.generation if index else 0
+
+  def _update_index(
+      self, prefix: str, version: int, index_generation: int
+  ) -> None:
+    """Sets the latest version in the index, unless a later version was set
+    by a concurrent save."""
+    index_name = self._get_index_name(prefix)
+    for _ in range(_MAX_SAVE_ATTEMPTS):
+      index = self.bucket.blob(index_name)
+      index.metadata = {_LATEST_VERSION_KEY: str(version)}
+      try:
+        index.upload_from_string(data=b"", if_generation_match=index_generation)
+      except exceptions.PreconditionFailed:
+        index = self.bucket.get_blob(index_name)
+        if index is None:
+          index_generation = 0
+          continue
+        latest_version = int(
+            (index.metadata or {}).get(_LATEST_VERSION_KEY, -1)
+        )
+        if latest_version >= version:
+          self._known_versions[prefix] = (latest_version, index.generation)
+          return
+        index_generation = index.generation
+        continue
+      self._known_versions[prefix] = (version, index.generation)
+      return
+    # The index lags behind until the next save of the artifact.
+    self._known_versions.pop(prefix, None)
+    logger.warning("Failed to update the version index of %s.", prefix)
@@ -572,7 +572,7 @@ def get_fast_api_app(
   async def agent_run(req: AgentRunRequest) -> list[Event]:
     # Connect to managed session if agent_engine_id is set.
     app_id = agent_engine_id if agent_engine_id else req.app_name
-    session = session_service.get_session(
+    session = await session_service.get_session_async(
         app_name=app_id, user_id=req.user_id, session_id=req.session_id
     )
     if not session:
@@ -594,7 +594,7 @@ def get_fast_api_app(
     # Connect to managed session if agent_engine_id is set.
     app_id = agent_engine_id if agent_engine_id else req.app_name
     # SSE endpoint
-    session = session_service.get_session(
+    session = await session_service.get_session_async(
         app_name=app_id, user_id=req.user_id, session_id=req.session_id
     )
     if not session:
@@ -692,7 +692,7 @@ def get_fast_api_app(
 
     # Connect to managed session if agent_engine_id is set.
     app_id = agent_engine_id if agent_engine_id else app_name
-    session = session_service.get_session(
+    session = await session_service.get_session_async(
         app_name=app_id, user_id=user_id, session_id=session_id
     )
     if not session:
@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+import abc
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from google.genai import types
+from pydantic import BaseModel
+
+from ..models.token_estimator import estimate_content_tokens
+
+if TYPE_CHECKING:
+  from ..agents.readonly_context import ReadonlyContext
+
+
+class HistoryCompaction(BaseModel):
+  """How to compact the contents of an LLM request."""
+
+  num_contents: int
+  """The number of leading contents to remove."""
+
+  summary: Optional[types.Content] = None
+  """The content to send instead of the removed contents.
+
+  A summary is stored in the session as an event, so the following requests
+  reuse it instead of compacting the same contents again.
+  """
+
+
+class BaseHistoryCompactor(abc.ABC):
+  """Abstract base class for all history compactors.
+
+  A history compactor bounds the conversation history that an agent sends to
+  the model, which otherwise grows with each turn until it exceeds the model's
+  context window.
+  """
+
+  @abc.abstractmethod
+  async def compact(
+      self,
+      readonly_context: ReadonlyContext,
+      contents: list[types.Content],
+  ) -> Optional[HistoryCompaction]:
+    """Decides how to compact the contents of an LLM request.
+
+    Args:
+      readonly_context: The readonly context of the invocation.
+      contents: The contents of the LLM request, oldest first. Readonly.
+
+    Returns:
+      The compaction to apply, or None to send all the contents.
+    """
+
+
+def _find_cut(contents: list[types.Content], start: int) -> int:
+  """Returns the first index at or after start where the history can be cut.
+
+  A cut never separates function responses from their function calls, and
+  always keeps the last content.
+  """
+  if not contents:
+    return 0
+  cut = min(start, len(contents) - 1)
+  while cut < len(contents) - 1 and _has_function_response(contents[cut]):
+    cut += 1
+  if cut > 0 and _has_function_response(contents[cut]):
+    # Keeps the function call of the last content.
+    cut -= 1
+  return max(cut, 0)
+
+
+def _get_window_start(
+    contents: list[types.Content], start: int, max_tokens: int
+) -> int:
+  """Returns the first index of the longest suffix within max_tokens."""
+  tokens = 0
+  for i in range(len(contents) - 1, start - 1, -1):
+    tokens += estimate_content_tokens(contents[i])
+    if tokens > max_tokens:
+      return min(i + 1, len(contents) - 1)
+  return start
+
+
+def _has_function_response(content: types.Content) -> bool:
+  return any(part.function_response for part in content.parts or [])
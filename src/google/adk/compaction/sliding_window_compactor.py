@@ -0,0 +1,75 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from google.genai import types
+from typing_extensions import override
+
+from .base_history_compactor import _find_cut
+from .base_history_compactor import _get_window_start
+from .base_history_compactor import BaseHistoryCompactor
+from .base_history_compactor import HistoryCompaction
+
+if TYPE_CHECKING:
+  from ..agents.readonly_context import ReadonlyContext
+
+
+class SlidingWindowCompactor(BaseHistoryCompactor):
+  """Sends only the most recent contents to the model.
+
+  The window is bounded by a number of contents, an estimated number of
+  tokens, or both. The oldest contents are dropped without a summary. Function
+  calls and their responses are dropped or kept together.
+  """
+
+  def __init__(
+      self,
+      *,
+      max_contents: Optional[int] = None,
+      max_tokens: Optional[int] = None,
+  ):
+    """Initializes the SlidingWindowCompactor.
+
+    Args:
+      max_contents: The max number of contents to send.
+      max_tokens: The max estimated number of tokens of the contents to send.
+        The last content is always sent, even if it is larger.
+    """
+    if max_contents is None and max_tokens is None:
+      raise ValueError('Either max_contents or max_tokens should be set.')
+    if max_contents is not None and max_contents <= 0:
+      raise ValueError('max_contents should be greater than 0.')
+    if max_tokens is not None and max_tokens <= 0:
+      raise ValueError('max_tokens should be greater than 0.')
+    self.max_contents = max_contents
+    self.max_tokens = max_tokens
+
+  @override
+  async def compact(
+      self,
+      readonly_context: ReadonlyContext,
+      contents: list[types.Content],
+  ) -> Optional[HistoryCompaction]:
+    start = 0
+    if self.max_contents is not None:
+      start = max(len(contents) - self.max_contents, 0)
+    if self.max_tokens is not None:
+      start = _get_window_start(contents, start, self.max_tokens)
+    cut = _find_cut(contents, start)
+    return HistoryCompaction(num_contents=cut) if cut else None
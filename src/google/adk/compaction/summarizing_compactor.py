@@ -0,0 +1,181 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import Union
+
+from google.genai import types
+from typing_extensions import override
+
+from ..models.base_llm import BaseLlm
+from ..models.llm_request import LlmRequest
+from ..models.registry import LLMRegistry
+from ..models.token_estimator import estimate_content_tokens
+from .base_history_compactor import _find_cut
+from .base_history_compactor import _get_window_start
+from .base_history_compactor import BaseHistoryCompactor
+from .base_history_compactor import HistoryCompaction
+
+if TYPE_CHECKING:
+  from ..agents.readonly_context import ReadonlyContext
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INSTRUCTION = """\
+Summarize the following conversation between a user and an AI agent. Keep \
+the facts, decisions, open questions and tool results that may be needed to \
+continue the conversation, and leave out the rest. Reply with the summary \
+only."""
+
+_SUMMARY_PREFIX = 'Summary of the earlier conversation:\n'
+
+
+class SummarizingCompactor(BaseHistoryCompactor):
+  """Replaces the oldest contents with a summary written by a model.
+
+  Once the estimated size of the contents exceeds `max_tokens`, the oldest
+  contents are summarized so that the rest fits in `target_tokens`. The summary
+  is stored in the session, so the following requests reuse it, and it is only
+  rewritten, together with the contents that followed it, when the contents
+  exceed `max_tokens` again.
+
+  The model is called through its rate_limiter, if any. If the model fails to
+  summarize, all the contents are sent.
+  """
+
+  def __init__(
+      self,
+      *,
+      model: Union[str, BaseLlm],
+      max_tokens: int,
+      target_tokens: Optional[int] = None,
+      instruction: str = _DEFAULT_INSTRUCTION,
+  ):
+    """Initializes the SummarizingCompactor.
+
+    Args:
+      model: The model to summarize with, usually a fast and cheap one.
+      max_tokens: The max estimated number of tokens of the contents to send
+        without compaction.
+      target_tokens: The max estimated number of tokens of the contents to keep
+        after the summary. Defaults to half of max_tokens, so that the history
+        is not summarized again on each turn.
+      instruction: The instruction for the summary.
+    """
+    if max_tokens <= 0:
+      raise ValueError('max_tokens should be greater than 0.')
+    if target_tokens is None:
+      target_tokens = max_tokens // 2
+    if not 0 < target_tokens <= max_tokens:
+      raise ValueError(
+          'target_tokens should be greater than 0 and at most max_tokens.'
+      )
+    self.model = model
+    self.max_tokens = max_tokens
+    self.target_tokens = target_tokens
+    self.instruction = instruction
+    self._llm = (
+        model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model)
+    )
+
+  @override
+  async def compact(
+      self,
+      readonly_context: ReadonlyContext,
+      contents: list[types.Content],
+  ) -> Optional[HistoryCompaction]:
+    tokens = sum(estimate_content_tokens(content) for content in contents)
+    if tokens <= self.max_tokens:
+      return None
+    cut = _find_cut(
+        contents, _get_window_start(contents, 0, self.target_tokens)
+    )
+    if not cut:
+      return None
+    try:
+      summary = await self._summarize(contents[:cut])
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      logger.warning('Failed to summarize the conversation history: %s', e)
+      return None
+    if not summary:
+      return None
+    return HistoryCompaction(
+        num_contents=cut,
+        summary=types.Content(
+            role='user', parts=[types.Part(text=_SUMMARY_PREFIX + summary)]
+        ),
+    )
+
+  async def _summarize(self, contents: list[types.Content]) -> str:
+    llm_request = LlmRequest(
+        model=self._llm.model,
+        contents=[
+            types.Content(
+                role='user',
+                parts=[types.Part(text=_to_transcript(contents))],
+            )
+        ],
+        config=types.GenerateContentConfig(system_instruction=self.instruction),
+    )
+    if self._llm.rate_limiter:
+      llm_responses = self._llm.rate_limiter.generate_content_async(
+          self._llm, llm_request
+      )
+    else:
+      llm_responses = self._llm.generate_content_async(llm_request)
+    texts = []
+    async for llm_response in llm_responses:
+      if llm_response.error_code:
+        raise ValueError(
+            f'{llm_response.error_code}: {llm_response.error_message}'
+        )
+      if llm_response.content and llm_response.content.parts:
+        texts.extend(
+            part.text
+            for part in llm_response.content.parts
+            if part.text and not part.thought
+        )
+    return ''.join(texts).strip()
+
+
+def _to_transcript(contents: list[types.Content]) -> str:
+  """Renders the contents as text for the summarizing model."""
+  lines = []
+  for content in contents:
+    for part in content.parts or []:
+      if part.text and not part.thought:
+        lines.append(f'[{content.role}]: {part.text}')
+      elif part.function_call:
+        lines.append(
+            f'[{content.role}] called tool `{part.function_call.name}` with'
+            f' parameters: {json.dumps(part.function_call.args, default=str)}'
+        )
+      elif part.function_response:
+        lines.append(
+            f'[{content.role}] `{part.function_response.name}` tool returned'
+            ' result:'
+            f' {json.dumps(part.function_response.response, default=str)}'
+        )
+      elif part.code_execution_result:
+        lines.append(
+            f'[{content.role}] code execution result:'
+            f' {part.code_execution_result.output}'
+        )
+  return '\n'.join(lines)
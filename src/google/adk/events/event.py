@@ -88,6 +88,8 @@ class Event(LlmResponse):
 
   def is_final_response(self) -> bool:
     """Returns whether the event is the final response of the agent."""
+    if self.actions.compaction:
+      return False
     if self.actions.skip_summarization or self.long_running_tool_ids:
       return True
     return (
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 from typing import Optional
 
+from google.genai import types
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
@@ -23,6 +24,18 @@ from pydantic import Field
 from ..auth.auth_tool import AuthConfig
 
 
+class EventCompaction(BaseModel):
+  """A summary that replaces the earlier conversation history of an agent."""
+
+  model_config = ConfigDict(extra='forbid')
+
+  end_timestamp: float
+  """The timestamp of the last event that the summary replaces."""
+
+  summary: types.Content
+  """The summary, sent to the model instead of the replaced events."""
+
+
 class EventActions(BaseModel):
   """Represents the actions attached to an event."""
 
@@ -53,3 +66,7 @@ class EventActions(BaseModel):
   could correspond to multiple function calls.
   dict value is the required auth config.
   """
+
+  compaction: Optional[EventCompaction] = None
+  """If set, the event replaces the earlier conversation history of its author
+  on its branch with a summary, in the following LLM requests."""
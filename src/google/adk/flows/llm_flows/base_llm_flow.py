@@ -17,11 +17,13 @@ from __future__ import annotations
 from abc import ABC
 import asyncio
 import logging
+import time
 from typing import AsyncGenerator
 from typing import cast
 from typing import Optional
 from typing import TYPE_CHECKING
 
+from google.genai import types
 from websockets.exceptions import ConnectionClosedOK
 
 from ...agents.base_agent import BaseAgent
@@ -34,10 +36,12 @@ from ...events.event import Event
 from ...models.base_llm_connection import BaseLlmConnection
 from ...models.llm_request import LlmRequest
 from ...models.llm_response import LlmResponse
+from ...models.token_estimator import estimate_content_tokens
+from ...models.token_estimator import estimate_request_tokens
+from ...telemetry import record_token_usage
 from ...telemetry import trace_call_llm
 from ...telemetry import trace_send_data
 from ...telemetry import tracer
-from ...tools.tool_context import ToolContext
 from . import functions
 
 if TYPE_CHECKING:
@@ -278,11 +282,9 @@ class BaseLlmFlow(ABC):
         yield event
 
     # Run processors for tools.
-    for tool in agent.canonical_tools:
-      tool_context = ToolContext(invocation_context)
-      await tool.process_llm_request(
-          tool_context=tool_context, llm_request=llm_request
-      )
+    await agent._get_tool_manifest().process_llm_request(
+        invocation_context, llm_request, agent.tool_selector
+    )
 
   async def _postprocess_async(
       self,
@@ -467,17 +469,52 @@ class BaseLlmFlow(ABC):
         # the counter beyond the max set value, then the execution is stopped
         # right here, and exception is thrown.
         invocation_context.increment_llm_call_count()
-        async for llm_response in llm.generate_content_async(
-            llm_request,
-            stream=invocation_context.run_config.streaming_mode
-            == StreamingMode.SSE,
-        ):
+        # Sheds the call before it is sent if it would exceed a token limit.
+        invocation_context.enforce_token_limits(llm_request)
+        usage_metadata = None
+        estimated_prompt_tokens = None
+        estimated_response_tokens = 0
+        run_config = invocation_context.run_config
+        stream = run_config.streaming_mode == StreamingMode.SSE
+        if llm.rate_limiter:
+          deadline = None
+          if run_config.max_llm_call_wait is not None:
+            deadline = time.monotonic() + run_config.max_llm_call_wait
+          llm_responses = llm.rate_limiter.generate_content_async(
+              llm, llm_request, stream=stream, deadline=deadline
+          )
+        else:
+          llm_responses = llm.generate_content_async(llm_request, stream=stream)
+        async for llm_response in llm_responses:
           trace_call_llm(
               invocation_context,
               model_response_event.id,
               llm_request,
               llm_response,
           )
+          # In streaming mode, the last usage covers the whole call.
+          usage_metadata = llm_response.usage_metadata or usage_metadata
+          if (
+              not usage_metadata
+              and llm_response.content
+              and not llm_response.partial
+          ):
+            # The model doesn't report its usage, so it is estimated and kept
+            # on the response event, where the session token limit of later
+            # runs finds it. The request is only counted on the first one.
+            prompt_tokens = 0
+            if estimated_prompt_tokens is None:
+              prompt_tokens = estimated_prompt_tokens = estimate_request_tokens(
+                  llm_request
+              )
+            response_tokens = estimate_content_tokens(llm_response.content)
+            estimated_response_tokens += response_tokens
+            llm_response.usage_metadata = (
+                types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_tokens,
+                    candidates_token_count=response_tokens,
+                )
+            )
           # Runs after_model_callback if it exists.
           if altered_llm_response := self._handle_after_model_callback(
               invocation_context, llm_response, model_response_event
@@ -485,6 +522,16 @@ class BaseLlmFlow(ABC):
             llm_response = altered_llm_response
 
           yield llm_response
+        if not usage_metadata:
+          # The model doesn't report its usage, so it is estimated.
+          if estimated_prompt_tokens is None:
+            estimated_prompt_tokens = estimate_request_tokens(llm_request)
+          usage_metadata = types.GenerateContentResponseUsageMetadata(
+              prompt_token_count=estimated_prompt_tokens,
+              candidates_token_count=estimated_response_tokens,
+          )
+        invocation_context.record_token_usage(usage_metadata)
+        record_token_usage(invocation_context, llm_request, usage_metadata)
 
   def _handle_before_model_callback(
       self,
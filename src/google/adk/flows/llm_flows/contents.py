@@ -23,7 +23,10 @@ from google.genai import types
 from typing_extensions import override
 
 from ...agents.invocation_context import InvocationContext
+from ...agents.readonly_context import ReadonlyContext
 from ...events.event import Event
+from ...events.event_actions import EventActions
+from ...events.event_actions import EventCompaction
 from ...models.llm_request import LlmRequest
 from ._base_llm_processor import BaseLlmRequestProcessor
 from .functions import remove_client_function_call_id
@@ -43,21 +46,172 @@ class _ContentLlmRequestProcessor(BaseLlmRequestProcessor):
     if not isinstance(agent, LlmAgent):
       return
 
-    if agent.include_contents != 'none':
-      llm_request.contents = _get_contents(
-          invocation_context.branch,
-          invocation_context.session.events,
-          agent.name,
-      )
+    if agent.include_contents == 'none':
+      return
 
-    # Maintain async generator behavior
-    if False:  # Ensures it behaves as a generator
-      yield  # This is a no-op but maintains generator structure
+    cache_key = (agent.name, invocation_context.branch)
+    contents_cache = invocation_context._contents_caches.get(cache_key)
+    if contents_cache is None:
+      contents_cache = _ContentsCache(invocation_context.branch, agent.name)
+      invocation_context._contents_caches[cache_key] = contents_cache
+    llm_request.contents = contents_cache.get_contents(
+        invocation_context.session.events
+    )
+
+    if not agent.history_compactor or not llm_request.contents:
+      return
+    compaction = await agent.history_compactor.compact(
+        ReadonlyContext(invocation_context), llm_request.contents
+    )
+    if not compaction:
+      return
+    # The last content is always sent.
+    num_contents = min(compaction.num_contents, len(llm_request.contents) - 1)
+    if num_contents <= 0:
+      return
+    kept_contents = llm_request.contents[num_contents:]
+    if not compaction.summary:
+      llm_request.contents = kept_contents
+      return
+    # Stores the summary, so that the following requests start from it.
+    yield Event(
+        invocation_id=invocation_context.invocation_id,
+        author=agent.name,
+        branch=invocation_context.branch,
+        actions=EventActions(
+            compaction=EventCompaction(
+                end_timestamp=contents_cache.result_events[
+                    num_contents - 1
+                ].timestamp,
+                summary=compaction.summary,
+            )
+        ),
+    )
+    llm_request.contents = [copy.deepcopy(compaction.summary)] + kept_contents
 
 
 request_processor = _ContentLlmRequestProcessor()
 
 
+class _ContentsCache:
+  """Builds the contents of an agent on a branch incrementally.
+
+  Events are only appended to the session during an invocation, so each call
+  only filters and converts the events appended since the previous call, and
+  reuses the contents converted before. The function response rearrangements
+  only change the events when a function response doesn't directly follow its
+  function call, so they are skipped until that happens.
+
+  A compaction event of the agent replaces the events before it with its
+  summary.
+  """
+
+  def __init__(self, current_branch: Optional[str], agent_name: str):
+    self._current_branch = current_branch
+    self._agent_name = agent_name
+    self._reset()
+
+  def _reset(self):
+    self._num_events = 0
+    self._last_event: Optional[Event] = None
+    self._filtered_events: list[Event] = []
+    # The contents of the filtered events, keyed by the id of the event.
+    self._contents: dict[int, types.Content] = {}
+    self._function_call_ids: set[Optional[str]] = set()
+    self._function_response_ids: set[Optional[str]] = set()
+    self._needs_rearrangement = False
+    # The events of the last returned contents.
+    self.result_events: list[Event] = []
+
+  def get_contents(self, events: list[Event]) -> list[types.Content]:
+    """Returns the contents for the LLM request, same as `_get_contents`.
+
+    The returned contents are deep copies, so callers such as callbacks and
+    model adapters can modify them in place without affecting the cache.
+    """
+    if len(events) < self._num_events or (
+        self._num_events
+        and events[self._num_events - 1] is not self._last_event
+    ):
+      # The history was rewritten rather than appended to.
+      self._reset()
+
+    for event in events[self._num_events :]:
+      if _is_compaction_event(self._current_branch, event, self._agent_name):
+        self._filtered_events = _apply_compaction(self._filtered_events, event)
+        # Only keeps the contents of the remaining events, since the ids of
+        # the removed events can be reused.
+        self._contents = {
+            id(e): self._contents.get(id(e)) or _to_request_content(e)
+            for e in self._filtered_events
+        }
+        continue
+      filtered_event = _filter_event(
+          self._current_branch, event, self._agent_name
+      )
+      if not filtered_event:
+        continue
+      if not self._needs_rearrangement:
+        self._needs_rearrangement = not self._is_in_place(filtered_event)
+      self._filtered_events.append(filtered_event)
+      self._contents[id(filtered_event)] = _to_request_content(filtered_event)
+    self._num_events = len(events)
+    self._last_event = events[-1] if events else None
+
+    result_events = self._filtered_events
+    if self._needs_rearrangement:
+      result_events = _rearrange_events_for_latest_function_response(
+          result_events
+      )
+      result_events = _rearrange_events_for_async_function_responses_in_history(
+          result_events
+      )
+
+    contents = []
+    for event in result_events:
+      content = self._contents.get(id(event))
+      if content is None:
+        # A function response event merged by the rearrangements.
+        content = _to_request_content(event)
+      contents.append(content.model_copy(deep=True))
+    self.result_events = result_events
+    return contents
+
+  def _is_in_place(self, event: Event) -> bool:
+    """Whether the rearrangements would leave the new event where it is.
+
+    That is the case for events without function responses, and for events
+    whose function responses all answer the function calls of the previous
+    event, as long as no function call id is missing or reused.
+    """
+    call_ids = [
+        function_call.id for function_call in event.get_function_calls()
+    ]
+    response_ids = [
+        function_response.id
+        for function_response in event.get_function_responses()
+    ]
+    in_place = (
+        None not in call_ids
+        and None not in response_ids
+        and self._function_call_ids.isdisjoint(call_ids)
+        and self._function_response_ids.isdisjoint(response_ids)
+        and len(set(call_ids)) == len(call_ids)
+        and len(set(response_ids)) == len(response_ids)
+    )
+    self._function_call_ids.update(call_ids)
+    self._function_response_ids.update(response_ids)
+    if not in_place or not response_ids:
+      return in_place
+    if call_ids or not self._filtered_events:
+      return False
+    previous_call_ids = {
+        function_call.id
+        for function_call in self._filtered_events[-1].get_function_calls()
+    }
+    return previous_call_ids.issuperset(response_ids)
+
+
 def _rearrange_events_for_async_function_responses_in_history(
     events: list[Event],
 ) -> list[Event]:
@@ -202,21 +356,12 @@ def _get_contents(
   # Parse the events, leaving the contents and the function calls and
   # responses from the current agent.
   for event in events:
-    if not event.content or not event.content.role:
-      # Skip events without content, or generated neither by user nor by model.
-      # E.g. events purely for mutating session states.
+    if _is_compaction_event(current_branch, event, agent_name):
+      filtered_events = _apply_compaction(filtered_events, event)
       continue
-    if not _is_event_belongs_to_branch(current_branch, event):
-      # Skip events not belong to current branch.
-      continue
-    if _is_auth_event(event):
-      # skip auth event
-      continue
-    filtered_events.append(
-        _convert_foreign_event(event)
-        if _is_other_agent_reply(agent_name, event)
-        else event
-    )
+    filtered_event = _filter_event(current_branch, event, agent_name)
+    if filtered_event:
+      filtered_events.append(filtered_event)
 
   result_events = _rearrange_events_for_latest_function_response(
       filtered_events
@@ -224,12 +369,65 @@ def _get_contents(
   result_events = _rearrange_events_for_async_function_responses_in_history(
       result_events
   )
-  contents = []
-  for event in result_events:
-    content = copy.deepcopy(event.content)
-    remove_client_function_call_id(content)
-    contents.append(content)
-  return contents
+  return [_to_request_content(event) for event in result_events]
+
+
+def _filter_event(
+    current_branch: Optional[str], event: Event, agent_name: str
+) -> Optional[Event]:
+  """Returns the event as seen by the agent, or None if the agent can't see it."""
+  if not event.content or not event.content.role:
+    # Skip events without content, or generated neither by user nor by model.
+    # E.g. events purely for mutating session states.
+    return None
+  if not _is_event_belongs_to_branch(current_branch, event):
+    # Skip events not belong to current branch.
+    return None
+  if _is_auth_event(event):
+    # skip auth event
+    return None
+  return (
+      _convert_foreign_event(event)
+      if _is_other_agent_reply(agent_name, event)
+      else event
+  )
+
+
+def _is_compaction_event(
+    current_branch: Optional[str], event: Event, agent_name: str
+) -> bool:
+  """Whether the event compacts the history of the agent on the branch."""
+  return bool(
+      event.actions.compaction
+      and event.author == agent_name
+      and event.branch == current_branch
+  )
+
+
+def _apply_compaction(
+    filtered_events: list[Event], compaction_event: Event
+) -> list[Event]:
+  """Replaces the events compacted by a compaction event with its summary."""
+  compaction = compaction_event.actions.compaction
+  summary_event = Event(
+      invocation_id=compaction_event.invocation_id,
+      timestamp=compaction.end_timestamp,
+      author='user',
+      content=compaction.summary,
+      branch=compaction_event.branch,
+  )
+  return [summary_event] + [
+      event
+      for event in filtered_events
+      if event.timestamp > compaction.end_timestamp
+  ]
+
+
+def _to_request_content(event: Event) -> types.Content:
+  """Returns a copy of the event content to send in the LLM request."""
+  content = copy.deepcopy(event.content)
+  remove_client_function_call_id(content)
+  return content
 
 
 def _is_other_agent_reply(current_agent_name: str, event: Event) -> bool:
@@ -29,6 +29,7 @@ from google.genai import types
 
 from ...agents.active_streaming_tool import ActiveStreamingTool
 from ...agents.invocation_context import InvocationContext
+from ...agents.run_config import RunConfig
 from ...auth.auth_tool import AuthToolArguments
 from ...events.event import Event
 from ...events.event_actions import EventActions
@@ -129,62 +130,69 @@ async def handle_function_calls_async(
     tools_dict: dict[str, BaseTool],
     filters: Optional[set[str]] = None,
 ) -> Optional[Event]:
-  """Calls the functions and returns the function response event."""
+  """Calls the functions and returns the function response event.
+
+  The function calls run concurrently, at most
+  `RunConfig.max_concurrent_tool_calls` at a time. The function responses are
+  merged in the order of the function calls.
+  """
   from ...agents.llm_agent import LlmAgent
 
   agent = invocation_context.agent
   if not isinstance(agent, LlmAgent):
     return
 
-  function_calls = function_call_event.get_function_calls()
-
-  function_response_events: list[Event] = []
-  for function_call in function_calls:
-    if filters and function_call.id not in filters:
-      continue
-    tool, tool_context = _get_tool_and_context(
-        invocation_context,
-        function_call_event,
-        function_call,
-        tools_dict,
-    )
-    # do not use "args" as the variable name, because it is a reserved keyword
-    # in python debugger.
-    function_args = function_call.args or {}
-    function_response = None
-    # Calls the tool if before_tool_callback does not exist or returns None.
-    if agent.before_tool_callback:
-      function_response = agent.before_tool_callback(
-          tool=tool, args=function_args, tool_context=tool_context
-      )
-
-    if not function_response:
-      function_response = await __call_tool_async(
-          tool, args=function_args, tool_context=tool_context
+  function_calls = [
+      function_call
+      for function_call in function_call_event.get_function_calls()
+      if not filters or function_call.id in filters
+  ]
+  # Resolves all the tools first, so that no tool runs if any is missing.
+  tools_and_contexts = [
+      _get_tool_and_context(
+          invocation_context,
+          function_call_event,
+          function_call,
+          tools_dict,
       )
-
-    # Calls after_tool_callback if it exists.
-    if agent.after_tool_callback:
-      new_response = agent.after_tool_callback(
-          tool=tool,
-          args=function_args,
-          tool_context=tool_context,
-          tool_response=function_response,
+      for function_call in function_calls
+  ]
+
+  run_config = invocation_context.run_config or RunConfig()
+  semaphore = asyncio.Semaphore(run_config.max_concurrent_tool_calls)
+
+  async def call_function(
+      function_call: types.FunctionCall,
+      tool: BaseTool,
+      tool_context: ToolContext,
+  ) -> Optional[Event]:
+    async with semaphore:
+      return await _handle_function_call_async(
+          invocation_context,
+          function_call,
+          tool,
+          tool_context,
+          timeout=run_config.tool_call_timeout,
       )
-      if new_response:
-        function_response = new_response
-
-    if tool.is_long_running:
-      # Allow long running function to return None to not provide function response.
-      if not function_response:
-        continue
-
-    # Builds the function response event.
-    function_response_event = __build_response_event(
-        tool, function_response, tool_context, invocation_context
-    )
-    function_response_events.append(function_response_event)
 
+  if len(function_calls) == 1:
+    results = [await call_function(function_calls[0], *tools_and_contexts[0])]
+  else:
+    tasks = [
+        asyncio.create_task(call_function(function_call, tool, tool_context))
+        for function_call, (tool, tool_context) in zip(
+            function_calls, tools_and_contexts
+        )
+    ]
+    try:
+      results = await asyncio.gather(*tasks)
+    except BaseException:
+      # Do not leave the other function calls running in the background.
+      for task in tasks:
+        task.cancel()
+      raise
+
+  function_response_events = [event for event in results if event]
   if not function_response_events:
     return None
   merged_event = merge_parallel_function_response_events(
@@ -203,6 +211,61 @@ async def handle_function_calls_async(
   return merged_event
 
 
+async def _handle_function_call_async(
+    invocation_context: InvocationContext,
+    function_call: types.FunctionCall,
+    tool: BaseTool,
+    tool_context: ToolContext,
+    timeout: Optional[float] = None,
+) -> Optional[Event]:
+  """Calls a single function and returns its function response event."""
+  agent = invocation_context.agent
+  # do not use "args" as the variable name, because it is a reserved keyword
+  # in python debugger.
+  function_args = function_call.args or {}
+  function_response = None
+  # Calls the tool if before_tool_callback does not exist or returns None.
+  if agent.before_tool_callback:
+    function_response = agent.before_tool_callback(
+        tool=tool, args=function_args, tool_context=tool_context
+    )
+
+  if not function_response:
+    try:
+      function_response = await asyncio.wait_for(
+          __call_tool_async(
+              tool, args=function_args, tool_context=tool_context
+          ),
+          timeout,
+      )
+    except asyncio.TimeoutError:
+      logger.warning('Tool %s timed out after %s seconds.', tool.name, timeout)
+      function_response = {
+          'error': f'Tool {tool.name} timed out after {timeout} seconds.'
+      }
+
+  # Calls after_tool_callback if it exists.
+  if agent.after_tool_callback:
+    new_response = agent.after_tool_callback(
+        tool=tool,
+        args=function_args,
+        tool_context=tool_context,
+        tool_response=function_response,
+    )
+    if new_response:
+      function_response = new_response
+
+  if tool.is_long_running:
+    # Allow long running function to return None to not provide function response.
+    if not function_response:
+      return None
+
+  # Builds the function response event.
+  return __build_response_event(
+      tool, function_response, tool_context, invocation_context
+  )
+
+
 async def handle_function_calls_live(
     invocation_context: InvocationContext,
     function_call_event: Event,
@@ -467,12 +530,18 @@ def merge_parallel_function_response_events(
   # Merge actions from all events
 
   merged_actions = EventActions()
+  merged_state_delta = {}
+  merged_artifact_delta = {}
   merged_requested_auth_configs = {}
   for event in function_response_events:
+    merged_state_delta.update(event.actions.state_delta)
+    merged_artifact_delta.update(event.actions.artifact_delta)
     merged_requested_auth_configs.update(event.actions.requested_auth_configs)
     merged_actions = merged_actions.model_copy(
         update=event.actions.model_dump()
     )
+  merged_actions.state_delta = merged_state_delta
+  merged_actions.artifact_delta = merged_artifact_delta
   merged_actions.requested_auth_configs = merged_requested_auth_configs
   # Create the new merged event
   merged_event = Event(
@@ -14,12 +14,14 @@
 import logging
 
 from .base_memory_service import BaseMemoryService
+from .cached_memory_service import CachedMemoryService
 from .in_memory_memory_service import InMemoryMemoryService
 
 logger = logging.getLogger(__name__)
 
 __all__ = [
     'BaseMemoryService',
+    'CachedMemoryService',
     'InMemoryMemoryService',
 ]
 
@@ -33,3 +35,13 @@ except ImportError:
       ' VertexAiRagMemoryService please install it. If not, you can ignore this'
       ' warning.'
   )
+
+try:
+  from .local_vector_memory_service import LocalVectorMemoryService
+
+  __all__.append('LocalVectorMemoryService')
+except ImportError:
+  logger.debug(
+      'NumPy is not installed. If you want to use the LocalVectorMemoryService'
+      ' please install it. If not, you can ignore this warning.'
+  )
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import threading
+import time
+
+from opentelemetry import metrics
+from typing_extensions import override
+
+from ..sessions.session import Session
+from .base_memory_service import BaseMemoryService
+from .base_memory_service import SearchMemoryResponse
+
+meter = metrics.get_meter('gcp.vertex.agent')
+
+_avoided_search_counter = meter.create_counter(
+    'gcp.vertex.agent.memory.avoided_searches',
+    unit='{search}',
+    description='Number of memory searches answered from a cache.',
+)
+
+
+def record_avoided_search(app_name: str, cache: str) -> None:
+  """Records a memory search answered from a cache.
+
+  Args:
+    app_name: The app of the search.
+    cache: The cache that answered, 'invocation' or 'ttl'.
+  """
+  _avoided_search_counter.add(
+      1, {'gcp.vertex.agent.app_name': app_name, 'cache': cache}
+  )
+
+
+class CachedMemoryService(BaseMemoryService):
+  """A memory service that caches the searches of another memory service.
+
+  The searches of an invocation are already memoized by the invocation
+  context. This cache also reuses them across invocations, e.g. for the
+  `PreloadMemoryTool` of a user who asks the same question again, which
+  avoids a retrieval round trip with a remote memory service.
+
+  Searches are keyed by app, user and query. The entries of a user are
+  invalidated when a session of the user is added to the memory.
+
+  Example:
+  ```python
+  runner = Runner(
+      memory_service=CachedMemoryService(
+          VertexAiRagMemoryService(rag_corpus=...), ttl=300
+      ),
+      ...
+  )
+  ```
+
+  Attributes:
+    memory_service: The memory service to cache the searches of.
+    ttl: The number of seconds an entry stays valid.
+    max_entries: The max number of entries. The least recently used entries
+      are evicted first.
+    hits: The number of searches answered from the cache.
+    misses: The number of searches sent to the memory service.
+  """
+
+  def __init__(
+      self,
+      memory_service: BaseMemoryService,
+      *,
+      ttl: float = 60,
+      max_entries: int = 1000,
+  ):
+    if ttl <= 0:
+      raise ValueError('ttl should be greater than 0.')
+    if max_entries <= 0:
+      raise ValueError('max_entries should be greater than 0.')
+    self.memory_service = memory_service
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.hits = 0
+    self.misses = 0
+    # The responses and their creation times, most recently used last.
+    self._entries: collections.OrderedDict[
+        tuple[str, str, str], tuple[SearchMemoryResponse, float]
+    ] = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  @override
+  def add_session_to_memory(self, session: Session):
+    self.memory_service.add_session_to_memory(session)
+    with self._lock:
+      for key in list(self._entries):
+        if key[:2] == (session.app_name, session.user_id):
+          del self._entries[key]
+
+  @override
+  def search_memory(
+      self, *, app_name: str, user_id: str, query: str
+  ) -> SearchMemoryResponse:
+    key = (app_name, user_id, query)
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry and time.time() - entry[1] <= self.ttl:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        record_avoided_search(app_name, 'ttl')
+        return entry[0]
+      self.misses += 1
+    response = self.memory_service.search_memory(
+        app_name=app_name, user_id=user_id, query=query
+    )
+    with self._lock:
+      self._entries[key] = (response, time.time())
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+    return response
+
+  def clear(self) -> None:
+    """Removes all the entries."""
+    with self._lock:
+      self._entries.clear()
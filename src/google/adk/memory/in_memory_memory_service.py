@@ -12,6 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import heapq
+import math
+import re
+from typing import Optional
+
 from ..events.event import Event
 from ..sessions.session import Session
 from .base_memory_service import BaseMemoryService
@@ -22,41 +28,157 @@ from .base_memory_service import SearchMemoryResponse
 class InMemoryMemoryService(BaseMemoryService):
   """An in-memory memory service for prototyping purpose only.
 
-  Uses keyword matching instead of semantic search.
+  Uses BM25 keyword search instead of semantic search. The events of each
+  user are kept in an inverted index, which is updated incrementally when a
+  session is added, so a search only scores the events that contain a query
+  term.
   """
 
-  def __init__(self):
+  def __init__(
+      self, *, top_k: Optional[int] = 10, k1: float = 1.5, b: float = 0.75
+  ):
+    """Initializes the InMemoryMemoryService.
+
+    Args:
+      top_k: The max number of events to return per search. If None, all the
+        matching events are returned.
+      k1: The BM25 term frequency saturation.
+      b: The BM25 document length normalization.
+    """
+    self.top_k = top_k
+    self.k1 = k1
+    self.b = b
     self.session_events: dict[str, list[Event]] = {}
     """keys are app_name/user_id/session_id"""
+    self._indexes: dict[str, _EventIndex] = {}
+    """keys are app_name/user_id"""
 
   def add_session_to_memory(self, session: Session):
     key = f'{session.app_name}/{session.user_id}/{session.id}'
-    self.session_events[key] = [
-        event for event in session.events if event.content
-    ]
+    events = [event for event in session.events if event.content]
+    self.session_events[key] = events
+    index_key = f'{session.app_name}/{session.user_id}'
+    index = self._indexes.get(index_key)
+    if index is None:
+      index = _EventIndex()
+      self._indexes[index_key] = index
+    index.add_session(session.id, events)
 
   def search_memory(
       self, *, app_name: str, user_id: str, query: str
   ) -> SearchMemoryResponse:
-    """Prototyping purpose only."""
-    keywords = set(query.lower().split())
+    """Returns the events that best match the query, grouped by session.
+
+    The sessions are ordered by their best matching event, and the events of
+    a session are in chronological order.
+    """
     response = SearchMemoryResponse()
-    for key, events in self.session_events.items():
-      if not key.startswith(f'{app_name}/{user_id}/'):
+    index = self._indexes.get(f'{app_name}/{user_id}')
+    if not index:
+      return response
+    scores = index.score(_tokenize(query), self.k1, self.b)
+    if self.top_k is None:
+      doc_ids = sorted(scores, key=scores.__getitem__, reverse=True)
+    else:
+      doc_ids = heapq.nlargest(self.top_k, scores, key=scores.__getitem__)
+
+    session_docs: dict[str, list[int]] = {}
+    for doc_id in doc_ids:
+      session_docs.setdefault(index.docs[doc_id][0], []).append(doc_id)
+    for session_id, session_doc_ids in session_docs.items():
+      # Doc ids increase in the order of the events of a session.
+      response.memories.append(
+          MemoryResult(
+              session_id=session_id,
+              events=[
+                  index.docs[doc_id][1] for doc_id in sorted(session_doc_ids)
+              ],
+          )
+      )
+    return response
+
+
+class _EventIndex:
+  """An inverted index of the events of the sessions of a user."""
+
+  def __init__(self):
+    self.docs: dict[int, tuple[str, Event]] = {}
+    """The session id and the event of each indexed event, keyed by doc id."""
+    self._doc_lengths: dict[int, int] = {}
+    self._total_length = 0
+    self._next_doc_id = 0
+    # The frequency of each term in each doc that contains it.
+    self._postings: dict[str, dict[int, int]] = collections.defaultdict(dict)
+    # The doc ids and event ids of each session, in order.
+    self._session_docs: dict[str, list[int]] = {}
+    self._session_event_ids: dict[str, list[str]] = {}
+
+  def __bool__(self) -> bool:
+    return bool(self.docs)
+
+  def add_session(self, session_id: str, events: list[Event]) -> None:
+    """Indexes the events of a session, replacing its previous events.
+
+    A session is usually added again with more events, so only the new events
+    are indexed when the previous ones are unchanged.
+    """
+    event_ids = [event.id for event in events]
+    indexed_ids = self._session_event_ids.get(session_id, [])
+    if event_ids[: len(indexed_ids)] != indexed_ids:
+      self._remove_session(session_id)
+      indexed_ids = []
+    doc_ids = self._session_docs.setdefault(session_id, [])
+    for event in events[len(indexed_ids) :]:
+      doc_ids.append(self._add_doc(session_id, event))
+    self._session_event_ids[session_id] = event_ids
+
+  def score(self, terms: list[str], k1: float, b: float) -> dict[int, float]:
+    """Returns the BM25 score of each doc that contains a term."""
+    num_docs = len(self.docs)
+    average_length = self._total_length / num_docs or 1.0
+    scores: dict[int, float] = collections.defaultdict(float)
+    for term in set(terms):
+      postings = self._postings.get(term)
+      if not postings:
         continue
-      matched_events = []
-      for event in events:
-        if not event.content or not event.content.parts:
-          continue
-        parts = event.content.parts
-        text = '\n'.join([part.text for part in parts if part.text]).lower()
-        for keyword in keywords:
-          if keyword in text:
-            matched_events.append(event)
-            break
-      if matched_events:
-        session_id = key.split('/')[-1]
-        response.memories.append(
-            MemoryResult(session_id=session_id, events=matched_events)
+      idf = math.log(
+          1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5)
+      )
+      for doc_id, frequency in postings.items():
+        length_norm = 1 - b + b * self._doc_lengths[doc_id] / average_length
+        scores[doc_id] += (
+            idf * frequency * (k1 + 1) / (frequency + k1 * length_norm)
         )
-    return response
+    return scores
+
+  def _add_doc(self, session_id: str, event: Event) -> int:
+    doc_id = self._next_doc_id
+    self._next_doc_id += 1
+    terms = _tokenize(_get_text(event))
+    self.docs[doc_id] = (session_id, event)
+    self._doc_lengths[doc_id] = len(terms)
+    self._total_length += len(terms)
+    for term, frequency in collections.Counter(terms).items():
+      self._postings[term][doc_id] = frequency
+    return doc_id
+
+  def _remove_session(self, session_id: str) -> None:
+    for doc_id in self._session_docs.pop(session_id, []):
+      _, event = self.docs.pop(doc_id)
+      self._total_length -= self._doc_lengths.pop(doc_id)
+      for term in set(_tokenize(_get_text(event))):
+        postings = self._postings[term]
+        postings.pop(doc_id, None)
+        if not postings:
+          del self._postings[term]
+    self._session_event_ids.pop(session_id, None)
+
+
+def _get_text(event: Event) -> str:
+  if not event.content or not event.content.parts:
+    return ''
+  return '\n'.join(part.text for part in event.content.parts if part.text)
+
+
+def _tokenize(text: str) -> list[str]:
+  return re.findall(r'\w+', text.lower())
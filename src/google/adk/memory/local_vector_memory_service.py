@@ -0,0 +1,508 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Callable
+from typing import Literal
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+
+from ..events.event import Event
+from ..sessions.session import Session
+from .base_memory_service import BaseMemoryService
+from .base_memory_service import MemoryResult
+from .base_memory_service import SearchMemoryResponse
+
+logger = logging.getLogger(__name__)
+
+EmbeddingFunction = Callable[[list[str]], Sequence[Sequence[float]]]
+
+# The number of rows scored at once, which bounds the memory of a search.
+_CHUNK_SIZE = 16384
+# The number of k-means iterations to train an IVF index.
+_KMEANS_ITERATIONS = 10
+# The min number of rows per list to train an IVF index.
+_MIN_ROWS_PER_LIST = 39
+# The max number of rows per list to train an IVF index on.
+_MAX_TRAINING_ROWS_PER_LIST = 256
+
+_META_FILE = 'meta.json'
+_VECTORS_FILE = 'vectors.bin'
+_SCALES_FILE = 'scales.bin'
+_EVENTS_FILE = 'events.tsv'
+_REMOVED_FILE = 'removed.jsonl'
+
+
+class LocalVectorMemoryService(BaseMemoryService):
+  """A memory service that searches events by semantic similarity, locally.
+
+  The text of each event is embedded with a local embedding function, e.g. a
+  sentence-transformers model, and the events most similar to the query by
+  cosine similarity are returned. No request leaves the process.
+
+  The embeddings of each user are stored in a NumPy array, either as float32
+  or quantized to int8 with a scale per vector, which takes 4 times less
+  memory for a small loss of precision. They are searched exhaustively, or
+  with an IVF (inverted file) index that only scores the vectors of the
+  clusters closest to the query.
+
+  With a `path`, the memory is persisted in a directory and loaded when the
+  service is created. The embeddings are memory-mapped, and the events are
+  only parsed when they are returned, so a restart doesn't read the whole
+  memory.
+
+  Example:
+  ```python
+  model = SentenceTransformer('all-MiniLM-L6-v2')
+  memory_service = LocalVectorMemoryService(
+      lambda texts: model.encode(texts),
+      dtype='int8',
+      index='ivf',
+      path='/var/lib/agent/memory',
+  )
+  ```
+  """
+
+  def __init__(
+      self,
+      embedding_function: EmbeddingFunction,
+      *,
+      top_k: int = 10,
+      dtype: Literal['float32', 'int8'] = 'float32',
+      index: Literal['flat', 'ivf'] = 'flat',
+      num_lists: Optional[int] = None,
+      num_probes: int = 8,
+      path: Optional[str] = None,
+  ):
+    """Initializes the LocalVectorMemoryService.
+
+    Args:
+      embedding_function: Returns the embedding of each of the given texts.
+      top_k: The max number of events to return per search.
+      dtype: How to store the embeddings, 'float32' or 'int8'.
+      index: How to search the embeddings, 'flat' to score all of them, or
+        'ivf' to score the clusters closest to the query.
+      num_lists: The number of clusters of an IVF index. Defaults to the
+        square root of the number of embeddings of the user.
+      num_probes: The number of clusters of an IVF index to score per search.
+      path: The directory to persist the memory in. If not set, the memory is
+        lost when the process ends.
+    """
+    if top_k <= 0:
+      raise ValueError('top_k should be greater than 0.')
+    if dtype not in ('float32', 'int8'):
+      raise ValueError(f'Unsupported dtype: {dtype}')
+    if index not in ('flat', 'ivf'):
+      raise ValueError(f'Unsupported index: {index}')
+    self.embedding_function = embedding_function
+    self.top_k = top_k
+    self.dtype = dtype
+    self.index = index
+    self.num_lists = num_lists
+    self.num_probes = num_probes
+    self.path = path
+    self._stores: dict[str, _VectorStore] = {}
+    """keys are app_name/user_id"""
+    if path:
+      self._load()
+
+  def add_session_to_memory(self, session: Session):
+    key = f'{session.app_name}/{session.user_id}'
+    store = self._stores.get(key)
+    if store is None:
+      store = _VectorStore(key, self.dtype, self._get_store_path(key))
+      self._stores[key] = store
+    store.add_session(session.id, session.events, self.embedding_function)
+
+  def search_memory(
+      self, *, app_name: str, user_id: str, query: str
+  ) -> SearchMemoryResponse:
+    """Returns the events most similar to the query, grouped by session.
+
+    The sessions are ordered by their most similar event, and the events of a
+    session are in chronological order.
+    """
+    response = SearchMemoryResponse()
+    store = self._stores.get(f'{app_name}/{user_id}')
+    if not store or not store.num_rows or not query:
+      return response
+    query_vector = _normalize(
+        np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+    )
+    if self.index == 'ivf':
+      rows = store.search_ivf(
+          query_vector, self.top_k, self.num_lists, self.num_probes
+      )
+    else:
+      rows = store.search(query_vector, self.top_k)
+
+    session_rows: dict[str, list[int]] = {}
+    for row in rows:
+      session_rows.setdefault(store.session_ids[row], []).append(row)
+    for session_id, rows in session_rows.items():
+      # Rows increase in the order of the events of a session.
+      response.memories.append(
+          MemoryResult(
+              session_id=session_id,
+              events=[store.get_event(row) for row in sorted(rows)],
+          )
+      )
+    return response
+
+  def _get_store_path(self, key: str) -> Optional[str]:
+    if not self.path:
+      return None
+    return os.path.join(
+        self.path, hashlib.sha256(key.encode()).hexdigest()[:32]
+    )
+
+  def _load(self) -> None:
+    if not os.path.isdir(self.path):
+      return
+    for name in sorted(os.listdir(self.path)):
+      store_path = os.path.join(self.path, name)
+      meta_path = os.path.join(store_path, _META_FILE)
+      if not os.path.isfile(meta_path):
+        continue
+      with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+      if meta['dtype'] != self.dtype:
+        raise ValueError(
+            f'The memory in {store_path} is stored as {meta["dtype"]}, not as'
+            f' {self.dtype}.'
+        )
+      store = _VectorStore(meta['key'], self.dtype, store_path)
+      store.load(meta)
+      self._stores[meta['key']] = store
+
+
+class _VectorStore:
+  """The embeddings and events of the sessions of a user."""
+
+  def __init__(self, key: str, dtype: str, path: Optional[str]):
+    self._key = key
+    self._dtype = np.dtype(dtype)
+    self._path = path
+    self.dim: Optional[int] = None
+    self.num_rows = 0
+    self._vectors: Optional[np.ndarray] = None
+    # The scale of each int8 vector.
+    self._scales: Optional[np.ndarray] = None
+    self._alive = np.zeros(0, dtype=bool)
+    self.session_ids: list[str] = []
+    # Events are kept as JSON after a restart, until they are returned.
+    self._events: list[Union[Event, str]] = []
+    self._session_rows: dict[str, list[int]] = {}
+    self._session_event_ids: dict[str, list[str]] = {}
+    # The IVF index: the cluster centroids and the cluster of each row.
+    self._centroids: Optional[np.ndarray] = None
+    self._assignments = np.zeros(0, dtype=np.int32)
+    self._trained_rows = 0
+
+  def add_session(
+      self,
+      session_id: str,
+      events: list[Event],
+      embedding_function: EmbeddingFunction,
+  ) -> None:
+    """Adds the events of a session, replacing its previous events.
+
+    A session is usually added again with more events, so only the new events
+    are embedded when the previous ones are unchanged.
+    """
+    event_ids = [event.id for event in events]
+    indexed_ids = self._session_event_ids.get(session_id, [])
+    if event_ids[: len(indexed_ids)] != indexed_ids:
+      self._remove_session(session_id)
+      indexed_ids = []
+    self._session_event_ids[session_id] = event_ids
+    new_events = [
+        event for event in events[len(indexed_ids) :] if _get_text(event)
+    ]
+    if not new_events:
+      self._save_meta()
+      return
+    embeddings = np.asarray(
+        embedding_function([_get_text(event) for event in new_events]),
+        dtype=np.float32,
+    )
+    self._append(
+        session_id,
+        new_events,
+        [event.model_dump_json(exclude_none=True) for event in new_events],
+        embeddings,
+    )
+
+  def search(self, query: np.ndarray, top_k: int) -> list[int]:
+    """Returns the rows most similar to the query, most similar first."""
+    scores = np.empty(self.num_rows, dtype=np.float32)
+    for start in range(0, self.num_rows, _CHUNK_SIZE):
+      stop = min(start + _CHUNK_SIZE, self.num_rows)
+      scores[start:stop] = self._score(slice(start, stop), query)
+    return self._get_top_rows(np.arange(self.num_rows), scores, top_k)
+
+  def search_ivf(
+      self,
+      query: np.ndarray,
+      top_k: int,
+      num_lists: Optional[int],
+      num_probes: int,
+  ) -> list[int]:
+    """Returns the rows most similar to the query, scoring only the rows of
+    the closest clusters."""
+    num_lists = num_lists or max(int(np.sqrt(self.num_rows)), 1)
+    if self.num_rows < num_lists * _MIN_ROWS_PER_LIST:
+      return self.search(query, top_k)
+    if self._centroids is None or self.num_rows >= 2 * self._trained_rows:
+      self._train(num_lists)
+    probes = np.argsort(-(self._centroids @ query))[:num_probes]
+    rows = np.flatnonzero(np.isin(self._assignments[: self.num_rows], probes))
+    scores = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), _CHUNK_SIZE):
+      chunk = rows[start : start + _CHUNK_SIZE]
+      scores[start : start + len(chunk)] = self._score(chunk, query)
+    return self._get_top_rows(rows, scores, top_k)
+
+  def get_event(self, row: int) -> Event:
+    event = self._events[row]
+    if isinstance(event, str):
+      event = Event.model_validate_json(event)
+      self._events[row] = event
+    return event
+
+  def load(self, meta: dict) -> None:
+    """Loads the store from its directory."""
+    self.dim = meta['dim']
+    self._session_event_ids = meta['session_event_ids']
+    with open(os.path.join(self._path, _EVENTS_FILE), encoding='utf-8') as f:
+      for line in f:
+        session_id, event_json = line.rstrip('\n').split('\t', 1)
+        self._session_rows.setdefault(session_id, []).append(
+            len(self.session_ids)
+        )
+        self.session_ids.append(session_id)
+        self._events.append(event_json)
+    self.num_rows = len(self.session_ids)
+    if self.dim is not None and self.num_rows:
+      self._vectors = np.memmap(
+          os.path.join(self._path, _VECTORS_FILE),
+          dtype=self._dtype,
+          mode='r',
+          shape=(self.num_rows, self.dim),
+      )
+      if self._dtype == np.int8:
+        self._scales = np.memmap(
+            os.path.join(self._path, _SCALES_FILE),
+            dtype=np.float32,
+            mode='r',
+            shape=(self.num_rows,),
+        )
+    self._alive = np.ones(self.num_rows, dtype=bool)
+    self._assignments = np.zeros(self.num_rows, dtype=np.int32)
+    removed_path = os.path.join(self._path, _REMOVED_FILE)
+    if os.path.isfile(removed_path):
+      with open(removed_path, encoding='utf-8') as f:
+        for line in f:
+          removal = json.loads(line)
+          self._mark_removed(removal['session_id'], removal['num_rows'])
+
+  def _append(
+      self,
+      session_id: str,
+      events: list[Event],
+      event_jsons: list[str],
+      embeddings: np.ndarray,
+  ) -> None:
+    if self.dim is None:
+      self.dim = embeddings.shape[1]
+    elif embeddings.shape[1] != self.dim:
+      raise ValueError(
+          f'Expected embeddings of dimension {self.dim}, got'
+          f' {embeddings.shape[1]}.'
+      )
+    embeddings = embeddings / np.maximum(
+        np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12
+    )
+    vectors, scales = _quantize(embeddings, self._dtype)
+    start = self.num_rows
+    stop = start + len(events)
+    self._reserve(stop)
+    self._vectors[start:stop] = vectors
+    if scales is not None:
+      self._scales[start:stop] = scales
+    self._alive[start:stop] = True
+    if self._centroids is not None:
+      self._assignments[start:stop] = np.argmax(
+          embeddings @ self._centroids.T, axis=1
+      )
+    self.num_rows = stop
+    rows = list(range(start, stop))
+    self._session_rows.setdefault(session_id, []).extend(rows)
+    self.session_ids.extend([session_id] * len(events))
+    self._events.extend(events)
+
+    if self._path:
+      os.makedirs(self._path, exist_ok=True)
+      with open(os.path.join(self._path, _VECTORS_FILE), 'ab') as f:
+        f.write(vectors.tobytes())
+      if scales is not None:
+        with open(os.path.join(self._path, _SCALES_FILE), 'ab') as f:
+          f.write(scales.tobytes())
+      with open(
+          os.path.join(self._path, _EVENTS_FILE), 'a', encoding='utf-8'
+      ) as f:
+        for event_json in event_jsons:
+          f.write(f'{session_id}\t{event_json}\n')
+      self._save_meta()
+
+  def _reserve(self, num_rows: int) -> None:
+    """Grows the arrays to hold num_rows rows, doubling their capacity."""
+    capacity = 0 if self._vectors is None else len(self._vectors)
+    if num_rows <= capacity and not isinstance(self._vectors, np.memmap):
+      return
+    capacity = max(num_rows, 2 * capacity, 16)
+    # Memory-mapped arrays are read-only, so they are copied on first write.
+    vectors = np.zeros((capacity, self.dim), dtype=self._dtype)
+    alive = np.zeros(capacity, dtype=bool)
+    assignments = np.zeros(capacity, dtype=np.int32)
+    if self._vectors is not None:
+      vectors[: self.num_rows] = self._vectors[: self.num_rows]
+    alive[: self.num_rows] = self._alive[: self.num_rows]
+    assignments[: self.num_rows] = self._assignments[: self.num_rows]
+    self._vectors = vectors
+    self._alive = alive
+    self._assignments = assignments
+    if self._dtype == np.int8:
+      scales = np.zeros(capacity, dtype=np.float32)
+      if self._scales is not None:
+        scales[: self.num_rows] = self._scales[: self.num_rows]
+      self._scales = scales
+
+  def _remove_session(self, session_id: str) -> None:
+    if not self._session_rows.get(session_id):
+      return
+    self._mark_removed(session_id, self.num_rows)
+    if self._path:
+      with open(
+          os.path.join(self._path, _REMOVED_FILE), 'a', encoding='utf-8'
+      ) as f:
+        removal = {'session_id': session_id, 'num_rows': self.num_rows}
+        f.write(json.dumps(removal) + '\n')
+
+  def _mark_removed(self, session_id: str, num_rows: int) -> None:
+    """Removes the rows of a session added before the first num_rows."""
+    session_rows = self._session_rows.pop(session_id, [])
+    rows = [row for row in session_rows if row < num_rows]
+    if len(rows) < len(session_rows):
+      self._session_rows[session_id] = session_rows[len(rows) :]
+    self._alive[rows] = False
+    for row in rows:
+      # The events of removed rows are not returned anymore.
+      self._events[row] = ''
+
+  def _save_meta(self) -> None:
+    if not self._path:
+      return
+    os.makedirs(self._path, exist_ok=True)
+    meta = {
+        'key': self._key,
+        'dtype': self._dtype.name,
+        'dim': self.dim,
+        'session_event_ids': self._session_event_ids,
+    }
+    meta_path = os.path.join(self._path, _META_FILE)
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+  def _score(
+      self, rows: Union[slice, np.ndarray], query: np.ndarray
+  ) -> np.ndarray:
+    vectors = self._vectors[rows]
+    if self._dtype == np.int8:
+      return (vectors.astype(np.float32) @ query) * self._scales[rows]
+    return vectors @ query
+
+  def _get_top_rows(
+      self, rows: np.ndarray, scores: np.ndarray, top_k: int
+  ) -> list[int]:
+    alive = self._alive[rows]
+    rows = rows[alive]
+    scores = scores[alive]
+    if len(rows) > top_k:
+      top = np.argpartition(-scores, top_k - 1)[:top_k]
+      rows = rows[top]
+      scores = scores[top]
+    return [int(row) for row in rows[np.argsort(-scores, kind='stable')]]
+
+  def _train(self, num_lists: int) -> None:
+    """Clusters the vectors with spherical k-means, and assigns each row to
+    its closest cluster."""
+    rng = np.random.default_rng(0)
+    sample_size = min(self.num_rows, num_lists * _MAX_TRAINING_ROWS_PER_LIST)
+    sample = self._decode(
+        np.sort(rng.choice(self.num_rows, sample_size, replace=False))
+    )
+    centroids = sample[rng.choice(len(sample), num_lists, replace=False)]
+    for _ in range(_KMEANS_ITERATIONS):
+      assignments = np.argmax(sample @ centroids.T, axis=1)
+      for i in range(num_lists):
+        members = sample[assignments == i]
+        if len(members):
+          centroids[i] = _normalize(members.sum(axis=0))
+        else:
+          centroids[i] = sample[rng.integers(len(sample))]
+    self._centroids = centroids
+    for start in range(0, self.num_rows, _CHUNK_SIZE):
+      stop = min(start + _CHUNK_SIZE, self.num_rows)
+      self._assignments[start:stop] = np.argmax(
+          self._decode(np.arange(start, stop)) @ centroids.T, axis=1
+      )
+    self._trained_rows = self.num_rows
+
+  def _decode(self, rows: np.ndarray) -> np.ndarray:
+    vectors = self._vectors[rows].astype(np.float32)
+    if self._dtype == np.int8:
+      vectors *= self._scales[rows][:, None]
+    return vectors
+
+
+def _quantize(
+    embeddings: np.ndarray, dtype: np.dtype
+) -> tuple[np.ndarray, Optional[np.ndarray]]:
+  """Returns the vectors to store, and their scales if quantized."""
+  if dtype != np.int8:
+    return embeddings.astype(np.float32), None
+  scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127
+  vectors = np.round(embeddings / scales[:, None]).astype(np.int8)
+  return vectors, scales.astype(np.float32)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+  return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def _get_text(event: Event) -> str:
+  if not event.content or not event.content.parts:
+    return ''
+  return '\n'.join(part.text for part in event.content.parts if part.text)
@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 from collections import OrderedDict
+import concurrent.futures
 import json
 import os
 import tempfile
+from typing import Any
+from typing import MutableMapping
+from typing import Optional
+from typing import Sequence
 
 from google.genai import types
 from typing_extensions import override
@@ -29,13 +36,28 @@ from .base_memory_service import SearchMemoryResponse
 
 
 class VertexAiRagMemoryService(BaseMemoryService):
-  """A memory service that uses Vertex AI RAG for storage and retrieval."""
+  """A memory service that uses Vertex AI RAG for storage and retrieval.
+
+  A session is usually added many times while it grows, so only the events
+  after the last uploaded event of the session are uploaded. Sessions
+  can be buffered with `batch_size` to upload several of them in one file.
+
+  The last uploaded event of each session is kept in `high_water_marks`, which
+  defaults to a dict in process memory. With the default, a restarted service
+  or another replica uploads the sessions again in full, and the events come
+  back as duplicate chunks; pass a persistent mapping shared by the replicas
+  to avoid that.
+  """
 
   def __init__(
       self,
       rag_corpus: str = None,
       similarity_top_k: int = None,
       vector_distance_threshold: float = 10,
+      *,
+      batch_size: int = 1,
+      rag_client: Any = None,
+      high_water_marks: Optional[MutableMapping[str, tuple[float, str]]] = None,
   ):
     """Initializes a VertexAiRagMemoryService.
 
@@ -46,56 +68,116 @@ class VertexAiRagMemoryService(BaseMemoryService):
         similarity_top_k: The number of contexts to retrieve.
         vector_distance_threshold: Only returns contexts with vector distance
           smaller than the threshold..
+        batch_size: The number of sessions to buffer before uploading them in
+          one file. Buffered sessions are not searchable until they are
+          uploaded, see `flush`.
+        rag_client: The client to upload files and query the corpus with,
+          which provides the `upload_file` and `retrieval_query` functions of
+          `vertexai.preview.rag`. Defaults to `vertexai.preview.rag`.
+        high_water_marks: The mapping that stores the timestamp and id of the
+          last uploaded event of each session, keyed by
+          ``{rag_corpus}/{app_name}/{user_id}/{session_id}``. Defaults to a
+          dict in process memory.
     """
+    if batch_size <= 0:
+      raise ValueError("batch_size should be greater than 0.")
     self.vertex_rag_store = types.VertexRagStore(
         rag_resources=[rag.RagResource(rag_corpus=rag_corpus)],
         similarity_top_k=similarity_top_k,
         vector_distance_threshold=vector_distance_threshold,
     )
+    self.batch_size = batch_size
+    self._rag_client = rag_client or rag
+    # The latest version of the sessions to upload, keyed by
+    # app_name/user_id/session_id.
+    self._pending_sessions: OrderedDict[str, Session] = OrderedDict()
+    self._high_water_marks = (
+        {} if high_water_marks is None else high_water_marks
+    )
 
   @override
   def add_session_to_memory(self, session: Session):
-    with tempfile.NamedTemporaryFile(
-        mode="w", delete=False, suffix=".txt"
-    ) as temp_file:
+    key = f"{session.app_name}/{session.user_id}/{session.id}"
+    self._pending_sessions.pop(key, None)
+    self._pending_sessions[key] = session
+    if len(self._pending_sessions) >= self.batch_size:
+      self.flush()
 
-      output_lines = []
-      for event in session.events:
-        if not event.content or not event.content.parts:
-          continue
-        text_parts = [
-            part.text.replace("\n", " ")
-            for part in event.content.parts
-            if part.text
-        ]
-        if text_parts:
-          output_lines.append(
-              json.dumps({
-                  "author": event.author,
-                  "timestamp": event.timestamp,
-                  "text": ".".join(text_parts),
-              })
-          )
-      output_string = "\n".join(output_lines)
-      temp_file.write(output_string)
-      temp_file_path = temp_file.name
+  def flush(self):
+    """Uploads the new events of the buffered sessions.
+
+    The sessions are uploaded in one file per RAG resource, concurrently. If
+    an upload fails, the sessions stay buffered, and only the resources that
+    failed are uploaded to again on the next flush.
+    """
+    if not self._pending_sessions:
+      return
+    sessions = list(self._pending_sessions.values())
+    # Resources with the same high-water marks upload the same file.
+    uploads: dict[str, list[str]] = {}
     for rag_resource in self.vertex_rag_store.rag_resources:
-      rag.upload_file(
-          corpus_name=rag_resource.rag_corpus,
-          path=temp_file_path,
-          # this is the temp workaround as upload file does not support
-          # adding metadata, thus use display_name to store the session info.
-          display_name=f"{session.app_name}.{session.user_id}.{session.id}",
-      )
+      corpus = rag_resource.rag_corpus
+      lines = _get_event_lines(sessions, corpus, self._high_water_marks)
+      if lines:
+        uploads.setdefault("\n".join(lines), []).append(corpus)
+    if not uploads:
+      self._pending_sessions.clear()
+      return
 
-    os.remove(temp_file_path)
+    if len(sessions) == 1:
+      session = sessions[0]
+      # upload_file doesn't support metadata, so the display name holds the
+      # session info.
+      display_name = f"{session.app_name}.{session.user_id}.{session.id}"
+    else:
+      display_name = f"{sessions[0].app_name}.batch.{sessions[0].id}"
+    temp_file_paths = []
+    try:
+      futures = {}
+      with concurrent.futures.ThreadPoolExecutor(
+          max_workers=sum(len(corpora) for corpora in uploads.values())
+      ) as executor:
+        for output_string, corpora in uploads.items():
+          with tempfile.NamedTemporaryFile(
+              mode="w", delete=False, suffix=".txt"
+          ) as temp_file:
+            temp_file.write(output_string)
+          temp_file_paths.append(temp_file.name)
+          for corpus in corpora:
+            future = executor.submit(
+                self._rag_client.upload_file,
+                corpus_name=corpus,
+                path=temp_file.name,
+                display_name=display_name,
+            )
+            futures[future] = corpus
+      error = None
+      for future, corpus in futures.items():
+        if future.exception():
+          error = error or future.exception()
+          continue
+        for session in sessions:
+          if not session.events:
+            continue
+          key = _high_water_mark_key(corpus, session)
+          last_event = session.events[-1]
+          high_water_mark = self._high_water_marks.get(key)
+          if high_water_mark and high_water_mark[0] > last_event.timestamp:
+            continue
+          self._high_water_marks[key] = (last_event.timestamp, last_event.id)
+      if error:
+        raise error
+      self._pending_sessions.clear()
+    finally:
+      for temp_file_path in temp_file_paths:
+        os.remove(temp_file_path)
 
   @override
   def search_memory(
       self, *, app_name: str, user_id: str, query: str
   ) -> SearchMemoryResponse:
     """Searches for sessions that match the query using rag.retrieval_query."""
-    response = rag.retrieval_query(
+    response = self._rag_client.retrieval_query(
         text=query,
         rag_resources=self.vertex_rag_store.rag_resources,
         rag_corpora=self.vertex_rag_store.rag_corpora,
@@ -110,8 +192,10 @@ class VertexAiRagMemoryService(BaseMemoryService):
       # TODO: Add server side filtering by app_name and user_id.
       # if not context.source_display_name.startswith(f"{app_name}.{user_id}."):
       #   continue
-      session_id = context.source_display_name.split(".")[-1]
-      events = []
+      # Files uploaded before events had a session id hold one session,
+      # whose id is in the display name.
+      default_session_id = context.source_display_name.split(".")[-1]
+      context_events: OrderedDict[str, list[Event]] = OrderedDict()
       if context.text:
         lines = context.text.split("\n")
 
@@ -123,22 +207,27 @@ class VertexAiRagMemoryService(BaseMemoryService):
           try:
             # Try to parse as JSON
             event_data = json.loads(line)
-
-            author = event_data.get("author", "")
-            timestamp = float(event_data.get("timestamp", 0))
-            text = event_data.get("text", "")
-
-            content = types.Content(parts=[types.Part(text=text)])
-            event = Event(author=author, timestamp=timestamp, content=content)
-            events.append(event)
           except json.JSONDecodeError:
             # Not valid JSON, skip this line
             continue
+          # A batch holds the events of several sessions.
+          if event_data.get("app_name", app_name) != app_name or (
+              event_data.get("user_id", user_id) != user_id
+          ):
+            continue
+
+          author = event_data.get("author", "")
+          timestamp = float(event_data.get("timestamp", 0))
+          text = event_data.get("text", "")
+
+          content = types.Content(parts=[types.Part(text=text)])
+          event = Event(author=author, timestamp=timestamp, content=content)
+          context_events.setdefault(
+              event_data.get("session_id", default_session_id), []
+          ).append(event)
 
-      if session_id in session_events_map:
-        session_events_map[session_id].append(events)
-      else:
-        session_events_map[session_id] = [events]
+      for session_id, events in context_events.items():
+        session_events_map.setdefault(session_id, []).append(events)
 
     # Remove overlap and combine events from the same session.
     for session_id, event_lists in session_events_map.items():
@@ -150,6 +239,58 @@ class VertexAiRagMemoryService(BaseMemoryService):
     return SearchMemoryResponse(memories=memory_results)
 
 
+def _high_water_mark_key(corpus: str, session: Session) -> str:
+  return f"{corpus}/{session.app_name}/{session.user_id}/{session.id}"
+
+
+def _get_new_events(
+    session: Session, high_water_mark: Optional[tuple[float, str]]
+) -> list[Event]:
+  """Returns the events of the session after the last uploaded event."""
+  if not high_water_mark:
+    return session.events
+  timestamp, event_id = high_water_mark
+  for i, event in enumerate(session.events):
+    if event.id == event_id:
+      return session.events[i + 1 :]
+  # The last uploaded event is no longer in the session.
+  return [event for event in session.events if event.timestamp > timestamp]
+
+
+def _get_event_lines(
+    sessions: Sequence[Session],
+    corpus: str,
+    high_water_marks: MutableMapping[str, tuple[float, str]],
+) -> list[str]:
+  """Returns the JSON lines of the text events not yet uploaded to the
+  corpus."""
+  output_lines = []
+  for session in sessions:
+    high_water_mark = high_water_marks.get(
+        _high_water_mark_key(corpus, session)
+    )
+    for event in _get_new_events(session, high_water_mark):
+      if not event.content or not event.content.parts:
+        continue
+      text_parts = [
+          part.text.replace("\n", " ")
+          for part in event.content.parts
+          if part.text
+      ]
+      if text_parts:
+        output_lines.append(
+            json.dumps({
+                "app_name": session.app_name,
+                "user_id": session.user_id,
+                "session_id": session.id,
+                "author": event.author,
+                "timestamp": event.timestamp,
+                "text": ".".join(text_parts),
+            })
+        )
+  return output_lines
+
+
 def _merge_event_lists(event_lists: list[list[Event]]) -> list[list[Event]]:
   """Merge event lists that have overlapping timestamps."""
   merged = []
@@ -15,15 +15,27 @@
 """Defines the interface to support a model."""
 
 from .base_llm import BaseLlm
+from .cached_llm import CachedLlm
+from .gemini_context_cache import GeminiContextCacheManager
 from .google_llm import Gemini
 from .llm_request import LlmRequest
 from .llm_response import LlmResponse
+from .llm_response_cache import InMemoryLlmResponseCache
+from .llm_response_cache import SqliteLlmResponseCache
+from .rate_limiter import RateLimiter
 from .registry import LLMRegistry
+from .routing_llm import RoutingLlm
 
 __all__ = [
     'BaseLlm',
+    'CachedLlm',
     'Gemini',
+    'GeminiContextCacheManager',
+    'InMemoryLlmResponseCache',
     'LLMRegistry',
+    'RateLimiter',
+    'RoutingLlm',
+    'SqliteLlmResponseCache',
 ]
 
 
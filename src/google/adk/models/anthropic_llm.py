@@ -26,7 +26,7 @@ from typing import Literal
 from typing import Optional, Union
 from typing import TYPE_CHECKING
 
-from anthropic import AnthropicVertex
+from anthropic import AsyncAnthropicVertex
 from anthropic import NOT_GIVEN
 from anthropic import types as anthropic_types
 from google.genai import types
@@ -139,15 +139,13 @@ def message_to_generate_content_response(
           role="model",
           parts=[content_block_to_part(cb) for cb in message.content],
       ),
-      # TODO: Deal with these later.
-      # finish_reason=to_google_genai_finish_reason(message.stop_reason),
-      # usage_metadata=types.GenerateContentResponseUsageMetadata(
-      #     prompt_token_count=message.usage.input_tokens,
-      #     candidates_token_count=message.usage.output_tokens,
-      #     total_token_count=(
-      #         message.usage.input_tokens + message.usage.output_tokens
-      #     ),
-      # ),
+      usage_metadata=types.GenerateContentResponseUsageMetadata(
+          prompt_token_count=message.usage.input_tokens,
+          candidates_token_count=message.usage.output_tokens,
+          total_token_count=(
+              message.usage.input_tokens + message.usage.output_tokens
+          ),
+      ),
   )
 
 
@@ -203,16 +201,17 @@ class Claude(BaseLlm):
           function_declaration_to_tool_param(tool)
           for tool in llm_request.config.tools[0].function_declarations
       ]
+    # Claude may request several tools in one message, which become several
+    # function call parts of one response.
     tool_choice = (
         anthropic_types.ToolChoiceAutoParam(
             type="auto",
-            # TODO: allow parallel tool use.
-            disable_parallel_tool_use=True,
+            disable_parallel_tool_use=False,
         )
         if llm_request.tools_dict
         else NOT_GIVEN
     )
-    message = self._anthropic_client.messages.create(
+    message_params = dict(
         model=llm_request.model,
         system=llm_request.config.system_instruction,
         messages=messages,
@@ -220,6 +219,22 @@ class Claude(BaseLlm):
         tool_choice=tool_choice,
         max_tokens=MAX_TOKEN,
     )
+    if stream:
+      async with self._anthropic_client.messages.stream(
+          **message_params
+      ) as message_stream:
+        async for event in message_stream:
+          if event.type == "text" and event.text:
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=event.text)],
+                ),
+                partial=True,
+            )
+        message = await message_stream.get_final_message()
+    else:
+      message = await self._anthropic_client.messages.create(**message_params)
     logger.info(
         "Claude response: %s",
         message.model_dump_json(indent=2, exclude_none=True),
@@ -227,7 +242,7 @@ class Claude(BaseLlm):
     yield message_to_generate_content_response(message)
 
   @cached_property
-  def _anthropic_client(self) -> AnthropicVertex:
+  def _anthropic_client(self) -> AsyncAnthropicVertex:
     if (
         "GOOGLE_CLOUD_PROJECT" not in os.environ
         or "GOOGLE_CLOUD_LOCATION" not in os.environ
@@ -237,7 +252,7 @@ class Claude(BaseLlm):
           " Anthropic on Vertex."
       )
 
-    return AnthropicVertex(
+    return AsyncAnthropicVertex(
         project_id=os.environ["GOOGLE_CLOUD_PROJECT"],
         region=os.environ["GOOGLE_CLOUD_LOCATION"],
     )
@@ -15,12 +15,14 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from typing import AsyncGenerator
+from typing import Optional
 from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
 
 from .base_llm_connection import BaseLlmConnection
+from .rate_limiter import RateLimiter
 
 if TYPE_CHECKING:
   from .llm_request import LlmRequest
@@ -32,6 +34,10 @@ class BaseLlm(BaseModel):
 
   Attributes:
     model: The name of the LLM, e.g. gemini-1.5-flash or gemini-1.5-flash-001.
+    rate_limiter: Queues, throttles and retries the calls of agents to the
+      LLM, including the calls of a RoutingLlm to its routes and of a
+      SummarizingCompactor. Can be shared by several LLMs. For a wrapper like
+      CachedLlm, set it on the wrapper.
     model_config: The model config
   """
 
@@ -44,6 +50,10 @@ class BaseLlm(BaseModel):
   model: str
   """The name of the LLM, e.g. gemini-1.5-flash or gemini-1.5-flash-001."""
 
+  rate_limiter: Optional[RateLimiter] = None
+  """Queues, throttles and retries the calls of agents to the LLM. Can be
+  shared by several LLMs."""
+
   @classmethod
   def supported_models(cls) -> list[str]:
     """Returns a list of supported models in regex for LlmRegistry."""
@@ -0,0 +1,128 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any
+from typing import AsyncGenerator
+
+from pydantic import model_validator
+from typing_extensions import override
+
+from .base_llm import BaseLlm
+from .base_llm_connection import BaseLlmConnection
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from .llm_response_cache import BaseLlmResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLlm(BaseLlm):
+  """A model that caches the responses of another model.
+
+  Identical requests, e.g. from evaluation reruns or deterministic pipeline
+  steps, are answered from the cache instead of calling the model. A cached
+  streaming call replays all of its chunks. Responses with an error are not
+  cached, and live connections are not cached.
+
+  Example:
+  ```python
+  agent = Agent(
+      model=CachedLlm(
+          llm=Gemini(model='gemini-2.0-flash'),
+          cache=InMemoryLlmResponseCache(ttl=3600),
+      ),
+      ...
+  )
+  ```
+
+  Attributes:
+    llm: The model to cache the responses of.
+    cache: The cache to store the responses in.
+  """
+
+  llm: BaseLlm
+  """The model to cache the responses of."""
+
+  cache: BaseLlmResponseCache
+  """The cache to store the responses in."""
+
+  @model_validator(mode='before')
+  @classmethod
+  def _populate_model(cls, data: Any) -> Any:
+    if isinstance(data, dict) and 'model' not in data and 'llm' in data:
+      data['model'] = data['llm'].model
+    return data
+
+  @override
+  async def generate_content_async(
+      self, llm_request: LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[LlmResponse, None]:
+    key = get_llm_request_key(self.llm.model, llm_request, stream)
+    if (responses := self.cache.get(key)) is not None:
+      logger.debug('LLM response cache hit: %s', key)
+      for response in responses:
+        yield response
+      return
+
+    responses = []
+    async for response in self.llm.generate_content_async(
+        llm_request, stream=stream
+    ):
+      responses.append(response.model_copy(deep=True))
+      yield response
+    if responses and not any(
+        response.error_code or response.interrupted for response in responses
+    ):
+      self.cache.set(key, responses)
+
+  @override
+  def connect(self, llm_request: LlmRequest) -> BaseLlmConnection:
+    return self.llm.connect(llm_request)
+
+
+def get_llm_request_key(
+    model: str, llm_request: LlmRequest, stream: bool
+) -> str:
+  """Returns a hash that is the same for identical requests.
+
+  The hash covers the model, the contents, the config including the tool
+  declarations, and whether the call is streaming.
+  """
+  data = {
+      'model': model,
+      'stream': stream,
+      'request': llm_request.model_dump(
+          exclude={'live_connect_config'}, exclude_none=True
+      ),
+  }
+  canonical = json.dumps(
+      data, sort_keys=True, separators=(',', ':'), default=_to_json
+  )
+  return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _to_json(value: Any) -> Any:
+  if isinstance(value, bytes):
+    return hashlib.sha256(value).hexdigest()
+  if isinstance(value, type):
+    # e.g. a pydantic model as the response schema.
+    if hasattr(value, 'model_json_schema'):
+      return value.model_json_schema()
+    return f'{value.__module__}.{value.__qualname__}'
+  return repr(value)
@@ -0,0 +1,326 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import hashlib
+import logging
+import time
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from google.genai import types
+
+from .llm_request import LlmRequest
+from .token_estimator import estimate_request_tokens
+
+if TYPE_CHECKING:
+  from google.genai import Client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class _CachedPrefix:
+  name: str
+  """The resource name of the cached content."""
+  content_keys: tuple[str, ...]
+  """The hashes of the contents in the cache."""
+  expire_time: float
+
+
+class GeminiContextCacheManager:
+  """Caches the stable prefix of Gemini requests with context caching.
+
+  A long running agent resends the same system instruction, tool declarations
+  and conversation history on every turn. The manager stores this prefix in a
+  Gemini cached content, and sends only the new contents with a reference to
+  the cache. The prefix is the system instruction, the tools and all but the
+  last content of the request.
+
+  A cache is reused as long as the request starts with the cached contents.
+  Once the contents that are not cached grow past `min_tokens`, a longer
+  cache is created. Caches are refreshed when they are about to expire, and
+  deleted when evicted.
+
+  Example:
+  ```python
+  agent = Agent(
+      model=Gemini(
+          model='gemini-2.0-flash-001',
+          context_cache_manager=GeminiContextCacheManager(ttl=1800),
+      ),
+      ...
+  )
+  ```
+
+  Attributes:
+    ttl: The number of seconds a cache lives without being used.
+    min_tokens: The estimated min number of tokens of a prefix to cache. It
+      should be at least the minimum of the model, e.g. 4096 tokens for
+      Gemini 1.5 models.
+    max_caches: The max number of caches. The least recently used caches are
+      deleted first.
+    hits: The number of requests sent with a cache.
+    misses: The number of requests sent without a cache.
+    creations: The number of caches created.
+    failures: The number of caches that failed to be created or refreshed.
+  """
+
+  def __init__(
+      self,
+      *,
+      ttl: float = 3600,
+      min_tokens: int = 4096,
+      max_caches: int = 100,
+  ):
+    if ttl <= 0:
+      raise ValueError('ttl should be greater than 0.')
+    if max_caches <= 0:
+      raise ValueError('max_caches should be greater than 0.')
+    self.ttl = ttl
+    self.min_tokens = min_tokens
+    self.max_caches = max_caches
+    self.hits = 0
+    self.misses = 0
+    self.creations = 0
+    self.failures = 0
+    # The caches of each model, system instruction and tools, most recently
+    # used last.
+    self._caches: collections.OrderedDict[str, list[_CachedPrefix]] = (
+        collections.OrderedDict()
+    )
+    # The prefixes that failed to be cached, e.g. because the model does not
+    # support caching, and the time until which they are not retried.
+    self._failed_until: dict[str, float] = {}
+
+  @property
+  def hit_rate(self) -> float:
+    """The ratio of the requests sent with a cache."""
+    total = self.hits + self.misses
+    return self.hits / total if total else 0.0
+
+  async def prepare_request(
+      self,
+      client: Client,
+      model: str,
+      contents: list[types.Content],
+      config: Optional[types.GenerateContentConfig],
+  ) -> tuple[list[types.Content], Optional[types.GenerateContentConfig]]:
+    """Returns the contents and config to send, using a cache if possible.
+
+    The arguments are not modified.
+
+    Args:
+      client: The API client to manage the caches with.
+      model: The model of the request.
+      contents: The contents of the request.
+      config: The config of the request.
+
+    Returns:
+      The contents and config to send. If a cache is used, the cached contents
+      are removed from the contents, and the config references the cache
+      instead of holding the system instruction and tools.
+    """
+    if config and config.cached_content:
+      return contents, config
+
+    static_key = _get_static_key(model, config)
+    content_keys = tuple(_hash(content) for content in contents)
+    # The last content is new in each request, so it is never cached.
+    prefix_length = max(len(contents) - 1, 0)
+    cached_prefix = self._find_cached_prefix(
+        static_key, content_keys[:prefix_length]
+    )
+
+    cached_length = len(cached_prefix.content_keys) if cached_prefix else 0
+    if self._is_worth_caching(
+        static_key,
+        # The system instruction and tools are already in a cache.
+        None if cached_prefix else config,
+        contents[cached_length:prefix_length],
+    ):
+      cached_prefix = (
+          await self._create_cache(
+              client,
+              model,
+              static_key,
+              contents[:prefix_length],
+              content_keys[:prefix_length],
+              config,
+          )
+          or cached_prefix
+      )
+    elif cached_prefix:
+      await self._maybe_refresh_cache(client, cached_prefix)
+
+    if not cached_prefix:
+      self.misses += 1
+      return contents, config
+    self.hits += 1
+    config = (config or types.GenerateContentConfig()).model_copy(
+        update={
+            'cached_content': cached_prefix.name,
+            'system_instruction': None,
+            'tools': None,
+            'tool_config': None,
+        }
+    )
+    return contents[len(cached_prefix.content_keys) :], config
+
+  async def clear(self, client: Client) -> None:
+    """Deletes all the caches."""
+    caches = [
+        cached_prefix
+        for cached_prefixes in self._caches.values()
+        for cached_prefix in cached_prefixes
+    ]
+    self._caches.clear()
+    for cached_prefix in caches:
+      await _delete_cache(client, cached_prefix.name)
+
+  def _find_cached_prefix(
+      self, static_key: str, content_keys: tuple[str, ...]
+  ) -> Optional[_CachedPrefix]:
+    """Returns the longest valid cache that the contents start with."""
+    cached_prefixes = self._caches.get(static_key)
+    if not cached_prefixes:
+      return None
+    now = time.time()
+    cached_prefixes[:] = [c for c in cached_prefixes if c.expire_time > now]
+    matches = [
+        cached_prefix
+        for cached_prefix in cached_prefixes
+        if content_keys[: len(cached_prefix.content_keys)]
+        == cached_prefix.content_keys
+    ]
+    if not matches:
+      return None
+    self._caches.move_to_end(static_key)
+    return max(matches, key=lambda c: len(c.content_keys))
+
+  def _is_worth_caching(
+      self,
+      static_key: str,
+      config: Optional[types.GenerateContentConfig],
+      contents: list[types.Content],
+  ) -> bool:
+    """Returns whether the uncached part of a prefix is large enough."""
+    if self._failed_until.get(static_key, 0) > time.time():
+      return False
+    tokens = estimate_request_tokens(
+        LlmRequest(contents=contents, config=config)
+    )
+    return tokens >= self.min_tokens
+
+  async def _create_cache(
+      self,
+      client: Client,
+      model: str,
+      static_key: str,
+      contents: list[types.Content],
+      content_keys: tuple[str, ...],
+      config: Optional[types.GenerateContentConfig],
+  ) -> Optional[_CachedPrefix]:
+    try:
+      cached_content = await client.aio.caches.create(
+          model=model,
+          config=types.CreateCachedContentConfig(
+              contents=contents or None,
+              system_instruction=config.system_instruction if config else None,
+              tools=config.tools if config else None,
+              tool_config=config.tool_config if config else None,
+              ttl=f'{int(self.ttl)}s',
+          ),
+      )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      logger.warning('Failed to create a context cache: %s', e)
+      self.failures += 1
+      self._failed_until[static_key] = time.time() + self.ttl
+      return None
+    self.creations += 1
+    cached_prefix = _CachedPrefix(
+        name=cached_content.name,
+        content_keys=content_keys,
+        expire_time=_get_expire_time(cached_content, self.ttl),
+    )
+    self._caches.setdefault(static_key, []).append(cached_prefix)
+    self._caches.move_to_end(static_key)
+    await self._evict(client)
+    return cached_prefix
+
+  async def _maybe_refresh_cache(
+      self, client: Client, cached_prefix: _CachedPrefix
+  ) -> None:
+    """Extends the ttl of a cache that is used, before it expires."""
+    if cached_prefix.expire_time - time.time() > self.ttl / 2:
+      return
+    try:
+      cached_content = await client.aio.caches.update(
+          name=cached_prefix.name,
+          config=types.UpdateCachedContentConfig(ttl=f'{int(self.ttl)}s'),
+      )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+      logger.warning(
+          'Failed to refresh context cache %s: %s', cached_prefix.name, e
+      )
+      self.failures += 1
+      return
+    cached_prefix.expire_time = _get_expire_time(cached_content, self.ttl)
+
+  async def _evict(self, client: Client) -> None:
+    while (
+        sum(len(cached_prefixes) for cached_prefixes in self._caches.values())
+        > self.max_caches
+    ):
+      static_key, cached_prefixes = next(iter(self._caches.items()))
+      cached_prefix = cached_prefixes.pop(0)
+      if not cached_prefixes:
+        del self._caches[static_key]
+      await _delete_cache(client, cached_prefix.name)
+
+
+def _get_static_key(
+    model: str, config: Optional[types.GenerateContentConfig]
+) -> str:
+  """Returns a hash of the parts of a request that are cached besides the
+  contents."""
+  data = model
+  if config:
+    data += config.model_dump_json(
+        include={'system_instruction', 'tools', 'tool_config'},
+        exclude_none=True,
+    )
+  return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _hash(content: types.Content) -> str:
+  return hashlib.sha256(
+      content.model_dump_json(exclude_none=True).encode()
+  ).hexdigest()
+
+
+def _get_expire_time(cached_content: types.CachedContent, ttl: float) -> float:
+  if cached_content.expire_time:
+    return cached_content.expire_time.timestamp()
+  return time.time() + ttl
+
+
+async def _delete_cache(client: Client, name: str) -> None:
+  try:
+    await client.aio.caches.delete(name=name)
+  except Exception as e:  # pylint: disable=broad-exception-caught
+    logger.warning('Failed to delete context cache %s: %s', name, e)
@@ -13,13 +13,17 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
 import contextlib
 from functools import cached_property
 import logging
 import sys
+import threading
 from typing import AsyncGenerator
 from typing import cast
+from typing import Optional
 from typing import TYPE_CHECKING
+import weakref
 
 from google.genai import Client
 from google.genai import types
@@ -28,8 +32,11 @@ from typing_extensions import override
 from .. import version
 from .base_llm import BaseLlm
 from .base_llm_connection import BaseLlmConnection
+from .gemini_context_cache import GeminiContextCacheManager
 from .gemini_llm_connection import GeminiLlmConnection
 from .llm_response import LlmResponse
+from .registry import _get_backend_config
+from .registry import _get_loop_cache
 
 if TYPE_CHECKING:
   from .llm_request import LlmRequest
@@ -39,16 +46,49 @@ logger = logging.getLogger(__name__)
 _NEW_LINE = '\n'
 _EXCLUDED_PART_FIELD = {'inline_data': {'data'}}
 
+_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[tuple[str, tuple[Optional[str], ...]], Client],
+] = weakref.WeakKeyDictionary()
+"""The API clients shared by all Gemini instances of each event loop, keyed by
+the http options and the backend config."""
+_clients_lock = threading.Lock()
+
+
+def _get_client(http_options: types.HttpOptions) -> Client:
+  """Returns the shared API client for the http options and backend config.
+
+  Creating a client sets up a new HTTP transport, so clients are reused to keep
+  their connections alive across models, agents and turns. The async transport
+  is bound to the event loop it is first used in, so clients are shared within
+  the running event loop, and outside of an event loop a new client is
+  returned.
+  """
+  key = (http_options.model_dump_json(), _get_backend_config())
+  with _clients_lock:
+    clients = _get_loop_cache(_clients)
+    if clients is None:
+      return Client(http_options=http_options)
+    if key not in clients:
+      clients[key] = Client(http_options=http_options)
+    return clients[key]
+
 
 class Gemini(BaseLlm):
   """Integration for Gemini models.
 
   Attributes:
     model: The name of the Gemini model.
+    context_cache_manager: Caches the stable prefix of the requests with
+      Gemini context caching.
   """
 
   model: str = 'gemini-1.5-flash'
 
+  context_cache_manager: Optional[GeminiContextCacheManager] = None
+  """Caches the stable prefix of the requests with Gemini context caching. If
+  not set, the whole request is sent on every call."""
+
   @staticmethod
   @override
   def supported_models() -> list[str]:
@@ -88,11 +128,17 @@ class Gemini(BaseLlm):
     )
     logger.info(_build_request_log(llm_request))
 
+    contents, config = llm_request.contents, llm_request.config
+    if self.context_cache_manager:
+      contents, config = await self.context_cache_manager.prepare_request(
+          self.api_client, llm_request.model, contents, config
+      )
+
     if stream:
       responses = await self.api_client.aio.models.generate_content_stream(
           model=llm_request.model,
-          contents=llm_request.contents,
-          config=llm_request.config,
+          contents=contents,
+          config=config,
       )
       response = None
       text = ''
@@ -134,13 +180,14 @@ class Gemini(BaseLlm):
             content=types.ModelContent(
                 parts=[types.Part.from_text(text=text)],
             ),
+            usage_metadata=response.usage_metadata,
         )
 
     else:
       response = await self.api_client.aio.models.generate_content(
           model=llm_request.model,
-          contents=llm_request.contents,
-          config=llm_request.config,
+          contents=contents,
+          config=config,
       )
       logger.info(_build_response_log(response))
       yield LlmResponse.create(response)
@@ -152,9 +199,7 @@ class Gemini(BaseLlm):
     Returns:
       The api client.
     """
-    return Client(
-        http_options=types.HttpOptions(headers=self._tracking_headers)
-    )
+    return _get_client(types.HttpOptions(headers=self._tracking_headers))
 
   @cached_property
   def _api_backend(self) -> str:
@@ -175,14 +220,12 @@ class Gemini(BaseLlm):
   def _live_api_client(self) -> Client:
     if self._api_backend == 'vertex':
       # use default api version for vertex
-      return Client(
-          http_options=types.HttpOptions(headers=self._tracking_headers)
-      )
+      return _get_client(types.HttpOptions(headers=self._tracking_headers))
     else:
       # use v1alpha for ml_dev
       api_version = 'v1alpha'
-      return Client(
-          http_options=types.HttpOptions(
+      return _get_client(
+          types.HttpOptions(
               headers=self._tracking_headers, api_version=api_version
           )
       )
@@ -61,6 +61,7 @@ class FunctionChunk(BaseModel):
   id: Optional[str]
   name: Optional[str]
   args: Optional[str]
+  index: Optional[int] = 0
 
 
 class TextChunk(BaseModel):
@@ -95,7 +96,9 @@ class LiteLLMClient:
   def completion(
       self, model, messages, tools, stream=False, **kwargs
   ) -> Union[ModelResponse, CustomStreamWrapper]:
-    """Synchronously calls completion. This is used for streaming only.
+    """Synchronously calls completion.
+
+    LiteLlm streams with acompletion, so that it does not block the event loop.
 
     Args:
       model: The model to use.
@@ -374,6 +377,7 @@ def _model_response_to_chunk(
               id=tool_call.id,
               name=tool_call.function.name,
               args=tool_call.function.arguments,
+              index=getattr(tool_call, "index", 0),
           ), finish_reason
 
     if finish_reason and not (
@@ -403,7 +407,15 @@ def _model_response_to_generate_content_response(
 
   if not message:
     raise ValueError("No message in response")
-  return _message_to_generate_content_response(message)
+  llm_response = _message_to_generate_content_response(message)
+  usage = response.get("usage", None)
+  if usage and usage.get("total_tokens", None):
+    llm_response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=usage.get("prompt_tokens", None),
+        candidates_token_count=usage.get("completion_tokens", None),
+        total_token_count=usage.get("total_tokens", None),
+    )
+  return llm_response
 
 
 def _message_to_generate_content_response(
@@ -624,18 +636,22 @@ class LiteLlm(BaseLlm):
 
     if stream:
       text = ""
-      function_name = ""
-      function_args = ""
-      function_id = None
+      # The chunks of parallel tool calls are interleaved, and told apart by
+      # their index.
+      function_calls: dict[int, FunctionChunk] = {}
       completion_args["stream"] = True
-      for part in self.llm_client.completion(**completion_args):
+      async for part in await self.llm_client.acompletion(**completion_args):
         for chunk, finish_reason in _model_response_to_chunk(part):
           if isinstance(chunk, FunctionChunk):
+            index = chunk.index or 0
+            if index not in function_calls:
+              function_calls[index] = FunctionChunk(id=None, name="", args="")
+            function_call = function_calls[index]
             if chunk.name:
-              function_name += chunk.name
+              function_call.name += chunk.name
             if chunk.args:
-              function_args += chunk.args
-            function_id = chunk.id or function_id
+              function_call.args += chunk.args
+            function_call.id = chunk.id or function_call.id
           elif isinstance(chunk, TextChunk):
             text += chunk.text
             yield _message_to_generate_content_response(
@@ -645,7 +661,7 @@ class LiteLlm(BaseLlm):
                 ),
                 is_partial=True,
             )
-          if finish_reason == "tool_calls" and function_id:
+          if finish_reason == "tool_calls" and function_calls:
             yield _message_to_generate_content_response(
                 ChatCompletionAssistantMessage(
                     role="assistant",
@@ -653,18 +669,18 @@ class LiteLlm(BaseLlm):
                     tool_calls=[
                         ChatCompletionMessageToolCall(
                             type="function",
-                            id=function_id,
+                            id=function_call.id,
                             function=Function(
-                                name=function_name,
-                                arguments=function_args,
+                                name=function_call.name,
+                                arguments=function_call.args,
                             ),
                         )
+                        for _, function_call in sorted(function_calls.items())
+                        if function_call.id
                     ],
                 )
             )
-            function_name = ""
-            function_args = ""
-            function_id = None
+            function_calls = {}
           elif finish_reason == "stop" and text:
             yield _message_to_generate_content_response(
                 ChatCompletionAssistantMessage(role="assistant", content=text)
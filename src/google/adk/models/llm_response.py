@@ -29,6 +29,7 @@ class LlmResponse(BaseModel):
   Attributes:
     content: The content of the response.
     grounding_metadata: The grounding metadata of the response.
+    usage_metadata: The token usage of the request and response.
     partial: Indicates whether the text content is part of a unfinished text
       stream. Only used for streaming mode and when the content is plain text.
     turn_complete: Indicates whether the response from the model is complete.
@@ -48,6 +49,12 @@ class LlmResponse(BaseModel):
   grounding_metadata: Optional[types.GroundingMetadata] = None
   """The grounding metadata of the response."""
 
+  usage_metadata: Optional[types.GenerateContentResponseUsageMetadata] = None
+  """The token usage of the request and response.
+
+  In streaming mode, it is the usage so far, and only set on some responses.
+  """
+
   partial: Optional[bool] = None
   """Indicates whether the text content is part of a unfinished text stream.
 
@@ -91,11 +98,13 @@ class LlmResponse(BaseModel):
         return LlmResponse(
             content=candidate.content,
             grounding_metadata=candidate.grounding_metadata,
+            usage_metadata=generate_content_response.usage_metadata,
         )
       else:
         return LlmResponse(
             error_code=candidate.finish_reason,
             error_message=candidate.finish_message,
+            usage_metadata=generate_content_response.usage_metadata,
         )
     else:
       if generate_content_response.prompt_feedback:
@@ -103,6 +112,7 @@ class LlmResponse(BaseModel):
         return LlmResponse(
             error_code=prompt_feedback.block_reason,
             error_message=prompt_feedback.block_reason_message,
+            usage_metadata=generate_content_response.usage_metadata,
         )
       else:
         return LlmResponse(
@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import abc
+import collections
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .llm_response import LlmResponse
+
+
+class BaseLlmResponseCache(abc.ABC):
+  """Base class for the caches of LLM responses.
+
+  An entry holds all the responses that a model yielded for one request: one
+  response for a non-streaming call, or all the chunks of a streaming call.
+
+  Attributes:
+    ttl: The number of seconds an entry stays valid. If not set, entries never
+      expire.
+    max_entries: The max number of entries. The least recently used entries
+      are evicted first.
+    hits: The number of lookups that found a valid entry.
+    misses: The number of lookups that did not find a valid entry.
+    evictions: The number of entries evicted to respect `max_entries`.
+  """
+
+  def __init__(self, *, ttl: Optional[float] = None, max_entries: int = 1000):
+    if max_entries <= 0:
+      raise ValueError('max_entries should be greater than 0.')
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, key: str) -> Optional[list[LlmResponse]]:
+    """Returns the cached responses, or None if there is no valid entry."""
+    responses = self._get(key)
+    if responses is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+    return responses
+
+  def set(self, key: str, responses: list[LlmResponse]) -> None:
+    """Caches the responses of a request."""
+    self.evictions += self._set(key, responses)
+
+  @abc.abstractmethod
+  def _get(self, key: str) -> Optional[list[LlmResponse]]:
+    """Returns the cached responses, or None if there is no valid entry."""
+
+  @abc.abstractmethod
+  def _set(self, key: str, responses: list[LlmResponse]) -> int:
+    """Caches the responses and returns the number of evicted entries."""
+
+  @abc.abstractmethod
+  def clear(self) -> None:
+    """Removes all the entries."""
+
+  def _is_expired(self, created_at: float) -> bool:
+    return self.ttl is not None and time.time() - created_at > self.ttl
+
+
+class InMemoryLlmResponseCache(BaseLlmResponseCache):
+  """An in-memory LRU cache of LLM responses."""
+
+  def __init__(self, *, ttl: Optional[float] = None, max_entries: int = 1000):
+    super().__init__(ttl=ttl, max_entries=max_entries)
+    self._entries: collections.OrderedDict[
+        str, tuple[float, list[LlmResponse]]
+    ] = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def _get(self, key: str) -> Optional[list[LlmResponse]]:
+    with self._lock:
+      entry = self._entries.get(key)
+      if not entry:
+        return None
+      created_at, responses = entry
+      if self._is_expired(created_at):
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+    # Callers may modify the responses, so they get copies.
+    return [response.model_copy(deep=True) for response in responses]
+
+  def _set(self, key: str, responses: list[LlmResponse]) -> int:
+    responses = [response.model_copy(deep=True) for response in responses]
+    with self._lock:
+      self._entries[key] = (time.time(), responses)
+      self._entries.move_to_end(key)
+      evicted = 0
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        evicted += 1
+    return evicted
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+
+
+class SqliteLlmResponseCache(BaseLlmResponseCache):
+  """An on-disk cache of LLM responses, stored in a SQLite database.
+
+  The cache survives restarts, and can be shared by the processes on one host.
+  """
+
+  def __init__(
+      self,
+      db_path: str,
+      *,
+      ttl: Optional[float] = None,
+      max_entries: int = 10000,
+  ):
+    """Initializes the SqliteLlmResponseCache.
+
+    Args:
+      db_path: The path of the SQLite database file.
+      ttl: The number of seconds an entry stays valid. If not set, entries
+        never expire.
+      max_entries: The max number of entries. The least recently used entries
+        are evicted first.
+    """
+    super().__init__(ttl=ttl, max_entries=max_entries)
+    self._lock = threading.Lock()
+    self._connection = sqlite3.connect(
+        db_path, check_same_thread=False, isolation_level=None
+    )
+    self._connection.execute('PRAGMA journal_mode=WAL')
+    self._connection.execute(
+        'CREATE TABLE IF NOT EXISTS llm_responses (key TEXT PRIMARY KEY,'
+        ' responses TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL'
+        ' NOT NULL)'
+    )
+    self._connection.execute(
+        'CREATE INDEX IF NOT EXISTS ix_llm_responses_accessed_at ON'
+        ' llm_responses (accessed_at)'
+    )
+
+  def _get(self, key: str) -> Optional[list[LlmResponse]]:
+    with self._lock:
+      row = self._connection.execute(
+          'SELECT responses, created_at FROM llm_responses WHERE key = ?',
+          (key,),
+      ).fetchone()
+      if not row:
+        return None
+      if self._is_expired(row[1]):
+        self._connection.execute(
+            'DELETE FROM llm_responses WHERE key = ?', (key,)
+        )
+        return None
+      self._connection.execute(
+          'UPDATE llm_responses SET accessed_at = ? WHERE key = ?',
+          (time.time(), key),
+      )
+    return [
+        LlmResponse.model_validate(response) for response in json.loads(row[0])
+    ]
+
+  def _set(self, key: str, responses: list[LlmResponse]) -> int:
+    data = json.dumps([
+        response.model_dump(mode='json', exclude_none=True)
+        for response in responses
+    ])
+    now = time.time()
+    with self._lock:
+      self._connection.execute(
+          'INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)',
+          (key, data, now, now),
+      )
+      cursor = self._connection.execute(
+          'DELETE FROM llm_responses WHERE key IN (SELECT key FROM'
+          ' llm_responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+          (self.max_entries,),
+      )
+    return cursor.rowcount
+
+  def clear(self) -> None:
+    with self._lock:
+      self._connection.execute('DELETE FROM llm_responses')
+
+  def close(self) -> None:
+    """Closes the database connection."""
+    with self._lock:
+      self._connection.close()
@@ -0,0 +1,335 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncGenerator
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+
+if TYPE_CHECKING:
+  from .base_llm import BaseLlm
+  from .llm_request import LlmRequest
+  from .llm_response import LlmResponse
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter('gcp.vertex.agent')
+
+_queue_depth_counter = meter.create_up_down_counter(
+    'gcp.vertex.agent.llm.queue_depth',
+    unit='{request}',
+    description='Number of llm calls waiting for the rate limiter.',
+)
+_throttle_counter = meter.create_counter(
+    'gcp.vertex.agent.llm.throttles',
+    unit='{response}',
+    description='Number of llm calls rejected for quota or overload.',
+)
+_retry_counter = meter.create_counter(
+    'gcp.vertex.agent.llm.retries',
+    unit='{request}',
+    description='Number of retried llm calls.',
+)
+
+# Quota exhausted and overloaded, which lower the rate.
+_THROTTLE_STATUS_CODES = frozenset({429, 503})
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class _ModelState:
+  """The rate limiting state of a model."""
+
+  def __init__(self, rate: float, burst: float):
+    self.rate = rate
+    self.tokens = burst
+    self.updated_at = time.monotonic()
+    self.queue_depth = 0
+    self.throttles = 0
+    self.retries = 0
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._lock: Optional[asyncio.Lock] = None
+    self._semaphore: Optional[asyncio.Semaphore] = None
+
+  def bind(
+      self, max_concurrent_calls: int
+  ) -> tuple[asyncio.Lock, asyncio.Semaphore]:
+    """Returns the queue lock and the concurrency semaphore of the running
+    event loop.
+
+    asyncio primitives can't be shared between event loops, e.g. of the
+    threads of `Runner.run`, so they are recreated when the loop changes.
+    """
+    loop = asyncio.get_running_loop()
+    if loop is not self._loop:
+      self._loop = loop
+      self._lock = asyncio.Lock()
+      self._semaphore = asyncio.Semaphore(max_concurrent_calls)
+    return self._lock, self._semaphore
+
+
+class RateLimiter:
+  """A client-side rate limiter and retry scheduler for model calls.
+
+  Calls are queued in order and sent at the rate of a token bucket per model.
+  The rate adapts to the quota of the provider with AIMD: it grows by
+  `rate_increase` after each successful call up to `requests_per_second`, and
+  is multiplied by `rate_decrease` when a call is throttled (HTTP 429 or
+  503). Failed calls that are retryable are retried with jittered exponential
+  backoff, unless they already yielded responses.
+
+  A rate limiter can be shared by several models, e.g. to apply the quota of
+  a project to all the agents of an app. Its state is kept per model name.
+
+  Example:
+  ```python
+  rate_limiter = RateLimiter(requests_per_second=5)
+  agent = Agent(
+      model=Gemini(model='gemini-2.0-flash', rate_limiter=rate_limiter),
+      ...
+  )
+  ```
+
+  Attributes:
+    requests_per_second: The max rate of calls per model.
+    min_requests_per_second: The min rate of calls per model, however much
+      the calls are throttled.
+    burst: The max number of calls per model sent at once after an idle
+      period.
+    max_concurrent_calls: The max number of calls per model in flight. A
+      streaming call counts until its first response.
+    rate_increase: The number of calls per second added to the rate after a
+      successful call.
+    rate_decrease: The factor applied to the rate after a throttled call.
+    max_retries: The max number of times a call is retried.
+    initial_retry_delay: The max delay in seconds before the first retry.
+    max_retry_delay: The max delay in seconds before a retry.
+  """
+
+  def __init__(
+      self,
+      *,
+      requests_per_second: float = 10.0,
+      min_requests_per_second: float = 0.1,
+      burst: Optional[float] = None,
+      max_concurrent_calls: int = 10,
+      rate_increase: float = 0.1,
+      rate_decrease: float = 0.5,
+      max_retries: int = 5,
+      initial_retry_delay: float = 1.0,
+      max_retry_delay: float = 60.0,
+  ):
+    if not 0 < min_requests_per_second <= requests_per_second:
+      raise ValueError(
+          'min_requests_per_second should be greater than 0 and at most'
+          ' requests_per_second.'
+      )
+    if max_concurrent_calls <= 0:
+      raise ValueError('max_concurrent_calls should be greater than 0.')
+    if not 0 < rate_decrease < 1:
+      raise ValueError('rate_decrease should be between 0 and 1.')
+    if max_retries < 0:
+      raise ValueError('max_retries should not be negative.')
+    self.requests_per_second = requests_per_second
+    self.min_requests_per_second = min_requests_per_second
+    self.burst = max(burst or requests_per_second, 1.0)
+    self.max_concurrent_calls = max_concurrent_calls
+    self.rate_increase = rate_increase
+    self.rate_decrease = rate_decrease
+    self.max_retries = max_retries
+    self.initial_retry_delay = initial_retry_delay
+    self.max_retry_delay = max_retry_delay
+    self._states: dict[str, _ModelState] = {}
+
+  def get_rate(self, model: str) -> float:
+    """Returns the current rate of calls per second of a model."""
+    return self._get_state(model).rate
+
+  def get_queue_depth(self, model: Optional[str] = None) -> int:
+    """Returns the number of calls waiting to be sent, of a model or all."""
+    return self._sum_states('queue_depth', model)
+
+  def get_throttles(self, model: Optional[str] = None) -> int:
+    """Returns the number of throttled calls, of a model or all."""
+    return self._sum_states('throttles', model)
+
+  def get_retries(self, model: Optional[str] = None) -> int:
+    """Returns the number of retried calls, of a model or all."""
+    return self._sum_states('retries', model)
+
+  async def generate_content_async(
+      self,
+      llm: BaseLlm,
+      llm_request: LlmRequest,
+      stream: bool = False,
+      deadline: Optional[float] = None,
+  ) -> AsyncGenerator[LlmResponse, None]:
+    """Calls the model within the rate limit, retrying failed calls.
+
+    Args:
+      llm: The model to call.
+      llm_request: The request to send.
+      stream: Whether to do a streaming call.
+      deadline: The time.monotonic() after which the call should not wait
+        anymore, neither in the queue nor before a retry.
+
+    Yields:
+      The model responses.
+
+    Raises:
+      TimeoutError: If the call can't be sent before the deadline.
+    """
+    state = self._get_state(llm.model)
+    attrs = {'gen_ai.request.model': llm.model}
+    retries = 0
+    while True:
+      semaphore = await self._acquire(state, deadline, attrs)
+      llm_responses = llm.generate_content_async(llm_request, stream=stream)
+      # The permit is released before the responses are yielded, since the
+      # caller runs the function calls, and may call the model again, while
+      # this generator is paused. A streaming call holds the permit until its
+      # first response, and the other calls until their last one.
+      buffered_responses = []
+      try:
+        async for llm_response in llm_responses:
+          buffered_responses.append(llm_response)
+          if stream:
+            break
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        self._record_error(state, e, attrs)
+        if (
+            _get_status_code(e) not in _RETRY_STATUS_CODES
+            or retries >= self.max_retries
+        ):
+          raise
+        delay = random.uniform(
+            0,
+            min(self.max_retry_delay, self.initial_retry_delay * 2**retries),
+        )
+        if deadline is not None and time.monotonic() + delay > deadline:
+          raise
+        logger.warning(
+            'Retrying call to %s in %.1fs after error: %s', llm.model, delay, e
+        )
+        retries += 1
+        state.retries += 1
+        _retry_counter.add(1, attrs)
+      else:
+        break
+      finally:
+        semaphore.release()
+      await asyncio.sleep(delay)
+
+    for llm_response in buffered_responses:
+      yield llm_response
+    if stream and buffered_responses:
+      # The rest of the stream isn't retried, since responses were yielded.
+      try:
+        async for llm_response in llm_responses:
+          yield llm_response
+      except Exception as e:  # pylint: disable=broad-exception-caught
+        self._record_error(state, e, attrs)
+        raise
+    state.rate = min(self.requests_per_second, state.rate + self.rate_increase)
+
+  async def _acquire(
+      self,
+      state: _ModelState,
+      deadline: Optional[float],
+      attrs: dict[str, str],
+  ) -> asyncio.Semaphore:
+    """Waits for the turn of a call, and returns the acquired semaphore."""
+    lock, semaphore = state.bind(self.max_concurrent_calls)
+    state.queue_depth += 1
+    _queue_depth_counter.add(1, attrs)
+    try:
+      timeout = None if deadline is None else deadline - time.monotonic()
+      await asyncio.wait_for(
+          self._wait_for_turn(state, lock, semaphore), timeout
+      )
+    except asyncio.TimeoutError as e:
+      raise TimeoutError(
+          'The rate limit does not allow the call before its deadline.'
+      ) from e
+    finally:
+      state.queue_depth -= 1
+      _queue_depth_counter.add(-1, attrs)
+    return semaphore
+
+  async def _wait_for_turn(
+      self,
+      state: _ModelState,
+      lock: asyncio.Lock,
+      semaphore: asyncio.Semaphore,
+  ) -> None:
+    # The lock is fair, so calls are sent in the order they arrive.
+    async with lock:
+      while True:
+        now = time.monotonic()
+        state.tokens = min(
+            self.burst, state.tokens + (now - state.updated_at) * state.rate
+        )
+        state.updated_at = now
+        if state.tokens >= 1:
+          state.tokens -= 1
+          break
+        await asyncio.sleep((1 - state.tokens) / state.rate)
+      await semaphore.acquire()
+
+  def _record_error(
+      self, state: _ModelState, error: Exception, attrs: dict[str, str]
+  ) -> None:
+    if _get_status_code(error) in _THROTTLE_STATUS_CODES:
+      self._decrease_rate(state)
+      _throttle_counter.add(1, attrs)
+
+  def _decrease_rate(self, state: _ModelState) -> None:
+    state.throttles += 1
+    state.rate = max(
+        self.min_requests_per_second, state.rate * self.rate_decrease
+    )
+    # Drops the burst, so that the lower rate applies right away.
+    state.tokens = min(state.tokens, 0.0)
+
+  def _get_state(self, model: str) -> _ModelState:
+    state = self._states.get(model)
+    if state is None:
+      state = _ModelState(self.requests_per_second, self.burst)
+      self._states[model] = state
+    return state
+
+  def _sum_states(self, name: str, model: Optional[str]) -> int:
+    if model is not None:
+      return getattr(self._get_state(model), name)
+    return sum(getattr(state, name) for state in self._states.values())
+
+
+def _get_status_code(error: Exception) -> Optional[int]:
+  """Returns the HTTP status code of an error of the model SDKs.
+
+  google-genai errors have a `code`, while litellm and anthropic errors have a
+  `status_code`.
+  """
+  for attr in ('code', 'status_code'):
+    status_code = getattr(error, attr, None)
+    if isinstance(status_code, int):
+      return status_code
+  return None
@@ -16,10 +16,16 @@
 
 from __future__ import annotations
 
+import asyncio
 from functools import lru_cache
 import logging
+import os
 import re
+import threading
+from typing import Any
+from typing import Optional
 from typing import TYPE_CHECKING
+import weakref
 
 if TYPE_CHECKING:
   from .base_llm import BaseLlm
@@ -34,6 +40,50 @@ Key is the regex that matches the model name.
 Value is the class that implements the model.
 """
 
+_llm_instances: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[tuple[str, tuple[Optional[str], ...]], BaseLlm],
+] = weakref.WeakKeyDictionary()
+"""The shared LLM instances of each event loop.
+
+Key is the model name and the backend config.
+Value is the LLM instance.
+"""
+_llm_instances_lock = threading.Lock()
+
+_BACKEND_ENV_VARS = (
+    'GOOGLE_GENAI_USE_VERTEXAI',
+    'GOOGLE_CLOUD_PROJECT',
+    'GOOGLE_CLOUD_LOCATION',
+    'GOOGLE_API_KEY',
+    'GEMINI_API_KEY',
+)
+
+
+def _get_backend_config() -> tuple[Optional[str], ...]:
+  """Returns the environment variables that select the model backend."""
+  return tuple(os.environ.get(name) for name in _BACKEND_ENV_VARS)
+
+
+def _get_loop_cache(
+    caches: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[Any, Any]
+    ],
+) -> Optional[dict[Any, Any]]:
+  """Returns the cache of the running event loop, or None outside of a loop.
+
+  Async API clients bind their connections to the event loop they are first
+  used in, so they can only be shared within a loop. The caches of closed
+  loops are dropped, since their clients may keep the loop alive.
+  """
+  try:
+    loop = asyncio.get_running_loop()
+  except RuntimeError:
+    return None
+  for closed_loop in [l for l in caches if l.is_closed()]:
+    del caches[closed_loop]
+  return caches.setdefault(loop, {})
+
 
 class LLMRegistry:
   """Registry for LLMs."""
@@ -51,6 +101,31 @@ class LLMRegistry:
 
     return LLMRegistry.resolve(model)(model=model)
 
+  @staticmethod
+  def get_llm(model: str) -> BaseLlm:
+    """Returns the LLM instance shared by all the agents using the model.
+
+    Sharing the instance lets its API client and connections be reused across
+    agents, sessions and turns. Instances are shared within the running event
+    loop, and outside of an event loop a new instance is returned. A new
+    instance is also created when the backend config in the environment
+    changes.
+
+    Args:
+        model: The model name.
+
+    Returns:
+        The shared LLM instance.
+    """
+    key = (model, _get_backend_config())
+    with _llm_instances_lock:
+      instances = _get_loop_cache(_llm_instances)
+      if instances is None:
+        return LLMRegistry.new_llm(model)
+      if key not in instances:
+        instances[key] = LLMRegistry.new_llm(model)
+      return instances[key]
+
   @staticmethod
   def _register(model_name_regex: str, llm_cls: type[BaseLlm]):
     """Registers a new LLM class.
@@ -69,6 +144,9 @@ class LLMRegistry:
       )
 
     _llm_registry_dict[model_name_regex] = llm_cls
+    # The shared instances may be of the previous class.
+    with _llm_instances_lock:
+      _llm_instances.clear()
 
   @staticmethod
   def register(llm_cls: type[BaseLlm]):
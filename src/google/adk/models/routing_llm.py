@@ -0,0 +1,365 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import dataclasses
+import logging
+import math
+import time
+from typing import Any
+from typing import AsyncGenerator
+from typing import Optional
+
+from opentelemetry import metrics
+from pydantic import Field
+from pydantic import field_validator
+from pydantic import model_validator
+from pydantic import PrivateAttr
+from typing_extensions import override
+
+from .base_llm import BaseLlm
+from .base_llm_connection import BaseLlmConnection
+from .llm_request import LlmRequest
+from .llm_response import LlmResponse
+from .registry import LLMRegistry
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter('gcp.vertex.agent')
+
+_attempt_counter = meter.create_counter(
+    'gcp.vertex.agent.llm.route.attempts',
+    unit='{request}',
+    description='Number of calls sent to each route of a RoutingLlm.',
+)
+_latency_histogram = meter.create_histogram(
+    'gcp.vertex.agent.llm.route.latency',
+    unit='s',
+    description='Time to the first response of each route of a RoutingLlm.',
+)
+
+
+@dataclasses.dataclass
+class RouteStats:
+  """The statistics of a route of a RoutingLlm."""
+
+  attempts: int = 0
+  """The number of calls sent to the route."""
+  hedges: int = 0
+  """The number of calls sent to the route as hedges of a slow call."""
+  fallbacks: int = 0
+  """The number of calls sent to the route after another route failed."""
+  wins: int = 0
+  """The number of calls whose responses were used."""
+  failures: int = 0
+  """The number of calls that failed before their first response."""
+  latencies: collections.deque[float] = dataclasses.field(
+      default_factory=collections.deque
+  )
+  """The recent times to the first response of the calls, in seconds. For the
+  calls that lost to a hedge, the time until the hedge responded."""
+  outcomes: collections.deque[bool] = dataclasses.field(
+      default_factory=collections.deque
+  )
+  """Whether each of the recent calls succeeded."""
+
+  def get_latency_percentile(self, percentile: float) -> Optional[float]:
+    """Returns a percentile of the recent latencies, or None without any."""
+    if not self.latencies:
+      return None
+    latencies = sorted(self.latencies)
+    index = math.ceil(percentile / 100 * len(latencies)) - 1
+    return latencies[min(max(index, 0), len(latencies) - 1)]
+
+  @property
+  def error_rate(self) -> float:
+    """The ratio of the recent calls that failed."""
+    if not self.outcomes:
+      return 0.0
+    return self.outcomes.count(False) / len(self.outcomes)
+
+
+@dataclasses.dataclass
+class _Attempt:
+  route: int
+  llm_responses: AsyncGenerator[LlmResponse, None]
+  started_at: float
+  first_response: asyncio.Task[LlmResponse]
+  first_response_at: Optional[float] = None
+  """When the first response completed, successfully or not."""
+
+
+class RoutingLlm(BaseLlm):
+  """A model that routes each call to one of several models.
+
+  The routes are tried in order: when a call fails before its first
+  response, it is sent to the next route. With `hedge_percentile`, a call
+  that takes longer than that percentile of the recent latencies of its
+  route is duplicated to the next route, or to the same route if it is the
+  only one, and the first of the two to respond is used. With
+  `latency_aware`, the routes are ordered by their recent median latency
+  instead, and the routes that failed more than half of their recent calls
+  are tried last. Each route calls its model through its own rate_limiter, if
+  any.
+
+  The latency of a call is the time to its first response, so streaming calls
+  are hedged on their time to first token. A call that failed after its first
+  response is not sent again.
+
+  Example:
+  ```python
+  agent = Agent(
+      model=RoutingLlm(
+          routes=['gemini-2.0-flash', 'gemini-2.0-flash-lite'],
+          hedge_percentile=95,
+      ),
+      ...
+  )
+  ```
+
+  Attributes:
+    routes: The models to route the calls to, in order of preference. Model
+      names are resolved with LLMRegistry.
+    hedge_percentile: The percentile of the latencies of a route after which a
+      call is hedged. If not set, calls are not hedged.
+    min_latency_samples: The min number of latencies of a route to hedge its
+      calls or to order it by latency.
+    latency_window: The number of recent calls of each route that the
+      latencies and error rates are computed over.
+    latency_aware: Whether to order the routes by their recent latencies.
+  """
+
+  routes: list[BaseLlm] = Field(min_length=1)
+  """The models to route the calls to, in order of preference."""
+
+  hedge_percentile: Optional[float] = Field(default=None, gt=0, lt=100)
+  """The percentile of the latencies of a route after which a call is
+  hedged. If not set, calls are not hedged."""
+
+  min_latency_samples: int = Field(default=20, gt=0)
+  """The min number of latencies of a route to hedge its calls or to order it
+  by latency."""
+
+  latency_window: int = Field(default=100, gt=0)
+  """The number of recent calls of each route that the latencies and error
+  rates are computed over."""
+
+  latency_aware: bool = False
+  """Whether to order the routes by their recent latencies."""
+
+  _stats: list[RouteStats] = PrivateAttr(default_factory=list)
+
+  @model_validator(mode='before')
+  @classmethod
+  def _populate_model(cls, data: Any) -> Any:
+    if isinstance(data, dict) and 'model' not in data and data.get('routes'):
+      route = data['routes'][0]
+      data['model'] = route if isinstance(route, str) else route.model
+    return data
+
+  @field_validator('routes', mode='before')
+  @classmethod
+  def _resolve_routes(cls, routes: Any) -> Any:
+    if not isinstance(routes, list):
+      return routes
+    return [
+        LLMRegistry.get_llm(route) if isinstance(route, str) else route
+        for route in routes
+    ]
+
+  def model_post_init(self, context: Any) -> None:
+    super().model_post_init(context)
+    self._stats = [RouteStats() for _ in self.routes]
+
+  def get_route_stats(self) -> dict[str, RouteStats]:
+    """Returns the statistics of each route, keyed by model name."""
+    return {
+        route.model: stats for route, stats in zip(self.routes, self._stats)
+    }
+
+  @override
+  async def generate_content_async(
+      self, llm_request: LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[LlmResponse, None]:
+    order = self._get_route_order()
+    next_index = 0
+    pending: list[_Attempt] = []
+    hedged = False
+    last_error: Optional[Exception] = None
+    winner: Optional[_Attempt] = None
+
+    try:
+      pending.append(self._start(order[0], llm_request, stream, 'primary'))
+      next_index = 1
+      while winner is None:
+        hedge_delay = None
+        if not hedged:
+          hedge_delay = self._get_hedge_delay(pending[0])
+        done, _ = await asyncio.wait(
+            [attempt.first_response for attempt in pending],
+            timeout=hedge_delay,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not done:
+          # The call is slower than usual for its route.
+          hedged = True
+          route = order[next_index] if next_index < len(order) else order[0]
+          next_index += 1
+          pending.append(self._start(route, llm_request, stream, 'hedge'))
+          continue
+        for attempt in list(pending):
+          if attempt.first_response not in done:
+            continue
+          error = attempt.first_response.exception()
+          if error is None or isinstance(error, StopAsyncIteration):
+            if winner is None:
+              winner = attempt
+              pending.remove(attempt)
+            continue
+          pending.remove(attempt)
+          last_error = error
+          self._record_failure(attempt)
+          logger.warning(
+              'Call to %s failed: %s', self.routes[attempt.route].model, error
+          )
+        if winner is None and not pending:
+          # All the attempts failed, so the call falls back to the next route.
+          if next_index >= len(order):
+            raise last_error
+          pending.append(
+              self._start(order[next_index], llm_request, stream, 'fallback')
+          )
+          next_index += 1
+      self._record_win(winner, pending)
+    finally:
+      for attempt in pending:
+        await _cancel(attempt)
+
+    if winner.first_response.exception():
+      # The route responded without any response.
+      return
+    yield winner.first_response.result()
+    async for llm_response in winner.llm_responses:
+      yield llm_response
+
+  @override
+  def connect(self, llm_request: LlmRequest) -> BaseLlmConnection:
+    return self.routes[0].connect(llm_request)
+
+  def _get_route_order(self) -> list[int]:
+    order = list(range(len(self.routes)))
+    if not self.latency_aware:
+      return order
+
+    def key(route: int) -> tuple[bool, float]:
+      stats = self._stats[route]
+      if len(stats.latencies) < self.min_latency_samples:
+        # Routes without enough samples are tried first to learn them.
+        return (False, 0.0)
+      return (stats.error_rate > 0.5, stats.get_latency_percentile(50))
+
+    return sorted(order, key=key)
+
+  def _get_hedge_delay(self, attempt: _Attempt) -> Optional[float]:
+    if self.hedge_percentile is None:
+      return None
+    stats = self._stats[attempt.route]
+    if len(stats.latencies) < self.min_latency_samples:
+      return None
+    elapsed = time.monotonic() - attempt.started_at
+    return max(stats.get_latency_percentile(self.hedge_percentile) - elapsed, 0)
+
+  def _start(
+      self, route: int, llm_request: LlmRequest, stream: bool, kind: str
+  ) -> _Attempt:
+    llm = self.routes[route]
+    stats = self._stats[route]
+    stats.attempts += 1
+    if kind == 'hedge':
+      stats.hedges += 1
+    elif kind == 'fallback':
+      stats.fallbacks += 1
+    _attempt_counter.add(
+        1,
+        {
+            'gen_ai.request.model': llm.model,
+            'gcp.vertex.agent.route.kind': kind,
+        },
+    )
+    route_request = llm_request.model_copy(update={'model': llm.model})
+    if llm.rate_limiter:
+      llm_responses = llm.rate_limiter.generate_content_async(
+          llm, route_request, stream=stream
+      )
+    else:
+      llm_responses = llm.generate_content_async(route_request, stream=stream)
+    attempt = _Attempt(
+        route=route,
+        llm_responses=llm_responses,
+        started_at=time.monotonic(),
+        first_response=asyncio.ensure_future(llm_responses.__anext__()),
+    )
+
+    def on_first_response(_):
+      attempt.first_response_at = time.monotonic()
+
+    attempt.first_response.add_done_callback(on_first_response)
+    return attempt
+
+  def _record_win(self, winner: _Attempt, losers: list[_Attempt]) -> None:
+    """Records the latencies of a call, before the losers are cancelled."""
+    if winner.first_response.exception():
+      # The route responded without any response, so it has no latency.
+      self._append(self._stats[winner.route].outcomes, True)
+      return
+    won_at = winner.first_response_at or time.monotonic()
+    latency = won_at - winner.started_at
+    stats = self._stats[winner.route]
+    stats.wins += 1
+    self._append(stats.latencies, latency)
+    self._append(stats.outcomes, True)
+    _latency_histogram.record(
+        latency, {'gen_ai.request.model': self.routes[winner.route].model}
+    )
+    for loser in losers:
+      # The latency of a loser, e.g. the slow primary of a hedged call, is at
+      # least the time it ran, which is recorded so that its percentiles don't
+      # drift down by only learning from the calls that won.
+      self._append(
+          self._stats[loser.route].latencies, won_at - loser.started_at
+      )
+
+  def _record_failure(self, attempt: _Attempt) -> None:
+    stats = self._stats[attempt.route]
+    stats.failures += 1
+    self._append(stats.outcomes, False)
+
+  def _append(self, window: collections.deque[Any], value: Any) -> None:
+    window.append(value)
+    while len(window) > self.latency_window:
+      window.popleft()
+
+
+async def _cancel(attempt: _Attempt) -> None:
+  """Stops an attempt whose responses are not used."""
+  attempt.first_response.cancel()
+  try:
+    await attempt.first_response
+  except (asyncio.CancelledError, Exception):  # pylint: disable=broad-exception-caught
+    pass
+  await attempt.llm_responses.aclose()
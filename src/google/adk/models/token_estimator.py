@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Estimates the number of tokens of model inputs without calling a model.
+
+The estimates are meant for decisions like when to compact the history, not
+for billing. Text is counted at about 4 characters per token, which is close
+for English with Gemini and most other model tokenizers.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from google.genai import types
+
+if TYPE_CHECKING:
+  from .llm_request import LlmRequest
+
+_CHARS_PER_TOKEN = 4
+# Gemini counts an image as 258 tokens. Other media are counted the same,
+# since their size in tokens depends on their duration.
+_TOKENS_PER_BLOB = 258
+# The role and structure of each content and part.
+_TOKENS_PER_CONTENT = 4
+_TOKENS_PER_PART = 2
+
+
+def estimate_text_tokens(text: str) -> int:
+  """Returns the estimated number of tokens of a text."""
+  return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def estimate_part_tokens(part: types.Part) -> int:
+  """Returns the estimated number of tokens of a content part."""
+  tokens = _TOKENS_PER_PART
+  if part.text:
+    tokens += estimate_text_tokens(part.text)
+  if part.function_call:
+    tokens += estimate_text_tokens(part.function_call.name or '')
+    tokens += _estimate_json_tokens(part.function_call.args)
+  if part.function_response:
+    tokens += estimate_text_tokens(part.function_response.name or '')
+    tokens += _estimate_json_tokens(part.function_response.response)
+  if part.inline_data or part.file_data:
+    tokens += _TOKENS_PER_BLOB
+  if part.executable_code:
+    tokens += estimate_text_tokens(part.executable_code.code or '')
+  if part.code_execution_result:
+    tokens += estimate_text_tokens(part.code_execution_result.output or '')
+  return tokens
+
+
+def estimate_content_tokens(content: types.Content) -> int:
+  """Returns the estimated number of tokens of a content."""
+  return _TOKENS_PER_CONTENT + sum(
+      estimate_part_tokens(part) for part in content.parts or []
+  )
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+  """Returns the estimated number of input tokens of an LLM request.
+
+  It counts the contents, the system instruction and the tool declarations.
+  """
+  tokens = sum(
+      estimate_content_tokens(content) for content in llm_request.contents
+  )
+  config = llm_request.config
+  if not config:
+    return tokens
+  system_instruction = config.system_instruction
+  if isinstance(system_instruction, str):
+    tokens += estimate_text_tokens(system_instruction)
+  elif isinstance(system_instruction, types.Content):
+    tokens += estimate_content_tokens(system_instruction)
+  for tool in config.tools or []:
+    if isinstance(tool, types.Tool):
+      tokens += _estimate_json_tokens(
+          tool.model_dump(mode='json', exclude_none=True)
+      )
+  return tokens
+
+
+def _estimate_json_tokens(value: object) -> int:
+  if not value:
+    return 0
+  return estimate_text_tokens(json.dumps(value, default=str))
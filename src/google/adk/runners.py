@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
 import queue
 import threading
@@ -31,6 +32,7 @@ from .agents.invocation_context import InvocationContext
 from .agents.invocation_context import new_invocation_context_id
 from .agents.live_request_queue import LiveRequestQueue
 from .agents.llm_agent import LlmAgent
+from .agents.run_config import EventWriteMode
 from .agents.run_config import RunConfig
 from .agents.run_config import StreamingMode
 from .artifacts.base_artifact_service import BaseArtifactService
@@ -43,6 +45,7 @@ from .sessions.in_memory_session_service import InMemorySessionService
 from .sessions.session import Session
 from .telemetry import tracer
 from .tools.built_in_code_execution_tool import built_in_code_execution
+from .tools.tool_executor import ToolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +63,7 @@ class Runner:
       artifact_service: The artifact service for the runner.
       session_service: The session service for the runner.
       memory_service: The memory service for the runner.
+      tool_executor: The executor that runs blocking tool calls.
   """
 
   app_name: str
@@ -72,6 +76,8 @@ class Runner:
   """The session service for the runner."""
   memory_service: Optional[BaseMemoryService] = None
   """The memory service for the runner."""
+  tool_executor: ToolExecutor
+  """The executor that runs blocking tool calls."""
 
   def __init__(
       self,
@@ -81,6 +87,7 @@ class Runner:
       artifact_service: Optional[BaseArtifactService] = None,
       session_service: BaseSessionService,
       memory_service: Optional[BaseMemoryService] = None,
+      tool_executor: Optional[ToolExecutor] = None,
   ):
     """Initializes the Runner.
 
@@ -90,12 +97,16 @@ class Runner:
         artifact_service: The artifact service for the runner.
         session_service: The session service for the runner.
         memory_service: The memory service for the runner.
+        tool_executor: The executor that runs blocking tool calls off the event
+          loop. Configure it to size the thread pool, bound its queue or enable
+          the process pool. Defaults to a ToolExecutor with default settings.
     """
     self.app_name = app_name
     self.agent = agent
     self.artifact_service = artifact_service
     self.session_service = session_service
     self.memory_service = memory_service
+    self.tool_executor = tool_executor or ToolExecutor()
 
   def run(
       self,
@@ -172,7 +183,7 @@ class Runner:
       The events generated by the agent.
     """
     with tracer.start_as_current_span('invocation'):
-      session = self.session_service.get_session(
+      session = await self.session_service.get_session_async(
           app_name=self.app_name, user_id=user_id, session_id=session_id
       )
       if not session:
@@ -186,7 +197,7 @@ class Runner:
       root_agent = self.agent
 
       if new_message:
-        self._append_new_message_to_session(
+        await self._append_new_message_to_session(
             session,
             new_message,
             invocation_context,
@@ -194,12 +205,44 @@ class Runner:
         )
 
       invocation_context.agent = self._find_agent_to_run(session, root_agent)
-      async for event in invocation_context.agent.run_async(invocation_context):
-        if not event.partial:
-          self.session_service.append_event(session=session, event=event)
-        yield event
-
-  def _append_new_message_to_session(
+      event_buffer = (
+          _EventWriteBuffer(
+              self.session_service,
+              session,
+              max_events=run_config.max_buffered_events,
+              max_delay=run_config.max_event_buffer_delay,
+          )
+          if run_config.event_write_mode == EventWriteMode.WRITE_BEHIND
+          else None
+      )
+      try:
+        async for event in invocation_context.agent.run_async(
+            invocation_context
+        ):
+          if not event.partial:
+            if event_buffer:
+              await event_buffer.append(event)
+            else:
+              await self.session_service.append_event_async(
+                  session=session, event=event
+              )
+          yield event
+      except BaseException:
+        if event_buffer:
+          # Persists the events that were yielded before the error, without
+          # hiding the error if that fails too.
+          try:
+            await event_buffer.flush()
+          except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception(
+                'Failed to persist the buffered events of session %s.',
+                session_id,
+            )
+        raise
+      if event_buffer:
+        await event_buffer.flush()
+
+  async def _append_new_message_to_session(
       self,
       session: Session,
       new_message: types.Content,
@@ -241,7 +284,7 @@ class Runner:
         author='user',
         content=new_message,
     )
-    self.session_service.append_event(session=session, event=event)
+    await self.session_service.append_event_async(session=session, event=event)
 
   async def run_live(
       self,
@@ -294,7 +337,9 @@ class Runner:
           )
 
     async for event in invocation_context.agent.run_live(invocation_context):
-      self.session_service.append_event(session=session, event=event)
+      await self.session_service.append_event_async(
+          session=session, event=event
+      )
       yield event
 
   def close_session(self, session: Session):
@@ -404,6 +449,7 @@ class Runner:
         user_content=new_message,
         live_request_queue=live_request_queue,
         run_config=run_config,
+        tool_executor=self.tool_executor,
     )
 
   def _new_invocation_context_for_live(
@@ -437,6 +483,96 @@ class Runner:
     )
 
 
+class _EventWriteBuffer:
+  """Persists the events of an invocation in batches.
+
+  Used for EventWriteMode.WRITE_BEHIND. Buffered events are applied to the
+  in-memory session right away, so that agents see them immediately, and are
+  persisted with a single group commit when the buffer is full, when its oldest
+  event is older than the max delay, or when the invocation ends.
+  """
+
+  def __init__(
+      self,
+      session_service: BaseSessionService,
+      session: Session,
+      *,
+      max_events: int,
+      max_delay: float,
+  ):
+    self._session_service = session_service
+    self._session = session
+    # The session as last persisted, which the buffered events are appended to
+    # when flushing. It lags behind `session` by the buffered events.
+    self._persisted_session = session.model_copy(
+        update={'state': copy.deepcopy(session.state), 'events': []}
+    )
+    self._max_events = max_events
+    self._max_delay = max_delay
+    self._events: list[Event] = []
+    self._lock = asyncio.Lock()
+    self._timer: Optional[asyncio.TimerHandle] = None
+    self._timed_flushes: list[asyncio.Task[None]] = []
+
+  async def append(self, event: Event):
+    """Applies the event to the in-memory session and buffers it.
+
+    Raises:
+      Exception: The error of a flush started by the max delay, if any.
+    """
+    self._raise_timed_flush_error()
+    # Only updates the in-memory session, the storage is updated on flush.
+    self._session_service._apply_event_to_session(self._session, event)
+    self._events.append(event)
+    if len(self._events) >= self._max_events:
+      await self.flush()
+    elif self._timer is None:
+      # The buffer is flushed after the max delay even if no other event
+      # comes, e.g. while the agent waits for a slow tool or model call.
+      self._timer = asyncio.get_running_loop().call_later(
+          self._max_delay, self._start_timed_flush
+      )
+
+  async def flush(self):
+    """Persists the buffered events.
+
+    Raises:
+      Exception: The error of a flush started by the max delay, if any.
+    """
+    if self._timer:
+      self._timer.cancel()
+      self._timer = None
+    await self._persist()
+    timed_flushes, self._timed_flushes = self._timed_flushes, []
+    for timed_flush in timed_flushes:
+      await timed_flush
+
+  def _start_timed_flush(self):
+    self._timer = None
+    self._timed_flushes.append(asyncio.create_task(self._persist()))
+
+  def _raise_timed_flush_error(self):
+    for timed_flush in [t for t in self._timed_flushes if t.done()]:
+      self._timed_flushes.remove(timed_flush)
+      timed_flush.result()
+
+  async def _persist(self):
+    async with self._lock:
+      if not self._events:
+        return
+      events, self._events = self._events, []
+      try:
+        await self._session_service.append_events_async(
+            session=self._persisted_session, events=events
+        )
+      except Exception:
+        # Keeps the events, so that the next flush retries them.
+        self._events[:0] = events
+        raise
+      self._session.last_update_time = self._persisted_session.last_update_time
+      self._session._storage_version = self._persisted_session._storage_version
+
+
 class InMemoryRunner(Runner):
   """An in-memory Runner for testing and development.
 
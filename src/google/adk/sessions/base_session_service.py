@@ -25,9 +25,15 @@ from .state import State
 
 
 class GetSessionConfig(BaseModel):
-  """The configuration of getting a session."""
+  """The configuration of getting a session.
+
+  When both fields are set, the most recent `num_recent_events` events that are
+  not older than `after_timestamp` are returned.
+  """
   num_recent_events: Optional[int] = None
+  """Only return the given number of most recent events."""
   after_timestamp: Optional[float] = None
+  """Only return the events at or after the given timestamp."""
 
 
 class ListSessionsResponse(BaseModel):
@@ -106,8 +112,23 @@ class BaseSessionService(abc.ABC):
       app_name: str,
       user_id: str,
       session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
   ) -> ListEventsResponse:
-    """Lists events in a session."""
+    """Lists events in a session, from the oldest to the newest.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      session_id: the id of the session.
+      page_size: the max number of events to return. All the events are
+        returned if not set.
+      page_token: the `next_page_token` of the previous page, to continue
+        listing from there.
+
+    Returns:
+      The events, and a token for the next page if there are more events.
+    """
     pass
 
   def close_session(self, *, session: Session):
@@ -117,12 +138,113 @@ class BaseSessionService(abc.ABC):
 
   def append_event(self, session: Session, event: Event) -> Event:
     """Appends an event to a session object."""
+    return self._apply_event_to_session(session, event)
+
+  def _apply_event_to_session(self, session: Session, event: Event) -> Event:
+    """Applies an event to the session object only, without persisting it."""
     if event.partial:
       return event
     self.__update_session_state(session, event)
     session.events.append(event)
     return event
 
+  # The async variants below default to the sync implementations, which is
+  # fine for services that never block (e.g. the in-memory one). Services that
+  # do I/O should override them so that the event loop is never blocked.
+
+  async def create_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    """Creates a new session without blocking the event loop.
+
+    See `create_session` for the arguments.
+    """
+    return self.create_session(
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  async def get_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    """Gets a session without blocking the event loop."""
+    return self.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  async def list_sessions_async(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    """Lists all the sessions without blocking the event loop."""
+    return self.list_sessions(app_name=app_name, user_id=user_id)
+
+  async def delete_session_async(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    """Deletes a session without blocking the event loop."""
+    return self.delete_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  async def list_events_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
+  ) -> ListEventsResponse:
+    """Lists events in a session without blocking the event loop."""
+    return self.list_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        page_size=page_size,
+        page_token=page_token,
+    )
+
+  async def close_session_async(self, *, session: Session):
+    """Closes a session without blocking the event loop."""
+    return self.close_session(session=session)
+
+  async def append_event_async(self, session: Session, event: Event) -> Event:
+    """Appends an event to a session object without blocking the event loop."""
+    return self.append_event(session=session, event=event)
+
+  async def append_events_async(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    """Appends a batch of events to a session object without blocking the event
+    loop."""
+    return [
+        await self.append_event_async(session=session, event=event)
+        for event in events
+    ]
+
+  def append_events(self, session: Session, events: list[Event]) -> list[Event]:
+    """Appends a batch of events to a session object.
+
+    Services backed by a storage should override this to persist the whole
+    batch with a single write.
+    """
+    return [self.append_event(session=session, event=event) for event in events]
+
   def __update_session_state(self, session: Session, event: Event):
     """Updates the session state based on the event."""
     if not event.actions or not event.actions.state_delta:
@@ -12,23 +12,37 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
 import copy
 from datetime import datetime
 import json
 import logging
 from typing import Any
+from typing import Callable
 from typing import Optional
+from typing import TypeVar
 import uuid
 
+from sqlalchemy import and_
 from sqlalchemy import delete
 from sqlalchemy import Dialect
 from sqlalchemy import ForeignKeyConstraint
 from sqlalchemy import func
+from sqlalchemy import Index
+from sqlalchemy import or_
 from sqlalchemy import select
+from sqlalchemy import text
 from sqlalchemy import Text
+from sqlalchemy import update
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession as AsyncDatabaseSessionFactory
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import ArgumentError
 from sqlalchemy.inspection import inspect
@@ -38,8 +52,10 @@ from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Session as DatabaseSessionFactory
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.schema import MetaData
 from sqlalchemy.types import DateTime
+from sqlalchemy.types import Integer
 from sqlalchemy.types import PickleType
 from sqlalchemy.types import String
 from sqlalchemy.types import TypeDecorator
@@ -56,6 +72,15 @@ from .state import State
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# The async drivers used to derive an async engine from a sync database URL.
+_ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
 
 class DynamicJSON(TypeDecorator):
   """A JSON-like type that uses JSONB on PostgreSQL and TEXT with JSON
@@ -64,6 +89,7 @@ class DynamicJSON(TypeDecorator):
   """
 
   impl = Text  # Default implementation is TEXT
+  cache_ok = True
 
   def load_dialect_impl(self, dialect: Dialect):
     if dialect.name == "postgresql":
@@ -111,6 +137,8 @@ class StorageSession(Base):
   update_time: Mapped[DateTime] = mapped_column(
       DateTime(), default=func.now(), onupdate=func.now()
   )
+  version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+  """Incremented on every write, to detect concurrent writes."""
 
   storage_events: Mapped[list["StorageEvent"]] = relationship(
       "StorageEvent",
@@ -136,6 +164,9 @@ class StorageEvent(Base):
   timestamp: Mapped[DateTime] = mapped_column(DateTime(), default=func.now())
   content: Mapped[dict] = mapped_column(DynamicJSON)
   actions: Mapped[dict] = mapped_column(PickleType)
+  usage_metadata: Mapped[Optional[dict]] = mapped_column(
+      DynamicJSON, nullable=True
+  )
 
   storage_session: Mapped[StorageSession] = relationship(
       "StorageSession",
@@ -148,6 +179,14 @@ class StorageEvent(Base):
           ["sessions.app_name", "sessions.user_id", "sessions.id"],
           ondelete="CASCADE",
       ),
+      # Serves the windowed and paginated reads of a session's events.
+      Index(
+          "ix_events_session_timestamp",
+          "app_name",
+          "user_id",
+          "session_id",
+          "timestamp",
+      ),
   )
 
 
@@ -179,19 +218,40 @@ class StorageUserState(Base):
 
 
 class DatabaseSessionService(BaseSessionService):
-  """A session service that uses a database for storage."""
+  """A session service that uses a database for storage.
 
-  def __init__(self, db_url: str):
+  The sync methods run on a sync SQLAlchemy engine. The async variants run the
+  same queries on an async engine (e.g. aiosqlite or asyncpg), so that database
+  I/O never blocks the event loop.
+  """
+
+  def __init__(
+      self,
+      db_url: str,
+      *,
+      async_engine_kwargs: Optional[dict[str, Any]] = None,
+      **kwargs: Any,
+  ):
     """
     Args:
-        db_url: The database URL to connect to.
+        db_url: The database URL to connect to. Either a sync URL (e.g.
+          `postgresql://...`) or an async one (e.g. `postgresql+asyncpg://...`)
+          can be given, the engine for the other flavor is derived from it.
+        async_engine_kwargs: The arguments of the async engine that differ from
+          `kwargs`, e.g. `{"pool_size": 10}`. The sync and async engines have
+          separate connection pools, so with the same `pool_size` and
+          `max_overflow`, the service may open twice as many connections.
+        **kwargs: Additional arguments for the database engines, e.g. the
+          connection pool configuration such as `pool_size`, `max_overflow`,
+          `pool_timeout` or `pool_recycle`.
     """
-    # 1. Create DB engine for db connection
+    # 1. Create DB engines for db connection
     # 2. Create all tables based on schema
     # 3. Initialize all properies
 
     try:
-      db_engine = create_engine(db_url)
+      sync_db_url, async_db_url = _get_engine_urls(make_url(db_url))
+      db_engine = create_engine(sync_db_url, **kwargs)
     except Exception as e:
       if isinstance(e, ArgumentError):
         raise ValueError(
@@ -205,11 +265,25 @@ class DatabaseSessionService(BaseSessionService):
           f"Failed to create database engine for URL '{db_url}'"
       ) from e
 
+    async_db_engine = None
+    if async_db_url is not None:
+      try:
+        async_db_engine = create_async_engine(
+            async_db_url, **{**kwargs, **(async_engine_kwargs or {})}
+        )
+      except ImportError:
+        logger.warning(
+            "Async database driver for '%s' is not installed, async session"
+            " methods will use the sync engine.",
+            async_db_url.drivername,
+        )
+
     # Get the local timezone
     local_timezone = get_localzone()
     logger.info(f"Local timezone: {local_timezone}")
 
     self.db_engine: Engine = db_engine
+    self.async_db_engine: Optional[AsyncEngine] = async_db_engine
     self.metadata: MetaData = MetaData()
     self.inspector = inspect(self.db_engine)
 
@@ -217,10 +291,38 @@ class DatabaseSessionService(BaseSessionService):
     self.DatabaseSessionFactory: sessionmaker[DatabaseSessionFactory] = (
         sessionmaker(bind=self.db_engine)
     )
+    self.AsyncDatabaseSessionFactory: Optional[
+        async_sessionmaker[AsyncDatabaseSessionFactory]
+    ] = (
+        async_sessionmaker(bind=self.async_db_engine)
+        if self.async_db_engine
+        else None
+    )
 
     # Uncomment to recreate DB every time
     # Base.metadata.drop_all(self.db_engine)
     Base.metadata.create_all(self.db_engine)
+    # create_all() skips existing tables, so also add the columns and indexes
+    # introduced after those tables were created.
+    self._add_missing_columns()
+    for index in StorageEvent.__table__.indexes:
+      index.create(self.db_engine, checkfirst=True)
+
+  def _add_missing_columns(self):
+    """Adds the columns of the schema that are missing in existing tables."""
+    inspector = inspect(self.db_engine)
+    with self.db_engine.begin() as connection:
+      for table in Base.metadata.sorted_tables:
+        existing_columns = {
+            column["name"] for column in inspector.get_columns(table.name)
+        }
+        for column in table.columns:
+          if column.name in existing_columns:
+            continue
+          column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+          connection.execute(
+              text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+          )
 
   @override
   def create_session(
@@ -230,6 +332,40 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       state: Optional[dict[str, Any]] = None,
       session_id: Optional[str] = None,
+  ) -> Session:
+    return self._run(
+        self._create_session,
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  @override
+  async def create_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    return await self._run_async(
+        self._create_session,
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  def _create_session(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
   ) -> Session:
     # 1. Populate states.
     # 2. Build storage session object
@@ -237,65 +373,63 @@ class DatabaseSessionService(BaseSessionService):
     # 4. Build the session object with generated id
     # 5. Return the session
 
-    with self.DatabaseSessionFactory() as sessionFactory:
-
-      # Fetch app and user states from storage
-      storage_app_state = sessionFactory.get(StorageAppState, (app_name))
-      storage_user_state = sessionFactory.get(
-          StorageUserState, (app_name, user_id)
-      )
-
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
+    # Fetch app and user states from storage
+    storage_app_state = sessionFactory.get(StorageAppState, (app_name))
+    storage_user_state = sessionFactory.get(
+        StorageUserState, (app_name, user_id)
+    )
 
-      # Create state tables if not exist
-      if not storage_app_state:
-        storage_app_state = StorageAppState(app_name=app_name, state={})
-        sessionFactory.add(storage_app_state)
-      if not storage_user_state:
-        storage_user_state = StorageUserState(
-            app_name=app_name, user_id=user_id, state={}
-        )
-        sessionFactory.add(storage_user_state)
+    app_state = storage_app_state.state if storage_app_state else {}
+    user_state = storage_user_state.state if storage_user_state else {}
 
-      # Extract state deltas
-      app_state_delta, user_state_delta, session_state = _extract_state_delta(
-          state
+    # Create state tables if not exist
+    if not storage_app_state:
+      storage_app_state = StorageAppState(app_name=app_name, state={})
+      sessionFactory.add(storage_app_state)
+    if not storage_user_state:
+      storage_user_state = StorageUserState(
+          app_name=app_name, user_id=user_id, state={}
       )
+      sessionFactory.add(storage_user_state)
 
-      # Apply state delta
-      app_state.update(app_state_delta)
-      user_state.update(user_state_delta)
-
-      # Store app and user state
-      if app_state_delta:
-        storage_app_state.state = app_state
-      if user_state_delta:
-        storage_user_state.state = user_state
+    # Extract state deltas
+    app_state_delta, user_state_delta, session_state = _extract_state_delta(
+        state
+    )
 
-      # Store the session
-      storage_session = StorageSession(
-          app_name=app_name,
-          user_id=user_id,
-          id=session_id,
-          state=session_state,
-      )
-      sessionFactory.add(storage_session)
-      sessionFactory.commit()
+    # Apply state delta
+    app_state.update(app_state_delta)
+    user_state.update(user_state_delta)
 
-      sessionFactory.refresh(storage_session)
+    # Store app and user state
+    if app_state_delta:
+      storage_app_state.state = app_state
+    if user_state_delta:
+      storage_user_state.state = user_state
 
-      # Merge states for response
-      merged_state = _merge_state(app_state, user_state, session_state)
-      session = Session(
-          app_name=str(storage_session.app_name),
-          user_id=str(storage_session.user_id),
-          id=str(storage_session.id),
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
-      )
-      return session
-    return None
+    # Store the session
+    storage_session = StorageSession(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=session_state,
+    )
+    sessionFactory.add(storage_session)
+    sessionFactory.commit()
+
+    sessionFactory.refresh(storage_session)
+
+    # Merge states for response
+    merged_state = _merge_state(app_state, user_state, session_state)
+    session = Session(
+        app_name=str(storage_session.app_name),
+        user_id=str(storage_session.user_id),
+        id=str(storage_session.id),
+        state=merged_state,
+        last_update_time=storage_session.update_time.timestamp(),
+    )
+    session._storage_version = storage_session.version
+    return session
 
   @override
   def get_session(
@@ -305,181 +439,353 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       session_id: str,
       config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    return self._run(
+        self._get_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  @override
+  async def get_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    return await self._run_async(
+        self._get_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  def _get_session(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
   ) -> Optional[Session]:
     # 1. Get the storage session entry from session table
     # 2. Get all the events based on session id and filtering config
     # 3. Convert and return the session
-    session: Session = None
-    with self.DatabaseSessionFactory() as sessionFactory:
-      storage_session = sessionFactory.get(
-          StorageSession, (app_name, user_id, session_id)
-      )
-      if storage_session is None:
-        return None
-
-      storage_events = (
-          sessionFactory.query(StorageEvent)
-          .filter(StorageEvent.session_id == storage_session.id)
-          .filter(
-              StorageEvent.timestamp < config.after_timestamp
-              if config
-              else True
-          )
-          .limit(config.num_recent_events if config else None)
-          .all()
-      )
-
-      # Fetch states from storage
-      storage_app_state = sessionFactory.get(StorageAppState, (app_name))
-      storage_user_state = sessionFactory.get(
-          StorageUserState, (app_name, user_id)
+    storage_session = sessionFactory.get(
+        StorageSession, (app_name, user_id, session_id)
+    )
+    if storage_session is None:
+      return None
+
+    # Reads the most recent events first, so that the limit keeps the tail
+    # of the session, and restores the chronological order afterwards.
+    stmt = (
+        select(StorageEvent)
+        .where(
+            StorageEvent.app_name == app_name,
+            StorageEvent.user_id == user_id,
+            StorageEvent.session_id == session_id,
+        )
+        .order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+    )
+    if config and config.after_timestamp:
+      stmt = stmt.where(
+          StorageEvent.timestamp
+          >= datetime.fromtimestamp(config.after_timestamp)
       )
+    if config and config.num_recent_events:
+      stmt = stmt.limit(config.num_recent_events)
+    storage_events = reversed(sessionFactory.scalars(stmt).all())
+
+    # Fetch states from storage
+    storage_app_state = sessionFactory.get(StorageAppState, (app_name))
+    storage_user_state = sessionFactory.get(
+        StorageUserState, (app_name, user_id)
+    )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
-
-      # Merge states
-      merged_state = _merge_state(app_state, user_state, session_state)
+    app_state = storage_app_state.state if storage_app_state else {}
+    user_state = storage_user_state.state if storage_user_state else {}
+    session_state = storage_session.state
 
-      # Convert storage session to session
-      session = Session(
-          app_name=app_name,
-          user_id=user_id,
-          id=session_id,
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
-      )
-      session.events = [
-          Event(
-              id=e.id,
-              author=e.author,
-              branch=e.branch,
-              invocation_id=e.invocation_id,
-              content=e.content,
-              actions=e.actions,
-              timestamp=e.timestamp.timestamp(),
-          )
-          for e in storage_events
-      ]
+    # Merge states
+    merged_state = _merge_state(app_state, user_state, session_state)
 
+    # Convert storage session to session
+    session = Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=merged_state,
+        last_update_time=storage_session.update_time.timestamp(),
+    )
+    session._storage_version = storage_session.version
+    session.events = [convert_event(e) for e in storage_events]
     return session
 
   @override
   def list_sessions(
       self, *, app_name: str, user_id: str
   ) -> ListSessionsResponse:
-    with self.DatabaseSessionFactory() as sessionFactory:
-      results = (
-          sessionFactory.query(StorageSession)
-          .filter(StorageSession.app_name == app_name)
-          .filter(StorageSession.user_id == user_id)
-          .all()
+    return self._run(self._list_sessions, app_name=app_name, user_id=user_id)
+
+  @override
+  async def list_sessions_async(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    return await self._run_async(
+        self._list_sessions, app_name=app_name, user_id=user_id
+    )
+
+  def _list_sessions(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+  ) -> ListSessionsResponse:
+    results = (
+        sessionFactory.query(StorageSession)
+        .filter(StorageSession.app_name == app_name)
+        .filter(StorageSession.user_id == user_id)
+        .all()
+    )
+    sessions = []
+    for storage_session in results:
+      session = Session(
+          app_name=app_name,
+          user_id=user_id,
+          id=storage_session.id,
+          state={},
+          last_update_time=storage_session.update_time.timestamp(),
       )
-      sessions = []
-      for storage_session in results:
-        session = Session(
-            app_name=app_name,
-            user_id=user_id,
-            id=storage_session.id,
-            state={},
-            last_update_time=storage_session.update_time.timestamp(),
-        )
-        sessions.append(session)
-      return ListSessionsResponse(sessions=sessions)
-    raise ValueError("Failed to retrieve sessions.")
+      session._storage_version = storage_session.version
+      sessions.append(session)
+    return ListSessionsResponse(sessions=sessions)
 
   @override
   def delete_session(
       self, app_name: str, user_id: str, session_id: str
   ) -> None:
-    with self.DatabaseSessionFactory() as sessionFactory:
-      stmt = delete(StorageSession).where(
-          StorageSession.app_name == app_name,
-          StorageSession.user_id == user_id,
-          StorageSession.id == session_id,
-      )
-      sessionFactory.execute(stmt)
-      sessionFactory.commit()
+    self._run(
+        self._delete_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+
+  @override
+  async def delete_session_async(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    await self._run_async(
+        self._delete_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+
+  def _delete_session(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+  ) -> None:
+    stmt = delete(StorageSession).where(
+        StorageSession.app_name == app_name,
+        StorageSession.user_id == user_id,
+        StorageSession.id == session_id,
+    )
+    sessionFactory.execute(stmt)
+    sessionFactory.commit()
 
   @override
   def append_event(self, session: Session, event: Event) -> Event:
-    logger.info(f"Append event: {event} to session {session.id}")
+    return self.append_events(session=session, events=[event])[0]
 
-    if event.partial and not event.content:
-      return event
+  @override
+  async def append_event_async(self, session: Session, event: Event) -> Event:
+    return (await self.append_events_async(session=session, events=[event]))[0]
 
-    # 1. Check if timestamp is stale
-    # 2. Update session attributes based on event config
-    # 3. Store event to table
-    with self.DatabaseSessionFactory() as sessionFactory:
-      storage_session = sessionFactory.get(
-          StorageSession, (session.app_name, session.user_id, session.id)
+  @override
+  def append_events(self, session: Session, events: list[Event]) -> list[Event]:
+    logger.info(f"Append events: {events} to session {session.id}")
+
+    stored_events = [e for e in events if not (e.partial and not e.content)]
+    if stored_events:
+      self._run(self._append_events, session=session, events=stored_events)
+
+    # Also update the in-memory session
+    for event in stored_events:
+      super().append_event(session=session, event=event)
+    return events
+
+  @override
+  async def append_events_async(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    logger.info(f"Append events: {events} to session {session.id}")
+
+    stored_events = [e for e in events if not (e.partial and not e.content)]
+    if stored_events:
+      await self._run_async(
+          self._append_events, session=session, events=stored_events
       )
 
-      if storage_session.update_time.timestamp() > session.last_update_time:
-        raise ValueError(
-            f"Session last_update_time {session.last_update_time} is later than"
-            f" the upate_time in storage {storage_session.update_time}"
+    # Also update the in-memory session
+    for event in stored_events:
+      super().append_event(session=session, event=event)
+    return events
+
+  def _append_events(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      session: Session,
+      events: list[Event],
+  ) -> None:
+    # 1. Bump the session version, failing if the session is stale
+    # 2. Update the state rows that have a non-empty delta
+    # 3. Store the events to table, all in one transaction
+    app_state_delta = {}
+    user_state_delta = {}
+    session_state_delta = {}
+    for event in events:
+      if event.actions and event.actions.state_delta:
+        app_delta, user_delta, session_delta = _extract_state_delta(
+            event.actions.state_delta
+        )
+        app_state_delta.update(app_delta)
+        user_state_delta.update(user_delta)
+        session_state_delta.update(session_delta)
+
+    # The update only matches if nobody wrote the session after the caller
+    # read it. Sessions that weren't read from this service have no version,
+    # and are checked against the update time instead.
+    if session._storage_version is not None:
+      is_current = StorageSession.version == session._storage_version
+    else:
+      is_current = StorageSession.update_time <= datetime.fromtimestamp(
+          session.last_update_time
+      )
+    values = {
+        "update_time": func.now(),
+        "version": StorageSession.version + 1,
+    }
+    if session_state_delta:
+      # The delta is merged into the stored state rather than the caller's
+      # copy, which may not hold the session state, e.g. when listed.
+      storage_state = sessionFactory.scalar(
+          select(StorageSession.state).where(
+              StorageSession.app_name == session.app_name,
+              StorageSession.user_id == session.user_id,
+              StorageSession.id == session.id,
+          )
+      )
+      values["state"] = {**(storage_state or {}), **session_state_delta}
+    stmt = (
+        update(StorageSession)
+        .where(
+            StorageSession.app_name == session.app_name,
+            StorageSession.user_id == session.user_id,
+            StorageSession.id == session.id,
+            is_current,
         )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    returns_row = sessionFactory.get_bind().dialect.update_returning
+    if returns_row:
+      stmt = stmt.returning(StorageSession.update_time, StorageSession.version)
+    result = sessionFactory.execute(stmt)
+    if returns_row:
+      updated_row = result.one_or_none()
+      is_stale = updated_row is None
+    else:
+      updated_row = None
+      is_stale = result.rowcount == 0
+    if is_stale:
+      raise ValueError(
+          f"Session {session.id} does not exist or was modified in storage"
+          " since it was read."
+      )
 
-      # Fetch states from storage
+    if app_state_delta:
       storage_app_state = sessionFactory.get(
           StorageAppState, (session.app_name)
       )
+      if storage_app_state:
+        storage_app_state.state = {**storage_app_state.state, **app_state_delta}
+      else:
+        sessionFactory.add(
+            StorageAppState(app_name=session.app_name, state=app_state_delta)
+        )
+    if user_state_delta:
       storage_user_state = sessionFactory.get(
           StorageUserState, (session.app_name, session.user_id)
       )
+      if storage_user_state:
+        storage_user_state.state = {
+            **storage_user_state.state,
+            **user_state_delta,
+        }
+      else:
+        sessionFactory.add(
+            StorageUserState(
+                app_name=session.app_name,
+                user_id=session.user_id,
+                state=user_state_delta,
+            )
+        )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
-
-      # Extract state delta
-      app_state_delta = {}
-      user_state_delta = {}
-      session_state_delta = {}
-      if event.actions:
-        if event.actions.state_delta:
-          app_state_delta, user_state_delta, session_state_delta = (
-              _extract_state_delta(event.actions.state_delta)
+    sessionFactory.add_all(
+        StorageEvent(
+            id=event.id,
+            invocation_id=event.invocation_id,
+            author=event.author,
+            branch=event.branch,
+            # Events without content, such as compactions, are stored with
+            # an empty one, since the column is not nullable.
+            content=(
+                event.content.model_dump(exclude_none=True)
+                if event.content
+                else {}
+            ),
+            actions=event.actions,
+            usage_metadata=(
+                event.usage_metadata.model_dump(exclude_none=True)
+                if event.usage_metadata
+                else None
+            ),
+            session_id=session.id,
+            app_name=session.app_name,
+            user_id=session.user_id,
+            timestamp=datetime.fromtimestamp(event.timestamp),
+        )
+        for event in events
+    )
+    sessionFactory.commit()
+
+    if updated_row is None:
+      # The dialect can't return the new version with the update.
+      updated_row = sessionFactory.execute(
+          select(StorageSession.update_time, StorageSession.version).where(
+              StorageSession.app_name == session.app_name,
+              StorageSession.user_id == session.user_id,
+              StorageSession.id == session.id,
           )
+      ).one()
 
-      # Merge state
-      app_state.update(app_state_delta)
-      user_state.update(user_state_delta)
-      session_state.update(session_state_delta)
-
-      # Update storage
-      storage_app_state.state = app_state
-      storage_user_state.state = user_state
-      storage_session.state = session_state
-
-      encoded_content = event.content.model_dump(exclude_none=True)
-      storage_event = StorageEvent(
-          id=event.id,
-          invocation_id=event.invocation_id,
-          author=event.author,
-          branch=event.branch,
-          content=encoded_content,
-          actions=event.actions,
-          session_id=session.id,
-          app_name=session.app_name,
-          user_id=session.user_id,
-          timestamp=datetime.fromtimestamp(event.timestamp),
-      )
-
-      sessionFactory.add(storage_event)
-
-      sessionFactory.commit()
-      sessionFactory.refresh(storage_session)
-
-      # Update timestamp with commit time
-      session.last_update_time = storage_session.update_time.timestamp()
-
-    # Also update the in-memory session
-    super().append_event(session=session, event=event)
-    return event
+    # Update timestamp with commit time
+    update_time, session._storage_version = updated_row
+    session.last_update_time = update_time.timestamp()
 
   @override
   def list_events(
@@ -488,8 +794,100 @@ class DatabaseSessionService(BaseSessionService):
       app_name: str,
       user_id: str,
       session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
+  ) -> ListEventsResponse:
+    return self._run(
+        self._list_events,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        page_size=page_size,
+        page_token=page_token,
+    )
+
+  @override
+  async def list_events_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
+  ) -> ListEventsResponse:
+    return await self._run_async(
+        self._list_events,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        page_size=page_size,
+        page_token=page_token,
+    )
+
+  def _list_events(
+      self,
+      sessionFactory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
   ) -> ListEventsResponse:
-    pass
+    # Keyset pagination: a page starts right after the (timestamp, id) of the
+    # last event of the previous page, which the index seeks to directly.
+    stmt = (
+        select(StorageEvent)
+        .where(
+            StorageEvent.app_name == app_name,
+            StorageEvent.user_id == user_id,
+            StorageEvent.session_id == session_id,
+        )
+        .order_by(StorageEvent.timestamp, StorageEvent.id)
+    )
+    if page_token:
+      last_timestamp, last_id = _decode_page_token(page_token)
+      stmt = stmt.where(
+          or_(
+              StorageEvent.timestamp > last_timestamp,
+              and_(
+                  StorageEvent.timestamp == last_timestamp,
+                  StorageEvent.id > last_id,
+              ),
+          )
+      )
+    if page_size:
+      # Fetches one more event to know whether there is a next page.
+      stmt = stmt.limit(page_size + 1)
+    storage_events = sessionFactory.scalars(stmt).all()
+
+    next_page_token = None
+    if page_size and len(storage_events) > page_size:
+      storage_events = storage_events[:page_size]
+      next_page_token = _encode_page_token(storage_events[-1])
+    return ListEventsResponse(
+        events=[convert_event(e) for e in storage_events],
+        next_page_token=next_page_token,
+    )
+
+  def _run(self, fn: Callable[..., _T], /, **kwargs: Any) -> _T:
+    """Runs `fn` with a new database session on the sync engine."""
+    with self.DatabaseSessionFactory() as sessionFactory:
+      return fn(sessionFactory, **kwargs)
+
+  async def _run_async(self, fn: Callable[..., _T], /, **kwargs: Any) -> _T:
+    """Runs `fn` with a new database session on the async engine.
+
+    `fn` is the same function used by the sync methods, SQLAlchemy runs it on
+    the async connection without blocking the event loop.
+    """
+    if self.AsyncDatabaseSessionFactory is None:
+      # In-memory databases and databases without an installed async driver
+      # can only be reached through the sync engine.
+      return self._run(fn, **kwargs)
+    async with self.AsyncDatabaseSessionFactory() as sessionFactory:
+      return await sessionFactory.run_sync(fn, **kwargs)
 
 
 def convert_event(event: StorageEvent) -> Event:
@@ -499,12 +897,45 @@ def convert_event(event: StorageEvent) -> Event:
       author=event.author,
       branch=event.branch,
       invocation_id=event.invocation_id,
-      content=event.content,
+      content=event.content or None,
       actions=event.actions,
       timestamp=event.timestamp.timestamp(),
+      usage_metadata=event.usage_metadata,
   )
 
 
+def _encode_page_token(event: StorageEvent) -> str:
+  token = json.dumps([event.timestamp.isoformat(), event.id])
+  return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def _decode_page_token(page_token: str) -> tuple[datetime, str]:
+  try:
+    timestamp, event_id = json.loads(base64.urlsafe_b64decode(page_token))
+    return datetime.fromisoformat(timestamp), event_id
+  except (TypeError, ValueError) as e:
+    raise ValueError(f"Invalid page token '{page_token}'.") from e
+
+
+def _get_engine_urls(url: URL) -> tuple[URL, Optional[URL]]:
+  """Returns the sync and async engine URLs for a database URL.
+
+  The async URL is None if the database has no known async driver, or if the
+  database lives in memory and can't be shared between two engines.
+  """
+  backend = url.get_backend_name()
+  async_driver = _ASYNC_DRIVERS.get(backend)
+  if async_driver and url.get_driver_name() == async_driver:
+    sync_url, async_url = url.set(drivername=backend), url
+  elif async_driver:
+    sync_url, async_url = url, url.set(drivername=f"{backend}+{async_driver}")
+  else:
+    return url, None
+  if backend == "sqlite" and url.database in (None, "", ":memory:"):
+    return sync_url, None
+  return sync_url, async_url
+
+
 def _extract_state_delta(state: dict):
   app_state_delta = {}
   user_state_delta = {}
@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import base64
+import bisect
 import copy
+import json
 import time
 from typing import Any
 from typing import Optional
@@ -68,7 +71,7 @@ class InMemorySessionService(BaseSessionService):
       self.sessions[app_name][user_id] = {}
     self.sessions[app_name][user_id][session_id] = session
 
-    copied_session = copy.deepcopy(session)
+    copied_session = self._copy_session(session)
     return self._merge_state(app_name, user_id, copied_session)
 
   @override
@@ -88,24 +91,48 @@ class InMemorySessionService(BaseSessionService):
       return None
 
     session = self.sessions[app_name][user_id].get(session_id)
-    copied_session = copy.deepcopy(session)
+    events = session.events
 
     if config:
       if config.num_recent_events:
-        copied_session.events = copied_session.events[
-            -config.num_recent_events :
-        ]
-      elif config.after_timestamp:
-        i = len(session.events) - 1
+        events = events[-config.num_recent_events :]
+      if config.after_timestamp:
+        i = len(events) - 1
         while i >= 0:
-          if copied_session.events[i].timestamp < config.after_timestamp:
+          if events[i].timestamp < config.after_timestamp:
             break
           i -= 1
-        if i >= 0:
-          copied_session.events = copied_session.events[i:]
+        events = events[i + 1 :]
 
+    copied_session = self._copy_session(session, events=events)
     return self._merge_state(app_name, user_id, copied_session)
 
+  def _copy_session(
+      self, session: Session, events: Optional[list[Event]] = None
+  ) -> Session:
+    """Returns a copy-on-write snapshot of a storage session.
+
+    Appended events are never modified in place, so the snapshot shares the
+    event objects with the storage session and only owns a new event list.
+    Appending to the snapshot therefore never touches the storage session.
+    The state is small and may hold nested values that callers mutate, so it
+    is still copied deeply.
+
+    Args:
+      session: The storage session to copy.
+      events: The events to expose in the snapshot. Defaults to all the events
+        of the storage session.
+
+    Returns:
+      The snapshot of the session.
+    """
+    return session.model_copy(
+        update={
+            'state': copy.deepcopy(session.state),
+            'events': list(session.events if events is None else events),
+        }
+    )
+
   def _merge_state(self, app_name: str, user_id: str, copied_session: Session):
     # Merge app state
     if app_name in self.app_state:
@@ -139,9 +166,7 @@ class InMemorySessionService(BaseSessionService):
 
     sessions_without_events = []
     for session in self.sessions[app_name][user_id].values():
-      copied_session = copy.deepcopy(session)
-      copied_session.events = []
-      copied_session.state = {}
+      copied_session = session.model_copy(update={'events': [], 'state': {}})
       sessions_without_events.append(copied_session)
     return ListSessionsResponse(sessions=sessions_without_events)
 
@@ -149,12 +174,7 @@ class InMemorySessionService(BaseSessionService):
   def delete_session(
       self, *, app_name: str, user_id: str, session_id: str
   ) -> None:
-    if (
-        self.get_session(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
-        is None
-    ):
+    if session_id not in self.sessions.get(app_name, {}).get(user_id, {}):
       return None
 
     self.sessions[app_name][user_id].pop(session_id)
@@ -202,5 +222,43 @@ class InMemorySessionService(BaseSessionService):
       app_name: str,
       user_id: str,
       session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
   ) -> ListEventsResponse:
-    raise NotImplementedError()
+    session = self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+    if session is None:
+      return ListEventsResponse()
+
+    # Events with the same timestamp are ordered by id, as in the database
+    # session service, and the page token is the key of the last event listed.
+    events = sorted(session.events, key=_get_event_key)
+    start = 0
+    if page_token:
+      start = bisect.bisect_right(
+          [_get_event_key(event) for event in events],
+          _decode_page_token(page_token),
+      )
+    end = start + page_size if page_size else len(events)
+    return ListEventsResponse(
+        events=events[start:end],
+        next_page_token=(
+            _encode_page_token(events[end - 1]) if end < len(events) else None
+        ),
+    )
+
+
+def _get_event_key(event: Event) -> tuple[float, str]:
+  return event.timestamp, event.id
+
+
+def _encode_page_token(event: Event) -> str:
+  token = json.dumps(_get_event_key(event))
+  return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def _decode_page_token(page_token: str) -> tuple[float, str]:
+  try:
+    timestamp, event_id = json.loads(base64.urlsafe_b64decode(page_token))
+    return float(timestamp), str(event_id)
+  except (TypeError, ValueError) as e:
+    raise ValueError(f"Invalid page token '{page_token}'.") from e
@@ -13,10 +13,12 @@
 # limitations under the License.
 
 from typing import Any
+from typing import Optional
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
+from pydantic import PrivateAttr
 
 from ..events.event import Event
 
@@ -52,3 +54,7 @@ class Session(BaseModel):
   call/response, etc."""
   last_update_time: float = 0.0
   """The last update time of the session."""
+
+  _storage_version: Optional[int] = PrivateAttr(default=None)
+  """The version of the session in the storage it was read from, used by the
+  session services to detect concurrent writes."""
@@ -11,11 +11,13 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import logging
 import re
 import time
 from typing import Any
 from typing import Optional
+from urllib.parse import urlencode
 
 from dateutil.parser import isoparse
 from google import genai
@@ -156,14 +158,13 @@ class VertexAiSessionService(BaseSessionService):
     if config:
       if config.num_recent_events:
         session.events = session.events[-config.num_recent_events :]
-      elif config.after_timestamp:
+      if config.after_timestamp:
         i = len(session.events) - 1
         while i >= 0:
           if session.events[i].timestamp < config.after_timestamp:
             break
           i -= 1
-        if i >= 0:
-          session.events = session.events[i:]
+        session.events = session.events[i + 1 :]
 
     return session
 
@@ -212,11 +213,23 @@ class VertexAiSessionService(BaseSessionService):
       app_name: str,
       user_id: str,
       session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
   ) -> ListEventsResponse:
     reasoning_engine_id = _parse_reasoning_engine_id(app_name)
+    path = (
+        f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events'
+    )
+    query_params = {}
+    if page_size:
+      query_params['pageSize'] = page_size
+    if page_token:
+      query_params['pageToken'] = page_token
+    if query_params:
+      path = f'{path}?{urlencode(query_params)}'
     api_response = self.api_client.request(
         http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events',
+        path=path,
         request_dict={},
     )
 
@@ -229,7 +242,8 @@ class VertexAiSessionService(BaseSessionService):
     session_events = api_response['sessionEvents']
 
     return ListEventsResponse(
-        events=[_from_api_event(event) for event in session_events]
+        events=[_from_api_event(event) for event in session_events],
+        next_page_token=api_response.get('nextPageToken', None),
     )
 
   @override
@@ -246,6 +260,87 @@ class VertexAiSessionService(BaseSessionService):
 
     return event
 
+  # The Vertex AI API client is blocking, so the async variants run the sync
+  # implementations in a worker thread instead of on the event loop.
+
+  @override
+  async def create_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    return await asyncio.to_thread(
+        self.create_session,
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  @override
+  async def get_session_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Session:
+    return await asyncio.to_thread(
+        self.get_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  @override
+  async def list_sessions_async(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    return await asyncio.to_thread(
+        self.list_sessions, app_name=app_name, user_id=user_id
+    )
+
+  @override
+  async def delete_session_async(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    await asyncio.to_thread(
+        self.delete_session,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+
+  @override
+  async def list_events_async(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      page_size: Optional[int] = None,
+      page_token: Optional[str] = None,
+  ) -> ListEventsResponse:
+    return await asyncio.to_thread(
+        self.list_events,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        page_size=page_size,
+        page_token=page_token,
+    )
+
+  @override
+  async def append_event_async(self, session: Session, event: Event) -> Event:
+    return await asyncio.to_thread(
+        self.append_event, session=session, event=event
+    )
+
 
 def _convert_event_to_json(event: Event):
   metadata_json = {
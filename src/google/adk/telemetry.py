@@ -25,6 +25,7 @@ import json
 from typing import Any
 
 from google.genai import types
+from opentelemetry import metrics
 from opentelemetry import trace
 
 from .agents.invocation_context import InvocationContext
@@ -32,8 +33,14 @@ from .events.event import Event
 from .models.llm_request import LlmRequest
 from .models.llm_response import LlmResponse
 
-
 tracer = trace.get_tracer('gcp.vertex.agent')
+meter = metrics.get_meter('gcp.vertex.agent')
+
+_token_usage_histogram = meter.create_histogram(
+    'gen_ai.client.token.usage',
+    unit='{token}',
+    description='Measures number of input and output tokens used.',
+)
 
 
 def trace_tool_call(
@@ -124,6 +131,40 @@ def trace_call_llm(
   )
 
 
+def record_token_usage(
+    invocation_context: InvocationContext,
+    llm_request: LlmRequest,
+    usage_metadata: types.GenerateContentResponseUsageMetadata,
+):
+  """Records the token usage of a call to the LLM.
+
+  The usage is recorded as attributes on the current OpenTelemetry span, and
+  in the `gen_ai.client.token.usage` histogram.
+
+  Args:
+    invocation_context: The invocation context for the current agent run.
+    llm_request: The LLM request object.
+    usage_metadata: The token usage of the call.
+  """
+  input_tokens = usage_metadata.prompt_token_count or 0
+  output_tokens = usage_metadata.candidates_token_count or 0
+  span = trace.get_current_span()
+  span.set_attribute('gen_ai.usage.input_tokens', input_tokens)
+  span.set_attribute('gen_ai.usage.output_tokens', output_tokens)
+  attributes = {
+      'gen_ai.system': 'gcp.vertex.agent',
+      'gen_ai.request.model': llm_request.model or '',
+      'gcp.vertex.agent.app_name': invocation_context.app_name,
+      'gcp.vertex.agent.agent_name': invocation_context.agent.name,
+  }
+  _token_usage_histogram.record(
+      input_tokens, {**attributes, 'gen_ai.token.type': 'input'}
+  )
+  _token_usage_histogram.record(
+      output_tokens, {**attributes, 'gen_ai.token.type': 'output'}
+  )
+
+
 def trace_send_data(
     invocation_context: InvocationContext,
     event_id: str,
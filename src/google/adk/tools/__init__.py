@@ -28,6 +28,9 @@ from .load_memory_tool import load_memory_tool as load_memory
 from .long_running_tool import LongRunningFunctionTool
 from .preload_memory_tool import preload_memory_tool as preload_memory
 from .tool_context import ToolContext
+from .tool_selector import BaseToolSelector
+from .tool_selector import Bm25ToolSelector
+from .tool_selector import EmbeddingToolSelector
 from .transfer_to_agent_tool import transfer_to_agent
 
 
@@ -35,10 +38,13 @@ __all__ = [
     'APIHubToolset',
     'AuthToolArguments',
     'BaseTool',
+    'BaseToolSelector',
+    'Bm25ToolSelector',
     'built_in_code_execution',
     'google_search',
     'VertexAiSearchTool',
     'ExampleTool',
+    'EmbeddingToolSelector',
     'exit_loop',
     'FunctionTool',
     'get_user_choice',
@@ -129,6 +129,7 @@ class AgentTool(BaseTool):
         artifact_service=tool_context._invocation_context.artifact_service,
         session_service=InMemorySessionService(),
         memory_service=InMemoryMemoryService(),
+        tool_executor=tool_context._invocation_context.tool_executor,
     )
     session = runner.session_service.create_session(
         app_name=self.agent.name,
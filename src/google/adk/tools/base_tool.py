@@ -96,6 +96,14 @@ class BaseTool(ABC):
     if (function_declaration := self._get_declaration()) is None:
       return
 
+    self._append_declaration(llm_request, function_declaration)
+
+  def _append_declaration(
+      self,
+      llm_request: LlmRequest,
+      function_declaration: types.FunctionDeclaration,
+  ) -> None:
+    """Adds this tool and its function declaration to the LLM request."""
     llm_request.tools_dict[self.name] = self
     if tool_with_function_declarations := _find_tool_with_function_declarations(
         llm_request
@@ -120,11 +128,15 @@ class BaseTool(ABC):
 
   @property
   def _api_variant(self) -> str:
-    use_vertexai = os.environ.get('GOOGLE_GENAI_USE_VERTEXAI', '0').lower() in [
-        'true',
-        '1',
-    ]
-    return 'VERTEX_AI' if use_vertexai else 'GOOGLE_AI'
+    return _get_api_variant()
+
+
+def _get_api_variant() -> str:
+  use_vertexai = os.environ.get('GOOGLE_GENAI_USE_VERTEXAI', '0').lower() in [
+      'true',
+      '1',
+  ]
+  return 'VERTEX_AI' if use_vertexai else 'GOOGLE_AI'
 
 
 def _find_tool_with_function_declarations(
@@ -23,18 +23,37 @@ from typing_extensions import override
 from ._automatic_function_calling_util import build_function_declaration
 from .base_tool import BaseTool
 from .tool_context import ToolContext
+from .tool_executor import run_sync_tool
 
 
 class FunctionTool(BaseTool):
   """A tool that wraps a user-defined Python function.
 
+  A sync function runs in the tool executor of the invocation, so that it does
+  not block the event loop.
+
   Attributes:
     func: The function to wrap.
+    run_in_process: Whether to run the sync function in the process pool of
+      the tool executor instead of its thread pool.
   """
 
-  def __init__(self, func: Callable[..., Any]):
+  def __init__(self, func: Callable[..., Any], *, run_in_process: bool = False):
     super().__init__(name=func.__name__, description=func.__doc__)
     self.func = func
+    self.run_in_process = run_in_process
+    """Whether to run the sync function in the process pool of the tool
+    executor. The function and its arguments must be picklable, and the
+    function cannot take a tool_context. If the tool executor has no process
+    pool, the function runs in its thread pool."""
+    if run_in_process and (
+        inspect.iscoroutinefunction(func)
+        or 'tool_context' in inspect.signature(func).parameters
+    ):
+      raise ValueError(
+          f'Function {self.name} cannot run in a process. Only sync functions'
+          ' without a tool_context can run in a process.'
+      )
 
   @override
   def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
@@ -61,8 +80,11 @@ class FunctionTool(BaseTool):
 
     if inspect.iscoroutinefunction(self.func):
       return await self.func(**args_to_call) or {}
-    else:
-      return self.func(**args_to_call) or {}
+
+    executor = tool_context._invocation_context.tool_executor
+    if self.run_in_process and executor and executor.max_process_workers:
+      return await executor.run_in_process(self.func, **args_to_call) or {}
+    return await run_sync_tool(tool_context, self.func, **args_to_call) or {}
 
   # TODO(hangfei): fix call live for function stream.
   async def _call_live(
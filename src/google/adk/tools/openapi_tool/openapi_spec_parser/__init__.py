@@ -15,6 +15,7 @@
 from .openapi_spec_parser import OpenApiSpecParser, OperationEndpoint, ParsedOperation
 from .openapi_toolset import OpenAPIToolset
 from .operation_parser import OperationParser
+from .rest_api_client import RestApiClient
 from .rest_api_tool import AuthPreparationState, RestApiTool, snake_to_lower_camel, to_gemini_schema
 from .tool_auth_handler import ToolAuthHandler
 
@@ -24,6 +25,7 @@ __all__ = [
     'ParsedOperation',
     'OpenAPIToolset',
     'OperationParser',
+    'RestApiClient',
     'RestApiTool',
     'to_gemini_schema',
     'snake_to_lower_camel',
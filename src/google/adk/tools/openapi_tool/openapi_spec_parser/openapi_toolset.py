@@ -26,6 +26,7 @@ import yaml
 from ....auth.auth_credential import AuthCredential
 from ....auth.auth_schemes import AuthScheme
 from .openapi_spec_parser import OpenApiSpecParser
+from .rest_api_client import RestApiClient
 from .rest_api_tool import RestApiTool
 
 logger = logging.getLogger(__name__)
@@ -61,6 +62,7 @@ class OpenAPIToolset:
       spec_str_type: Literal["json", "yaml"] = "json",
       auth_scheme: Optional[AuthScheme] = None,
       auth_credential: Optional[AuthCredential] = None,
+      http_client: Optional[RestApiClient] = None,
   ):
     """Initializes the OpenAPIToolset.
 
@@ -94,9 +96,12 @@ class OpenAPIToolset:
       auth_credential: The auth credential to use for all tools. Use
         AuthCredential or use helpers in
         `google.adk.tools.openapi_tool.auth.auth_helpers`
+      http_client: The pooled HTTP client shared by all tools. Defaults to a new
+        RestApiClient for this toolset.
     """
     if not spec_dict:
       spec_dict = self._load_spec(spec_str, spec_str_type)
+    self.http_client: Final[RestApiClient] = http_client or RestApiClient()
     self.tools: Final[List[RestApiTool]] = list(self._parse(spec_dict))
     if auth_scheme or auth_credential:
       self._configure_auth_all(auth_scheme, auth_credential)
@@ -139,6 +144,7 @@ class OpenAPIToolset:
     tools = []
     for o in operations:
       tool = RestApiTool.from_parsed_operation(o)
+      tool.http_client = self.http_client
       logger.info("Parsed tool: %s", tool.name)
       tools.append(tool)
     return tools
@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Union
+import weakref
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_IDEMPOTENT_METHODS = frozenset(
+    ["get", "head", "options", "put", "delete", "trace"]
+)
+
+# Errors raised before the request is sent, so any request can be retried.
+_RETRYABLE_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+)
+
+
+class RestApiClient:
+  """A pooled async HTTP client for RestApiTools.
+
+  The tools of an OpenAPIToolset share one client, so their calls to the same
+  host reuse connections. Failed requests are retried with exponential
+  backoff: connection errors for every method, and retryable status codes for
+  idempotent methods only.
+
+  httpx clients are bound to the event loop that uses them, so one
+  httpx.AsyncClient is created per event loop.
+  """
+
+  def __init__(
+      self,
+      *,
+      limits: Optional[httpx.Limits] = None,
+      timeout: Union[httpx.Timeout, float] = 30.0,
+      max_retries: int = 2,
+      backoff_factor: float = 0.5,
+      max_backoff: float = 10.0,
+      retry_status_codes: frozenset[int] = frozenset([429, 502, 503, 504]),
+      http2: bool = False,
+  ):
+    """Initializes the RestApiClient.
+
+    Args:
+      limits: The connection pool limits. Defaults to the httpx defaults.
+      timeout: The request timeout in seconds, or an httpx.Timeout.
+      max_retries: The max number of retries of a failed request.
+      backoff_factor: The delay before the first retry in seconds. The delay
+        doubles with each retry.
+      max_backoff: The max delay between retries in seconds.
+      retry_status_codes: The status codes that are retried for idempotent
+        methods.
+      http2: Whether to use HTTP/2. Requires the `h2` package.
+    """
+    if max_retries < 0:
+      raise ValueError("max_retries should not be negative.")
+    self.limits = limits or httpx.Limits()
+    self.timeout = timeout
+    self.max_retries = max_retries
+    self.backoff_factor = backoff_factor
+    self.max_backoff = max_backoff
+    self.retry_status_codes = retry_status_codes
+    self.http2 = http2
+    self._clients: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, httpx.AsyncClient
+    ] = weakref.WeakKeyDictionary()
+
+  async def request(self, **request_params: Any) -> httpx.Response:
+    """Sends a request and returns the response.
+
+    Args:
+      **request_params: The request params built by
+        RestApiTool._prepare_request_params, in the format of
+        requests.request().
+
+    Returns:
+      The response of the last attempt.
+    """
+    request_params = _to_httpx_params(request_params)
+    method = request_params["method"].lower()
+    client = self._get_client()
+    attempt = 0
+    while True:
+      try:
+        response = await client.request(**request_params)
+      except _RETRYABLE_ERRORS as e:
+        if attempt >= self.max_retries:
+          raise
+        delay = self._get_backoff(attempt)
+        logger.warning(
+            "Request to %s failed: %r. Retrying in %.2fs.",
+            request_params["url"],
+            e,
+            delay,
+        )
+      else:
+        if (
+            attempt >= self.max_retries
+            or method not in _IDEMPOTENT_METHODS
+            or response.status_code not in self.retry_status_codes
+        ):
+          return response
+        delay = self._get_backoff(attempt, response)
+        logger.warning(
+            "Request to %s returned %s. Retrying in %.2fs.",
+            request_params["url"],
+            response.status_code,
+            delay,
+        )
+        await response.aclose()
+      await asyncio.sleep(delay)
+      attempt += 1
+
+  async def aclose(self) -> None:
+    """Closes the client of the running event loop."""
+    client = self._clients.pop(asyncio.get_running_loop(), None)
+    if client:
+      await client.aclose()
+
+  def _get_client(self) -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = self._clients.get(loop)
+    if not client or client.is_closed:
+      client = httpx.AsyncClient(
+          limits=self.limits,
+          timeout=self.timeout,
+          http2=self.http2,
+          follow_redirects=True,
+      )
+      self._clients[loop] = client
+    return client
+
+  def _get_backoff(
+      self, attempt: int, response: Optional[httpx.Response] = None
+  ) -> float:
+    delay = self.backoff_factor * 2**attempt
+    retry_after = response.headers.get("Retry-After") if response else None
+    if retry_after:
+      try:
+        delay = float(retry_after)
+      except ValueError:
+        pass  # An HTTP date, use the exponential backoff instead.
+    return min(delay, self.max_backoff)
+
+
+def _to_httpx_params(request_params: Dict[str, Any]) -> Dict[str, Any]:
+  """Converts requests.request() params to httpx params."""
+  params = dict(request_params)
+  # httpx takes raw bodies as content, and only form fields as data.
+  if isinstance(params.get("data"), (str, bytes)):
+    params["content"] = params.pop("data")
+  # httpx deprecates per request cookies, so send them as a header.
+  cookies = params.pop("cookies", None)
+  if cookies:
+    params["headers"] = {
+        **(params.get("headers") or {}),
+        "Cookie": "; ".join(f"{k}={v}" for k, v in cookies.items()),
+    }
+  return params
+
+
+_default_client: Optional[RestApiClient] = None
+
+
+def get_default_client() -> RestApiClient:
+  """Returns the client shared by the RestApiTools outside of a toolset."""
+  global _default_client
+  if not _default_client:
+    _default_client = RestApiClient()
+  return _default_client
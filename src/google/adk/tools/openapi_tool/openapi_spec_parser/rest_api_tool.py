@@ -23,6 +23,7 @@ from typing import Union
 from fastapi.openapi.models import Operation
 from google.genai.types import FunctionDeclaration
 from google.genai.types import Schema
+import httpx
 import requests
 from typing_extensions import override
 
@@ -30,6 +31,7 @@ from ....auth.auth_credential import AuthCredential
 from ....auth.auth_schemes import AuthScheme
 from ....tools import BaseTool
 from ...tool_context import ToolContext
+from ...tool_executor import run_sync_tool
 from ..auth.auth_helpers import credential_to_param
 from ..auth.auth_helpers import dict_to_auth_scheme
 from ..auth.credential_exchangers.auto_auth_credential_exchanger import AutoAuthCredentialExchanger
@@ -38,6 +40,8 @@ from ..common.common import to_snake_case
 from .openapi_spec_parser import OperationEndpoint
 from .openapi_spec_parser import ParsedOperation
 from .operation_parser import OperationParser
+from .rest_api_client import get_default_client
+from .rest_api_client import RestApiClient
 from .tool_auth_handler import ToolAuthHandler
 
 
@@ -135,6 +139,11 @@ def to_gemini_schema(openapi_schema: Optional[Dict[str, Any]] = None) -> Schema:
 
 AuthPreparationState = Literal["pending", "done"]
 
+_AUTH_PENDING_RESPONSE = {
+    "pending": True,
+    "message": "Needs your authorization to access your data.",
+}
+
 
 class RestApiTool(BaseTool):
   """A generic tool that interacts with a REST API.
@@ -160,6 +169,7 @@ class RestApiTool(BaseTool):
       auth_scheme: Optional[Union[AuthScheme, str]] = None,
       auth_credential: Optional[Union[AuthCredential, str]] = None,
       should_parse_operation=True,
+      http_client: Optional[RestApiClient] = None,
   ):
     """Initializes the RestApiTool with the given parameters.
 
@@ -187,6 +197,8 @@ class RestApiTool(BaseTool):
           (https://github.com/OAI/OpenAPI-Specification/blob/main/versions/3.1.0.md#security-scheme-object)
         auth_credential: The authentication credential of the tool.
         should_parse_operation: Whether to parse the operation.
+        http_client: The pooled HTTP client for the API calls. If not set, the
+          client shared by all RestApiTools is used.
     """
     # Gemini restrict the length of function name to be less than 64 characters
     self.name = name[:60]
@@ -205,6 +217,7 @@ class RestApiTool(BaseTool):
 
     self.configure_auth_credential(auth_credential)
     self.configure_auth_scheme(auth_scheme)
+    self.http_client = http_client
 
     # Private properties
     self.credential_exchanger = AutoAuthCredentialExchanger()
@@ -417,13 +430,37 @@ class RestApiTool(BaseTool):
   async def run_async(
       self, *, args: dict[str, Any], tool_context: Optional[ToolContext]
   ) -> Dict[str, Any]:
-    return self.call(args=args, tool_context=tool_context)
+    # Preparing the auth credentials may block on a token exchange, so it runs
+    # in the tool executor.
+    request_params = await run_sync_tool(
+        tool_context,
+        self._prepare_call_params,
+        args=args,
+        tool_context=tool_context,
+    )
+    if request_params is None:
+      return dict(_AUTH_PENDING_RESPONSE)
+
+    http_client = self.http_client or get_default_client()
+    response = await http_client.request(**request_params)
+
+    # Parse API response
+    try:
+      response.raise_for_status()  # Raise HTTPStatusError for bad responses
+      return response.json()  # Try to decode JSON
+    except httpx.HTTPStatusError:
+      return self._get_error_response(response.content.decode("utf-8"))
+    except ValueError:
+      return {"text": response.text}  # Return text if not JSON
 
   def call(
       self, *, args: dict[str, Any], tool_context: Optional[ToolContext]
   ) -> Dict[str, Any]:
     """Executes the REST API call.
 
+    This blocks on the HTTP request, use run_async to call the API through
+    the pooled http_client instead.
+
     Args:
         args: Keyword arguments representing the operation parameters.
         tool_context: The tool context (not used here, but required by the
@@ -432,6 +469,31 @@ class RestApiTool(BaseTool):
     Returns:
         The API response as a dictionary.
     """
+    request_params = self._prepare_call_params(
+        args=args, tool_context=tool_context
+    )
+    if request_params is None:
+      return dict(_AUTH_PENDING_RESPONSE)
+
+    response = requests.request(**request_params)
+
+    # Parse API response
+    try:
+      response.raise_for_status()  # Raise HTTPError for bad responses
+      return response.json()  # Try to decode JSON
+    except requests.exceptions.HTTPError:
+      return self._get_error_response(response.content.decode("utf-8"))
+    except ValueError:
+      return {"text": response.text}  # Return text if not JSON
+
+  def _prepare_call_params(
+      self, *, args: dict[str, Any], tool_context: Optional[ToolContext]
+  ) -> Optional[Dict[str, Any]]:
+    """Prepares the request params of the API call.
+
+    Returns:
+        The request params, or None if the auth credentials are pending.
+    """
     # Prepare auth credentials for the API call
     tool_auth_handler = ToolAuthHandler.from_tool_context(
         tool_context, self.auth_scheme, self.auth_credential
@@ -444,10 +506,7 @@ class RestApiTool(BaseTool):
     )
 
     if auth_state == "pending":
-      return {
-          "pending": True,
-          "message": "Needs your authorization to access your data.",
-      }
+      return None
 
     # Attach parameters from auth into main parameters list
     api_params, api_args = self._operation_parser.get_parameters().copy(), args
@@ -460,26 +519,18 @@ class RestApiTool(BaseTool):
         api_params = [auth_param] + api_params
         api_args.update(auth_args)
 
-    # Got all parameters. Call the API.
-    request_params = self._prepare_request_params(api_params, api_args)
-    response = requests.request(**request_params)
-
-    # Parse API response
-    try:
-      response.raise_for_status()  # Raise HTTPError for bad responses
-      return response.json()  # Try to decode JSON
-    except requests.exceptions.HTTPError:
-      error_details = response.content.decode("utf-8")
-      return {
-          "error": (
-              f"Tool {self.name} execution failed. Analyze this execution error"
-              " and your inputs. Retry with adjustments if applicable. But"
-              " make sure don't retry more than 3 times. Execution Error:"
-              f" {error_details}"
-          )
-      }
-    except ValueError:
-      return {"text": response.text}  # Return text if not JSON
+    # Got all parameters.
+    return self._prepare_request_params(api_params, api_args)
+
+  def _get_error_response(self, error_details: str) -> Dict[str, Any]:
+    return {
+        "error": (
+            f"Tool {self.name} execution failed. Analyze this execution error"
+            " and your inputs. Retry with adjustments if applicable. But"
+            " make sure don't retry more than 3 times. Execution Error:"
+            f" {error_details}"
+        )
+    }
 
   def __str__(self):
     return (
@@ -80,11 +80,8 @@ class ToolContext(CallbackContext):
     )
 
   def search_memory(self, query: str) -> 'SearchMemoryResponse':
-    """Searches the memory of the current user."""
-    if self._invocation_context.memory_service is None:
-      raise ValueError('Memory service is not available.')
-    return self._invocation_context.memory_service.search_memory(
-        app_name=self._invocation_context.app_name,
-        user_id=self._invocation_context.user_id,
-        query=query,
-    )
+    """Searches the memory of the current user.
+
+    A query is only searched once per invocation.
+    """
+    return self._invocation_context.search_memory(query)
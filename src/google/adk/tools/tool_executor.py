@@ -0,0 +1,202 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import Union
+import weakref
+
+from opentelemetry import trace
+
+if TYPE_CHECKING:
+  from .tool_context import ToolContext
+
+
+class ToolExecutor:
+  """Runs blocking tool calls off the event loop.
+
+  Sync tools run in a thread pool, so a slow tool does not block the other
+  sessions served by the same event loop. CPU bound tools can run in an
+  optional process pool instead. The pools are created on first use.
+
+  Each time a thread pool call completes, the executor measures how long the
+  event loop took to resume the waiting coroutine. This event loop lag is
+  kept in `last_event_loop_lag` and `max_event_loop_lag`, and recorded on the
+  current span as `gcp.vertex.agent.event_loop_lag`.
+  """
+
+  def __init__(
+      self,
+      *,
+      max_workers: Optional[int] = None,
+      max_queue_size: Optional[int] = None,
+      max_process_workers: int = 0,
+  ):
+    """Initializes the ToolExecutor.
+
+    Args:
+      max_workers: The max number of threads. Defaults to the default of
+        `concurrent.futures.ThreadPoolExecutor`.
+      max_queue_size: The max number of calls waiting for a free thread. Once
+        the queue is full, new calls wait on the event loop before they are
+        submitted. If not set, the queue is unbounded.
+      max_process_workers: The max number of processes for the tools that run
+        in a process. 0 disables the process pool.
+    """
+    if max_workers is not None and max_workers <= 0:
+      raise ValueError('max_workers should be greater than 0.')
+    if max_queue_size is not None and max_queue_size < 0:
+      raise ValueError('max_queue_size should not be negative.')
+    if max_process_workers < 0:
+      raise ValueError('max_process_workers should not be negative.')
+    self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    self.max_queue_size = max_queue_size
+    self.max_process_workers = max_process_workers
+
+    self.last_event_loop_lag: float = 0.0
+    """The event loop lag in seconds measured by the last call."""
+    self.max_event_loop_lag: float = 0.0
+    """The max event loop lag in seconds measured so far."""
+
+    self._lock = threading.Lock()
+    self._thread_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    # asyncio primitives are bound to an event loop, so the queue slots are
+    # tracked per event loop.
+    self._slots: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, asyncio.Semaphore
+    ] = weakref.WeakKeyDictionary()
+
+  async def run(self, func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Runs the function in the thread pool and returns its result."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    finish_time = 0.0
+
+    def call() -> Any:
+      nonlocal finish_time
+      try:
+        return context.run(func, *args, **kwargs)
+      finally:
+        finish_time = time.perf_counter()
+
+    async with self._get_slots(loop):
+      try:
+        return await loop.run_in_executor(self._get_thread_pool(), call)
+      finally:
+        if finish_time:
+          self._record_event_loop_lag(time.perf_counter() - finish_time)
+
+  async def run_in_process(
+      self, func: Callable[..., Any], /, *args, **kwargs
+  ) -> Any:
+    """Runs the function in the process pool and returns its result.
+
+    The function and its arguments must be picklable.
+    """
+    if not self.max_process_workers:
+      raise ValueError('The process pool is disabled.')
+    loop = asyncio.get_running_loop()
+    async with self._get_slots(loop):
+      return await loop.run_in_executor(
+          self._get_process_pool(), functools.partial(func, *args, **kwargs)
+      )
+
+  def shutdown(self, wait: bool = True) -> None:
+    """Shuts down the pools. The pools are recreated if the executor is used
+    again."""
+    with self._lock:
+      thread_pool, self._thread_pool = self._thread_pool, None
+      process_pool, self._process_pool = self._process_pool, None
+    if thread_pool:
+      thread_pool.shutdown(wait=wait)
+    if process_pool:
+      process_pool.shutdown(wait=wait)
+
+  def _get_slots(
+      self, loop: asyncio.AbstractEventLoop
+  ) -> Union[asyncio.Semaphore, _NoLimit]:
+    if self.max_queue_size is None:
+      return _NO_LIMIT
+    if loop not in self._slots:
+      self._slots[loop] = asyncio.Semaphore(
+          self.max_workers + self.max_process_workers + self.max_queue_size
+      )
+    return self._slots[loop]
+
+  def _get_thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+    with self._lock:
+      if not self._thread_pool:
+        self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='adk_tool'
+        )
+      return self._thread_pool
+
+  def _get_process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+    with self._lock:
+      if not self._process_pool:
+        self._process_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_process_workers
+        )
+      return self._process_pool
+
+  def _record_event_loop_lag(self, lag: float) -> None:
+    self.last_event_loop_lag = lag
+    self.max_event_loop_lag = max(self.max_event_loop_lag, lag)
+    trace.get_current_span().set_attribute(
+        'gcp.vertex.agent.event_loop_lag', lag
+    )
+
+
+class _NoLimit:
+  """A stand-in for asyncio.Semaphore that never waits."""
+
+  async def __aenter__(self) -> None:
+    pass
+
+  async def __aexit__(self, *exc_info) -> None:
+    pass
+
+
+_NO_LIMIT = _NoLimit()
+
+
+async def run_sync_tool(
+    tool_context: Optional[ToolContext],
+    func: Callable[..., Any],
+    /,
+    *args,
+    **kwargs,
+) -> Any:
+  """Runs a sync tool function with the tool executor of the invocation.
+
+  If the invocation has no tool executor, the function runs on the event loop.
+  """
+  executor = (
+      tool_context._invocation_context.tool_executor if tool_context else None
+  )
+  if not executor:
+    return func(*args, **kwargs)
+  return await executor.run(func, *args, **kwargs)
@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from typing import Any
+from typing import Optional
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+from google.genai import types
+
+from .base_tool import _get_api_variant
+from .base_tool import BaseTool
+from .tool_context import ToolContext
+from .tool_selector import BaseToolSelector
+from .tool_selector import ToolIndex
+
+if TYPE_CHECKING:
+  from ..agents.invocation_context import InvocationContext
+  from ..models.llm_request import LlmRequest
+
+
+class ToolManifest:
+  """The tools of an agent, with their function declarations built once.
+
+  Building the declaration of a FunctionTool inspects the function and creates
+  a pydantic model of its parameters, which is too slow to repeat for every
+  tool on every model call. The manifest builds the declarations once per API
+  variant and adds a copy of them to each LLM request, so that the requests
+  can be modified, e.g. by callbacks, without changing the next requests.
+
+  Tools that override `process_llm_request`, e.g. to add instructions to the
+  request, still process each request themselves.
+
+  With a tool selector, only the declarations of the selected tools are added.
+  The selector's index is also built once per API variant.
+
+  The manifest is built from the `tools` of an agent, and is replaced when
+  they change. This class is only for use by Agent Development Kit.
+
+  Attributes:
+    tools: The tools, in the order of the agent's `tools`.
+  """
+
+  def __init__(self, tool_unions: Sequence[Any], tools: list[BaseTool]):
+    """Initializes the ToolManifest.
+
+    Args:
+      tool_unions: The `tools` of the agent the manifest is built from.
+      tools: The tools resolved from `tool_unions`.
+    """
+    self._tool_unions = tuple(tool_unions)
+    self.tools = tools
+    self._processes_requests = [
+        type(tool).process_llm_request is not BaseTool.process_llm_request
+        for tool in tools
+    ]
+    self._declarations: dict[str, list[Optional[types.FunctionDeclaration]]] = (
+        {}
+    )
+    self._tool_indexes: dict[str, tuple[BaseToolSelector, ToolIndex]] = {}
+
+  def is_built_from(self, tool_unions: Sequence[Any]) -> bool:
+    """Returns whether the manifest was built from these exact tools."""
+    return len(tool_unions) == len(self._tool_unions) and all(
+        tool_union is own_tool_union
+        for tool_union, own_tool_union in zip(tool_unions, self._tool_unions)
+    )
+
+  def get_declarations(self) -> list[Optional[types.FunctionDeclaration]]:
+    """Returns the declaration of each tool for the current API variant.
+
+    The declaration is None for the tools that process requests themselves,
+    and for the tools without a declaration. The declarations are shared by
+    all the requests, and must not be modified.
+    """
+    api_variant = _get_api_variant()
+    if api_variant not in self._declarations:
+      self._declarations[api_variant] = [
+          None if processes_requests else tool._get_declaration()
+          for tool, processes_requests in zip(
+              self.tools, self._processes_requests
+          )
+      ]
+    return self._declarations[api_variant]
+
+  async def process_llm_request(
+      self,
+      invocation_context: InvocationContext,
+      llm_request: LlmRequest,
+      tool_selector: Optional[BaseToolSelector] = None,
+  ) -> None:
+    """Adds the tools to the LLM request, in order.
+
+    Args:
+      invocation_context: The invocation context.
+      llm_request: The outgoing LLM request, mutable this method.
+      tool_selector: If set, selects the tools whose declarations are added.
+    """
+    selected_tools = (
+        self._select_tools(tool_selector, llm_request)
+        if tool_selector
+        else None
+    )
+    for tool, processes_requests, declaration in zip(
+        self.tools, self._processes_requests, self.get_declarations()
+    ):
+      if processes_requests:
+        await tool.process_llm_request(
+            tool_context=ToolContext(invocation_context),
+            llm_request=llm_request,
+        )
+      elif not declaration:
+        continue
+      elif selected_tools is None or tool.name in selected_tools:
+        tool._append_declaration(llm_request, declaration.model_copy(deep=True))
+      else:
+        # Not declared, but still runs if the model calls it.
+        llm_request.tools_dict[tool.name] = tool
+
+  def _select_tools(
+      self, tool_selector: BaseToolSelector, llm_request: LlmRequest
+  ) -> Optional[set[str]]:
+    declarations = [
+        declaration for declaration in self.get_declarations() if declaration
+    ]
+    if len(declarations) <= tool_selector.top_k:
+      return None
+    api_variant = _get_api_variant()
+    selector_and_index = self._tool_indexes.get(api_variant)
+    if not selector_and_index or selector_and_index[0] is not tool_selector:
+      selector_and_index = (
+          tool_selector,
+          tool_selector.create_index(declarations),
+      )
+      self._tool_indexes[api_variant] = selector_and_index
+    return tool_selector.select_tools(
+        selector_and_index[1], declarations, llm_request
+    )
@@ -0,0 +1,257 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import abc
+import collections
+import math
+import re
+from typing import Any
+from typing import Callable
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+from google.genai import types
+
+if TYPE_CHECKING:
+  from ..models.llm_request import LlmRequest
+
+
+class ToolIndex(abc.ABC):
+  """An index of tool declarations, built by a tool selector."""
+
+  @abc.abstractmethod
+  def score(self, query: str) -> list[float]:
+    """Returns the relevance of each indexed declaration to the query."""
+
+
+class BaseToolSelector(abc.ABC):
+  """Selects the tools that are relevant to a request.
+
+  Agents with hundreds of tools, e.g. from an OpenAPIToolset, would send all
+  the tool declarations to the model on every call. When an agent has a tool
+  selector, only the `top_k` declarations most relevant to the last user
+  message are sent. The tools that were already called in the conversation
+  are always sent, so the model can keep using them.
+
+  The tools that are not sent can still be run if the model calls them.
+
+  Attributes:
+    top_k: The max number of tools to select, not counting the tools that were
+      already called.
+  """
+
+  def __init__(self, *, top_k: int = 10):
+    if top_k <= 0:
+      raise ValueError('top_k should be greater than 0.')
+    self.top_k = top_k
+
+  @abc.abstractmethod
+  def create_index(
+      self, declarations: Sequence[types.FunctionDeclaration]
+  ) -> ToolIndex:
+    """Creates an index of the declarations.
+
+    The index is created once for the tools of an agent, and reused for each
+    request.
+    """
+
+  def select_tools(
+      self,
+      index: ToolIndex,
+      declarations: Sequence[types.FunctionDeclaration],
+      llm_request: LlmRequest,
+  ) -> set[str]:
+    """Returns the names of the tools to declare in the request.
+
+    Args:
+      index: The index created from the declarations.
+      declarations: The declarations of the tools to select from.
+      llm_request: The outgoing LLM request, with the conversation history.
+
+    Returns:
+      The names of the selected tools.
+    """
+    names = [declaration.name for declaration in declarations]
+    scores = index.score(_get_query(llm_request))
+    ranked = sorted(range(len(names)), key=lambda i: -scores[i])
+    selected = {names[i] for i in ranked[: self.top_k]}
+    return selected | (_get_called_tool_names(llm_request) & set(names))
+
+
+class Bm25ToolSelector(BaseToolSelector):
+  """Selects tools with Okapi BM25 over their names, descriptions and
+  parameters."""
+
+  def __init__(self, *, top_k: int = 10, k1: float = 1.5, b: float = 0.75):
+    """Initializes the Bm25ToolSelector.
+
+    Args:
+      top_k: The max number of tools to select, not counting the tools that
+        were already called.
+      k1: The BM25 term frequency saturation.
+      b: The BM25 document length normalization.
+    """
+    super().__init__(top_k=top_k)
+    self.k1 = k1
+    self.b = b
+
+  def create_index(
+      self, declarations: Sequence[types.FunctionDeclaration]
+  ) -> ToolIndex:
+    return _Bm25Index(
+        [_tokenize(_get_document(d)) for d in declarations], self.k1, self.b
+    )
+
+
+class EmbeddingToolSelector(BaseToolSelector):
+  """Selects tools by the cosine similarity of their embeddings to the query.
+
+  The embeddings are computed by a local function, e.g. a sentence-transformers
+  model, so no request leaves the process.
+  """
+
+  def __init__(
+      self,
+      embedding_function: Callable[[list[str]], Sequence[Sequence[float]]],
+      *,
+      top_k: int = 10,
+  ):
+    """Initializes the EmbeddingToolSelector.
+
+    Args:
+      embedding_function: Returns the embedding of each of the given texts.
+      top_k: The max number of tools to select, not counting the tools that
+        were already called.
+    """
+    super().__init__(top_k=top_k)
+    self.embedding_function = embedding_function
+
+  def create_index(
+      self, declarations: Sequence[types.FunctionDeclaration]
+  ) -> ToolIndex:
+    return _EmbeddingIndex(
+        self.embedding_function,
+        self.embedding_function([_get_document(d) for d in declarations]),
+    )
+
+
+class _Bm25Index(ToolIndex):
+
+  def __init__(self, documents: list[list[str]], k1: float, b: float):
+    self._k1 = k1
+    self._b = b
+    self._size = len(documents)
+    self._lengths = [len(document) for document in documents]
+    self._average_length = sum(self._lengths) / max(self._size, 1) or 1.0
+    # An inverted index from each term to the documents it appears in.
+    self._postings: dict[str, list[tuple[int, int]]] = collections.defaultdict(
+        list
+    )
+    for i, document in enumerate(documents):
+      for term, frequency in collections.Counter(document).items():
+        self._postings[term].append((i, frequency))
+    self._idf = {
+        term: math.log(
+            1 + (self._size - len(postings) + 0.5) / (len(postings) + 0.5)
+        )
+        for term, postings in self._postings.items()
+    }
+
+  def score(self, query: str) -> list[float]:
+    scores = [0.0] * self._size
+    for term in set(_tokenize(query)):
+      for i, frequency in self._postings.get(term, ()):
+        length_norm = (
+            1 - self._b + self._b * (self._lengths[i] / self._average_length)
+        )
+        scores[i] += (
+            self._idf[term]
+            * frequency
+            * (self._k1 + 1)
+            / (frequency + self._k1 * length_norm)
+        )
+    return scores
+
+
+class _EmbeddingIndex(ToolIndex):
+
+  def __init__(
+      self,
+      embedding_function: Callable[[list[str]], Sequence[Sequence[float]]],
+      embeddings: Sequence[Sequence[float]],
+  ):
+    self._embedding_function = embedding_function
+    self._embeddings = [_normalize(embedding) for embedding in embeddings]
+
+  def score(self, query: str) -> list[float]:
+    if not query:
+      return [0.0] * len(self._embeddings)
+    query_embedding = _normalize(self._embedding_function([query])[0])
+    return [
+        sum(a * b for a, b in zip(embedding, query_embedding))
+        for embedding in self._embeddings
+    ]
+
+
+def _normalize(embedding: Sequence[float]) -> list[float]:
+  norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+  return [x / norm for x in embedding]
+
+
+def _tokenize(text: str) -> list[str]:
+  # Splits snake_case and camelCase names into words.
+  text = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', text)
+  return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def _get_document(declaration: types.FunctionDeclaration) -> str:
+  """Returns the text to index for a declaration."""
+  texts = [declaration.name or '', declaration.description or '']
+  if declaration.parameters:
+    _collect_schema_texts(
+        declaration.parameters.model_dump(exclude_none=True), texts
+    )
+  return '\n'.join(texts)
+
+
+def _collect_schema_texts(schema: dict[str, Any], texts: list[str]) -> None:
+  if schema.get('description'):
+    texts.append(schema['description'])
+  for name, property_schema in (schema.get('properties') or {}).items():
+    texts.append(name)
+    _collect_schema_texts(property_schema, texts)
+  if schema.get('items'):
+    _collect_schema_texts(schema['items'], texts)
+
+
+def _get_query(llm_request: LlmRequest) -> str:
+  """Returns the text of the last user message."""
+  for content in reversed(llm_request.contents):
+    if content.role != 'user' or not content.parts:
+      continue
+    text = '\n'.join(part.text for part in content.parts if part.text)
+    if text:
+      return text
+  return ''
+
+
+def _get_called_tool_names(llm_request: LlmRequest) -> set[str]:
+  return {
+      part.function_call.name
+      for content in llm_request.contents
+      for part in content.parts or []
+      if part.function_call and part.function_call.name
+  }
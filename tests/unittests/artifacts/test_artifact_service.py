@@ -14,11 +14,13 @@
 
 """Tests for the artifact service."""
 
+import contextlib
 import enum
 from typing import Optional
 from typing import Union
 
 from google.adk.artifacts import GcsArtifactService
+from google.api_core import exceptions
 from google.adk.artifacts import InMemoryArtifactService
 from google.genai import types
 import pytest
@@ -39,25 +41,42 @@ class MockBlob:
   connecting to a real bucket.
   """
 
-  def __init__(self, name: str) -> None:
+  def __init__(self, name: str, bucket: "MockBucket") -> None:
     """Initializes a MockBlob.
 
     Args:
         name: The name of the blob.
+        bucket: The bucket of the blob.
     """
     self.name = name
+    self.bucket = bucket
     self.content: Optional[bytes] = None
     self.content_type: Optional[str] = None
+    self.metadata: Optional[dict[str, str]] = None
+    self.generation: Optional[int] = None
 
   def upload_from_string(
-      self, data: Union[str, bytes], content_type: Optional[str] = None
+      self,
+      data: Union[str, bytes],
+      content_type: Optional[str] = None,
+      if_generation_match: Optional[int] = None,
   ) -> None:
     """Mocks uploading data to the blob (from a string or bytes).
 
     Args:
         data: The data to upload (string or bytes).
         content_type:  The content type of the data (optional).
+        if_generation_match: Only uploads if the generation of the stored blob
+          matches, 0 meaning that the blob doesn't exist (optional).
+
+    Raises:
+        PreconditionFailed: If the generation doesn't match.
     """
+    stored = self.bucket.blobs.get(self.name)
+    if if_generation_match is not None and if_generation_match != (
+        stored.generation if stored else 0
+    ):
+      raise exceptions.PreconditionFailed("Generation mismatch.")
     if isinstance(data, str):
       self.content = data.encode("utf-8")
     elif isinstance(data, bytes):
@@ -67,24 +86,31 @@ class MockBlob:
 
     if content_type:
       self.content_type = content_type
+    self.bucket.uploads += 1
+    self.generation = self.bucket.uploads
+    self.bucket.blobs[self.name] = self
 
   def download_as_bytes(self) -> bytes:
     """Mocks downloading the blob's content as bytes.
 
     Returns:
-        bytes: The content of the blob as bytes.
-
-    Raises:
-        Exception: If the blob doesn't exist (hasn't been uploaded to).
+        bytes: The content of the blob as bytes, empty if the blob doesn't
+        exist.
     """
-    if self.content is None:
+    stored = self.bucket.blobs.get(self.name)
+    if stored is None:
       return b""
-    return self.content
+    self.content_type = stored.content_type
+    return stored.content
 
   def delete(self) -> None:
-    """Mocks deleting a blob."""
-    self.content = None
-    self.content_type = None
+    """Mocks deleting a blob.
+
+    Raises:
+        NotFound: If the blob doesn't exist.
+    """
+    if self.bucket.blobs.pop(self.name, None) is None:
+      raise exceptions.NotFound("Blob not found.")
 
 
 class MockBucket:
@@ -98,6 +124,8 @@ class MockBucket:
     """
     self.name = name
     self.blobs: dict[str, MockBlob] = {}
+    """The stored blobs."""
+    self.uploads = 0
 
   def blob(self, blob_name: str) -> MockBlob:
     """Mocks getting a Blob object (doesn't create it in storage).
@@ -108,9 +136,11 @@ class MockBucket:
     Returns:
         A MockBlob instance.
     """
-    if blob_name not in self.blobs:
-      self.blobs[blob_name] = MockBlob(blob_name)
-    return self.blobs[blob_name]
+    return MockBlob(blob_name, self)
+
+  def get_blob(self, blob_name: str) -> Optional[MockBlob]:
+    """Mocks getting a stored Blob object with its metadata."""
+    return self.blobs.get(blob_name)
 
 
 class MockClient:
@@ -119,6 +149,8 @@ class MockClient:
   def __init__(self) -> None:
     """Initializes MockClient."""
     self.buckets: dict[str, MockBucket] = {}
+    self.list_calls = 0
+    self.batches = 0
 
   def bucket(self, bucket_name: str) -> MockBucket:
     """Mocks getting a Bucket object."""
@@ -128,12 +160,19 @@ class MockClient:
 
   def list_blobs(self, bucket: MockBucket, prefix: Optional[str] = None):
     """Mocks listing blobs in a bucket, optionally with a prefix."""
+    self.list_calls += 1
     if prefix:
       return [
           blob for name, blob in bucket.blobs.items() if name.startswith(prefix)
       ]
     return list(bucket.blobs.values())
 
+  @contextlib.contextmanager
+  def batch(self, raise_exception: bool = True):
+    """Mocks a batch of requests, which are sent when the context exits."""
+    self.batches += 1
+    yield
+
 
 def mock_gcs_artifact_service():
   """Creates a mock GCS artifact service for testing."""
@@ -274,3 +313,99 @@ def test_list_versions(service_type):
   )
 
   assert response_versions == list(range(3))
+
+
+def test_gcs_versions_are_indexed():
+  """Tests that saving and loading the latest version doesn't list blobs."""
+  artifact_service = mock_gcs_artifact_service()
+  storage_client = artifact_service.storage_client
+  artifact_args = dict(
+      app_name="app0", user_id="user0", session_id="123", filename="file"
+  )
+
+  for i in range(3):
+    assert (
+        artifact_service.save_artifact(
+            **artifact_args,
+            artifact=types.Part.from_bytes(
+                data=bytes([i]), mime_type="text/plain"
+            ),
+        )
+        == i
+    )
+  # The first save lists the versions, since there is no index yet.
+  assert storage_client.list_calls == 1
+
+  # A new service reads the index instead of listing the versions.
+  other_service = mock_gcs_artifact_service()
+  other_service.storage_client = storage_client
+  other_service.bucket = artifact_service.bucket
+  assert other_service.load_artifact(**artifact_args).inline_data.data == (
+      bytes([2])
+  )
+  assert (
+      other_service.save_artifact(
+          **artifact_args,
+          artifact=types.Part.from_bytes(data=b"3", mime_type="text/plain"),
+      )
+      == 3
+  )
+  assert storage_client.list_calls == 1
+
+  # The first service's cache is stale, so its save conflicts and retries.
+  assert (
+      artifact_service.save_artifact(
+          **artifact_args,
+          artifact=types.Part.from_bytes(data=b"4", mime_type="text/plain"),
+      )
+      == 4
+  )
+  assert artifact_service.list_versions(**artifact_args) == list(range(5))
+  assert other_service.load_artifact(**artifact_args).inline_data.data == b"4"
+
+
+def test_gcs_artifact_saved_without_index():
+  """Tests that the versions saved before the index are found by listing."""
+  artifact_service = mock_gcs_artifact_service()
+  artifact_args = dict(
+      app_name="app0", user_id="user0", session_id="123", filename="file"
+  )
+  artifact_service.bucket.blob("app0/user0/123/file/0").upload_from_string(
+      b"legacy", content_type="text/plain"
+  )
+
+  assert artifact_service.load_artifact(**artifact_args).inline_data.data == (
+      b"legacy"
+  )
+  assert (
+      artifact_service.save_artifact(
+          **artifact_args,
+          artifact=types.Part.from_bytes(data=b"new", mime_type="text/plain"),
+      )
+      == 1
+  )
+
+
+def test_gcs_delete_is_batched():
+  """Tests that the versions and index of an artifact are deleted in batches."""
+  artifact_service = mock_gcs_artifact_service()
+  artifact_args = dict(
+      app_name="app0", user_id="user0", session_id="123", filename="file"
+  )
+  for _ in range(150):
+    artifact_service.save_artifact(
+        **artifact_args,
+        artifact=types.Part.from_bytes(data=b"data", mime_type="text/plain"),
+    )
+
+  artifact_service.delete_artifact(**artifact_args)
+
+  assert artifact_service.storage_client.batches == 2
+  assert not artifact_service.bucket.blobs
+  assert (
+      artifact_service.save_artifact(
+          **artifact_args,
+          artifact=types.Part.from_bytes(data=b"data", mime_type="text/plain"),
+      )
+      == 0
+  )
@@ -0,0 +1,212 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from google.adk.agents import Agent
+from google.adk.compaction import SlidingWindowCompactor
+from google.adk.compaction import SummarizingCompactor
+from google.adk.models import LlmResponse
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+import pytest
+
+from .. import utils
+
+_LONG_TEXT = 'x' * 400
+
+
+def _text(role: str, text: str) -> types.Content:
+  return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def _function_call() -> types.Content:
+  return types.Content(
+      role='model',
+      parts=[types.Part.from_function_call(name='tool', args={})],
+  )
+
+
+def _function_response() -> types.Content:
+  return types.Content(
+      role='user',
+      parts=[
+          types.Part.from_function_response(name='tool', response={'ok': 1})
+      ],
+  )
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_keeps_recent_contents():
+  contents = [
+      _text('user', 'a'),
+      _text('model', 'b'),
+      _text('user', 'c'),
+      _text('model', 'd'),
+  ]
+
+  compaction = await SlidingWindowCompactor(max_contents=2).compact(
+      None, contents
+  )
+
+  assert compaction.num_contents == 2
+  assert compaction.summary is None
+  assert (
+      await SlidingWindowCompactor(max_contents=4).compact(None, contents)
+      is None
+  )
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_keeps_function_calls_with_responses():
+  contents = [
+      _text('user', 'a'),
+      _function_call(),
+      _function_response(),
+      _text('model', 'b'),
+  ]
+
+  # Cutting before the function response would orphan it.
+  compaction = await SlidingWindowCompactor(max_contents=2).compact(
+      None, contents
+  )
+  assert compaction.num_contents == 3
+
+  # The last content is always kept with its function call.
+  compaction = await SlidingWindowCompactor(max_contents=1).compact(
+      None, contents[:3]
+  )
+  assert compaction.num_contents == 1
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_token_budget():
+  contents = [
+      _text('user', _LONG_TEXT),
+      _text('model', _LONG_TEXT),
+      _text('user', 'short'),
+  ]
+
+  compaction = await SlidingWindowCompactor(max_tokens=150).compact(
+      None, contents
+  )
+  assert compaction.num_contents == 1
+
+  # The last content is sent even if it exceeds the budget.
+  compaction = await SlidingWindowCompactor(max_tokens=10).compact(
+      None, contents[:2]
+  )
+  assert compaction.num_contents == 1
+
+
+def test_sliding_window_requires_limit():
+  with pytest.raises(ValueError):
+    SlidingWindowCompactor()
+
+
+def test_summarizing_compactor_reuses_summary():
+  summary_model = utils.MockModel.create(responses=['summary'])
+  agent_model = utils.MockModel.create(
+      responses=['response1', 'response2', 'response3', 'response4']
+  )
+  agent = Agent(
+      name='root_agent',
+      model=agent_model,
+      history_compactor=SummarizingCompactor(
+          model=summary_model, max_tokens=300
+      ),
+  )
+  runner = utils.InMemoryRunner(agent)
+
+  for turn in range(4):
+    runner.run(f'{turn}{_LONG_TEXT}')
+
+  # Only the third turn exceeds max_tokens.
+  assert len(summary_model.requests) == 1
+  assert utils.simplify_contents(agent_model.requests[2].contents) == [
+      ('user', 'Summary of the earlier conversation:\nsummary'),
+      ('model', 'response2'),
+      ('user', f'2{_LONG_TEXT}'),
+  ]
+  # The following turns start from the stored summary.
+  assert utils.simplify_contents(agent_model.requests[3].contents) == [
+      ('user', 'Summary of the earlier conversation:\nsummary'),
+      ('model', 'response2'),
+      ('user', f'2{_LONG_TEXT}'),
+      ('model', 'response3'),
+      ('user', f'3{_LONG_TEXT}'),
+  ]
+  compaction_events = [
+      event for event in runner.session.events if event.actions.compaction
+  ]
+  assert len(compaction_events) == 1
+  assert not compaction_events[0].is_final_response()
+
+
+def test_summarizing_compactor_failure_sends_all_contents():
+  summary_model = utils.MockModel.create(
+      responses=[
+          LlmResponse(error_code='RESOURCE_EXHAUSTED', error_message='quota')
+      ]
+  )
+  agent_model = utils.MockModel.create(responses=['response1'])
+  agent = Agent(
+      name='root_agent',
+      model=agent_model,
+      history_compactor=SummarizingCompactor(
+          model=summary_model, max_tokens=10
+      ),
+  )
+  runner = utils.InMemoryRunner(agent)
+
+  runner.run(_LONG_TEXT)
+
+  assert utils.simplify_contents(agent_model.requests[0].contents) == [
+      ('user', _LONG_TEXT),
+  ]
+
+
+def test_summarizing_compactor_with_database_session_service(tmp_path):
+  summary_model = utils.MockModel.create(responses=['summary'])
+  agent_model = utils.MockModel.create(
+      responses=['response1', 'response2', 'response3', 'response4']
+  )
+  agent = Agent(
+      name='root_agent',
+      model=agent_model,
+      history_compactor=SummarizingCompactor(
+          model=summary_model, max_tokens=300
+      ),
+  )
+  runner = utils.InMemoryRunner(agent)
+  session_service = DatabaseSessionService(f'sqlite:///{tmp_path}/sessions.db')
+  runner.runner.session_service = session_service
+  runner.session_id = session_service.create_session(
+      app_name='test_app', user_id='test_user'
+  ).id
+
+  for turn in range(4):
+    runner.run(f'{turn}{_LONG_TEXT}')
+
+  # The compaction event is stored, so the summary is not computed again.
+  assert len(summary_model.requests) == 1
+  assert len(agent_model.requests) == 4
+  assert utils.simplify_contents(agent_model.requests[3].contents)[0] == (
+      'user',
+      'Summary of the earlier conversation:\nsummary',
+  )
+  compaction_events = [
+      event for event in runner.session.events if event.actions.compaction
+  ]
+  assert len(compaction_events) == 1
+  assert compaction_events[0].content is None
@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.flows.llm_flows import contents
+from google.genai import types
+
+
+def _event(author: str, *parts: types.Part) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author=author,
+      content=types.Content(
+          role='user' if author == 'user' else 'model', parts=list(parts)
+      ),
+  )
+
+
+def _function_call(call_id: str) -> types.Part:
+  part = types.Part.from_function_call(name='tool', args={'id': call_id})
+  part.function_call.id = call_id
+  return part
+
+
+def _function_response(call_id: str) -> types.Part:
+  part = types.Part.from_function_response(
+      name='tool', response={'id': call_id}
+  )
+  part.function_response.id = call_id
+  return part
+
+
+def test_contents_cache_matches_full_build():
+  events = [
+      _event('user', types.Part(text='hi')),
+      _event('agent', _function_call('1')),
+      _event('user', _function_response('1')),
+      _event('other_agent', types.Part(text='hello')),
+      _event('agent', _function_call('2'), _function_call('3')),
+      _event('user', _function_response('2'), _function_response('3')),
+      _event('agent', types.Part(text='done')),
+  ]
+  cache = contents._ContentsCache(None, 'agent')
+
+  for i in range(1, len(events) + 1):
+    assert cache.get_contents(events[:i]) == contents._get_contents(
+        None, events[:i], 'agent'
+    )
+  assert not cache._needs_rearrangement
+
+
+def test_contents_cache_only_converts_new_events(mocker):
+  events = [
+      _event('user', types.Part(text='hi')),
+      _event('agent', types.Part(text='hello')),
+  ]
+  cache = contents._ContentsCache(None, 'agent')
+  cache.get_contents(events)
+
+  spy = mocker.spy(contents, '_to_request_content')
+  events.append(_event('user', types.Part(text='bye')))
+  result = cache.get_contents(events)
+
+  assert spy.call_count == 1
+  assert [content.parts[0].text for content in result] == [
+      'hi',
+      'hello',
+      'bye',
+  ]
+
+
+def test_contents_cache_rearranges_async_function_responses():
+  events = [
+      _event('user', types.Part(text='hi')),
+      _event('agent', _function_call('1')),
+      _event('user', _function_response('1')),
+      _event('agent', types.Part(text='waiting')),
+      # A long running function responds later.
+      _event('user', _function_response('1')),
+  ]
+  cache = contents._ContentsCache(None, 'agent')
+
+  for i in range(1, len(events) + 1):
+    assert cache.get_contents(events[:i]) == contents._get_contents(
+        None, events[:i], 'agent'
+    )
+  assert cache._needs_rearrangement
+
+
+def test_contents_cache_resets_on_rewritten_history():
+  events = [
+      _event('user', types.Part(text='hi')),
+      _event('agent', types.Part(text='hello')),
+  ]
+  cache = contents._ContentsCache(None, 'agent')
+  cache.get_contents(events)
+
+  new_events = [events[0], _event('agent', types.Part(text='bye'))]
+  assert cache.get_contents(new_events) == contents._get_contents(
+      None, new_events, 'agent'
+  )
+
+
+def test_contents_cache_isolates_returned_contents():
+  events = [
+      _event('user', types.Part(text='hi')),
+      _event('agent', _function_call('1')),
+  ]
+  cache = contents._ContentsCache(None, 'agent')
+
+  first = cache.get_contents(events)
+  first[0].parts[0] = types.Part(text='replaced')
+  first[0].parts.append(types.Part(text='appended'))
+  # E.g. a before_model_callback edits the request in place.
+  first[1].parts[0].function_call.args['id'] = 'edited'
+
+  second = cache.get_contents(events)
+  assert second == contents._get_contents(None, events, 'agent')
+  assert [part.text for part in second[0].parts] == ['hi']
+  assert second[1].parts[0].function_call.args == {'id': '1'}
+  assert events[1].content.parts[0].function_call.args == {'id': '1'}
@@ -0,0 +1,191 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig
+from google.adk.events import Event
+from google.adk.flows.llm_flows import functions
+from google.adk.tools import ToolContext
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+import pytest
+
+from ... import utils
+
+
+def _function_call_event(*function_calls: types.Part) -> Event:
+  event = Event(
+      invocation_id='test_id',
+      author='root_agent',
+      content=types.Content(role='model', parts=list(function_calls)),
+  )
+  functions.populate_client_function_call_id(event)
+  return event
+
+
+def _responses(event: Event) -> list[tuple[str, dict]]:
+  return [
+      (part.function_response.name, part.function_response.response)
+      for part in event.content.parts
+  ]
+
+
+@pytest.mark.asyncio
+async def test_function_calls_run_concurrently_in_order():
+  running = 0
+  max_running = 0
+
+  async def sleep_for(seconds: float) -> float:
+    nonlocal running, max_running
+    running += 1
+    max_running = max(max_running, running)
+    await asyncio.sleep(seconds)
+    running -= 1
+    return seconds
+
+  tool = FunctionTool(func=sleep_for)
+  agent = Agent(name='root_agent', model='gemini-1.5-flash', tools=[tool])
+  invocation_context = utils.create_invocation_context(agent)
+  event = _function_call_event(
+      types.Part.from_function_call(name='sleep_for', args={'seconds': 0.2}),
+      types.Part.from_function_call(name='sleep_for', args={'seconds': 0.1}),
+      types.Part.from_function_call(name='sleep_for', args={'seconds': 0.01}),
+  )
+
+  response_event = await functions.handle_function_calls_async(
+      invocation_context, event, {'sleep_for': tool}
+  )
+
+  assert max_running == 3
+  assert _responses(response_event) == [
+      ('sleep_for', {'result': 0.2}),
+      ('sleep_for', {'result': 0.1}),
+      ('sleep_for', {'result': 0.01}),
+  ]
+  assert [
+      part.function_response.id for part in response_event.content.parts
+  ] == [function_call.id for function_call in event.get_function_calls()]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrent_tool_calls():
+  running = 0
+  max_running = 0
+
+  async def wait() -> None:
+    nonlocal running, max_running
+    running += 1
+    max_running = max(max_running, running)
+    await asyncio.sleep(0.01)
+    running -= 1
+
+  tool = FunctionTool(func=wait)
+  agent = Agent(name='root_agent', model='gemini-1.5-flash', tools=[tool])
+  invocation_context = utils.create_invocation_context(agent)
+  invocation_context.run_config = RunConfig(max_concurrent_tool_calls=2)
+  event = _function_call_event(
+      *[types.Part.from_function_call(name='wait', args={}) for _ in range(5)]
+  )
+
+  response_event = await functions.handle_function_calls_async(
+      invocation_context, event, {'wait': tool}
+  )
+
+  assert max_running == 2
+  assert len(response_event.content.parts) == 5
+
+
+@pytest.mark.asyncio
+async def test_tool_call_timeout():
+  async def slow() -> str:
+    await asyncio.sleep(10)
+    return 'done'
+
+  def fast() -> str:
+    return 'done'
+
+  tools = {'slow': FunctionTool(func=slow), 'fast': FunctionTool(func=fast)}
+  agent = Agent(
+      name='root_agent', model='gemini-1.5-flash', tools=list(tools.values())
+  )
+  invocation_context = utils.create_invocation_context(agent)
+  invocation_context.run_config = RunConfig(tool_call_timeout=0.05)
+  event = _function_call_event(
+      types.Part.from_function_call(name='slow', args={}),
+      types.Part.from_function_call(name='fast', args={}),
+  )
+
+  response_event = await functions.handle_function_calls_async(
+      invocation_context, event, tools
+  )
+
+  assert _responses(response_event) == [
+      ('slow', {'error': 'Tool slow timed out after 0.05 seconds.'}),
+      ('fast', {'result': 'done'}),
+  ]
+
+
+@pytest.mark.asyncio
+async def test_failed_function_call_cancels_others():
+  cancelled = False
+
+  async def slow() -> None:
+    nonlocal cancelled
+    try:
+      await asyncio.sleep(10)
+    except asyncio.CancelledError:
+      cancelled = True
+      raise
+
+  async def fail() -> None:
+    raise RuntimeError('failed')
+
+  tools = {'slow': FunctionTool(func=slow), 'fail': FunctionTool(func=fail)}
+  agent = Agent(
+      name='root_agent', model='gemini-1.5-flash', tools=list(tools.values())
+  )
+  invocation_context = utils.create_invocation_context(agent)
+  event = _function_call_event(
+      types.Part.from_function_call(name='slow', args={}),
+      types.Part.from_function_call(name='fail', args={}),
+  )
+
+  with pytest.raises(RuntimeError, match='failed'):
+    await functions.handle_function_calls_async(
+        invocation_context, event, tools
+    )
+  await asyncio.sleep(0)
+  assert cancelled
+
+
+@pytest.mark.asyncio
+async def test_parallel_state_deltas_are_merged():
+  def set_state(key: str, tool_context: ToolContext) -> None:
+    tool_context.state[key] = True
+
+  tool = FunctionTool(func=set_state)
+  agent = Agent(name='root_agent', model='gemini-1.5-flash', tools=[tool])
+  invocation_context = utils.create_invocation_context(agent)
+  event = _function_call_event(
+      types.Part.from_function_call(name='set_state', args={'key': 'a'}),
+      types.Part.from_function_call(name='set_state', args={'key': 'b'}),
+  )
+
+  response_event = await functions.handle_function_calls_async(
+      invocation_context, event, {'set_state': tool}
+  )
+
+  assert response_event.actions.state_delta == {'a': True, 'b': True}
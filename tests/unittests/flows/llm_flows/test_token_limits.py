@@ -0,0 +1,147 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from google.adk.agents import Agent
+from google.adk.agents.invocation_context import TokenLimitExceededError
+from google.adk.agents.run_config import RunConfig
+from google.adk.models import LlmResponse
+from google.adk.sessions import DatabaseSessionService
+from google.genai import types
+import pytest
+
+from ... import utils
+
+
+def _response(text: str, total_tokens: int) -> LlmResponse:
+  return LlmResponse(
+      content=types.ModelContent(parts=[types.Part.from_text(text=text)]),
+      usage_metadata=types.GenerateContentResponseUsageMetadata(
+          prompt_token_count=total_tokens - 10,
+          candidates_token_count=10,
+          total_token_count=total_tokens,
+      ),
+  )
+
+
+async def _run(
+    runner: utils.InMemoryRunner, message: str, run_config: RunConfig
+) -> list:
+  return [
+      event
+      async for event in runner.runner.run_async(
+          user_id='test_user',
+          session_id=runner.session_id,
+          new_message=types.UserContent(parts=[types.Part(text=message)]),
+          run_config=run_config,
+      )
+  ]
+
+
+def test_usage_is_recorded_in_events():
+  mock_model = utils.MockModel.create(responses=[_response('response1', 100)])
+  agent = Agent(name='root_agent', model=mock_model)
+  runner = utils.InMemoryRunner(agent)
+
+  events = runner.run('test')
+
+  assert events[-1].usage_metadata.total_token_count == 100
+  assert runner.session.events[-1].usage_metadata.total_token_count == 100
+
+
+def test_estimated_usage_is_recorded_in_events():
+  mock_model = utils.MockModel.create(responses=['response1'])
+  agent = Agent(name='root_agent', model=mock_model)
+  runner = utils.InMemoryRunner(agent)
+
+  events = runner.run('test')
+
+  usage_metadata = runner.session.events[-1].usage_metadata
+  assert events[-1].usage_metadata == usage_metadata
+  assert usage_metadata.prompt_token_count > 0
+  assert usage_metadata.candidates_token_count > 0
+
+
+@pytest.mark.asyncio
+async def test_invocation_token_limit():
+  function_call = types.Part.from_function_call(name='tool', args={})
+  mock_model = utils.MockModel.create(
+      responses=[
+          LlmResponse(
+              content=types.ModelContent(parts=[function_call]),
+              usage_metadata=types.GenerateContentResponseUsageMetadata(
+                  total_token_count=1000
+              ),
+          ),
+          _response('response1', 1000),
+      ]
+  )
+
+  def tool() -> str:
+    return 'result'
+
+  agent = Agent(name='root_agent', model=mock_model, tools=[tool])
+  runner = utils.InMemoryRunner(agent)
+
+  with pytest.raises(TokenLimitExceededError):
+    await _run(runner, 'test', RunConfig(max_invocation_tokens=1010))
+
+  # The second call is shed before it is sent.
+  assert len(mock_model.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_session_token_limit():
+  mock_model = utils.MockModel.create(
+      responses=[_response('response1', 500), _response('response2', 500)]
+  )
+  agent = Agent(name='root_agent', model=mock_model)
+  runner = utils.InMemoryRunner(agent)
+  run_config = RunConfig(max_session_tokens=510, max_invocation_tokens=510)
+
+  await _run(runner, 'test', run_config)
+  with pytest.raises(TokenLimitExceededError):
+    await _run(runner, 'test', run_config)
+
+  assert len(mock_model.requests) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'responses, max_session_tokens',
+    [
+        ([_response('response1', 500), _response('response2', 500)], 510),
+        # The usage of the first run is estimated. The second request fits in
+        # the limit on its own, but not with the usage of the first run.
+        (['x' * 2000, 'response2'], 800),
+    ],
+)
+async def test_session_token_limit_with_database_session_service(
+    tmp_path, responses, max_session_tokens
+):
+  mock_model = utils.MockModel.create(responses=responses)
+  agent = Agent(name='root_agent', model=mock_model)
+  runner = utils.InMemoryRunner(agent)
+  session_service = DatabaseSessionService(f'sqlite:///{tmp_path}/sessions.db')
+  runner.runner.session_service = session_service
+  runner.session_id = session_service.create_session(
+      app_name='test_app', user_id='test_user'
+  ).id
+  run_config = RunConfig(max_session_tokens=max_session_tokens)
+
+  await _run(runner, 'test', run_config)
+  with pytest.raises(TokenLimitExceededError):
+    await _run(runner, 'test', run_config)
+
+  assert len(mock_model.requests) == 1
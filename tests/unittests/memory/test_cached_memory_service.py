@@ -0,0 +1,93 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.memory import CachedMemoryService
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+
+
+def _session(session_id: str, text: str, user_id='user') -> Session:
+  return Session(
+      app_name='app',
+      user_id=user_id,
+      id=session_id,
+      events=[
+          Event(
+              author='user',
+              content=types.Content(role='user', parts=[types.Part(text=text)]),
+          )
+      ],
+  )
+
+
+def _search(memory_service, query, user_id='user'):
+  return memory_service.search_memory(
+      app_name='app', user_id=user_id, query=query
+  )
+
+
+def test_caches_searches():
+  inner = InMemoryMemoryService()
+  inner.add_session_to_memory(_session('s1', 'blue sky'))
+  memory_service = CachedMemoryService(inner)
+
+  with mock.patch.object(
+      inner, 'search_memory', wraps=inner.search_memory
+  ) as search_memory:
+    first = _search(memory_service, 'blue')
+    second = _search(memory_service, 'blue')
+    _search(memory_service, 'blue', user_id='other')
+
+  assert first.memories[0].session_id == 's1'
+  assert second == first
+  assert search_memory.call_count == 2
+  assert memory_service.hits == 1
+  assert memory_service.misses == 2
+
+
+def test_entries_expire():
+  memory_service = CachedMemoryService(InMemoryMemoryService(), ttl=10)
+
+  with mock.patch('time.time', return_value=100):
+    _search(memory_service, 'blue')
+  with mock.patch('time.time', return_value=111):
+    _search(memory_service, 'blue')
+
+  assert memory_service.misses == 2
+
+
+def test_adding_session_invalidates_user_entries():
+  memory_service = CachedMemoryService(InMemoryMemoryService())
+  assert not _search(memory_service, 'blue').memories
+  _search(memory_service, 'blue', user_id='other')
+
+  memory_service.add_session_to_memory(_session('s1', 'blue sky'))
+
+  assert _search(memory_service, 'blue').memories
+  _search(memory_service, 'blue', user_id='other')
+  assert memory_service.hits == 1
+
+
+def test_evicts_least_recently_used_entries():
+  memory_service = CachedMemoryService(InMemoryMemoryService(), max_entries=2)
+  for query in ['a', 'b', 'a', 'c', 'a', 'b']:
+    _search(memory_service, query)
+
+  # 'b' was evicted by 'c'.
+  assert memory_service.hits == 2
+  assert memory_service.misses == 4
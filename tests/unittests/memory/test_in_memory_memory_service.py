@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from google.adk.events import Event
+from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+
+
+def _event(event_id: str, text: str, author: str = 'user') -> Event:
+  return Event(
+      id=event_id,
+      invocation_id='invocation',
+      author=author,
+      content=types.Content(
+          role='user' if author == 'user' else 'model',
+          parts=[types.Part(text=text)],
+      ),
+  )
+
+
+def _session(session_id: str, *events: Event, user_id='user') -> Session:
+  return Session(
+      app_name='app', user_id=user_id, id=session_id, events=list(events)
+  )
+
+
+def _search(memory_service: InMemoryMemoryService, query: str, user_id='user'):
+  response = memory_service.search_memory(
+      app_name='app', user_id=user_id, query=query
+  )
+  return [
+      (memory.session_id, [event.id for event in memory.events])
+      for memory in response.memories
+  ]
+
+
+def test_search_ranks_events_by_bm25():
+  memory_service = InMemoryMemoryService()
+  memory_service.add_session_to_memory(
+      _session(
+          's1',
+          _event('e1', 'My favorite color is blue.'),
+          _event('e2', 'Blue is nice.', author='agent'),
+          _event('e3', 'What is the weather today?'),
+      )
+  )
+  memory_service.add_session_to_memory(
+      _session('s2', _event('e4', 'I like the color blue and the color red.'))
+  )
+
+  assert _search(memory_service, 'favorite COLOR') == [
+      ('s1', ['e1']),
+      ('s2', ['e4']),
+  ]
+  assert _search(memory_service, 'weather') == [('s1', ['e3'])]
+  assert _search(memory_service, 'unknown') == []
+
+
+def test_search_is_scoped_to_user():
+  memory_service = InMemoryMemoryService()
+  memory_service.add_session_to_memory(
+      _session('s1', _event('e1', 'blue'), user_id='alice')
+  )
+
+  assert _search(memory_service, 'blue', user_id='alice') == [('s1', ['e1'])]
+  assert _search(memory_service, 'blue', user_id='bob') == []
+
+
+def test_top_k():
+  memory_service = InMemoryMemoryService(top_k=2)
+  memory_service.add_session_to_memory(
+      _session(
+          's1',
+          _event('e1', 'blue'),
+          _event('e2', 'blue blue sky'),
+          _event('e3', 'blue ocean and sky'),
+      )
+  )
+
+  # The events of a session are returned in chronological order.
+  assert _search(memory_service, 'blue sky') == [('s1', ['e2', 'e3'])]
+
+
+def test_readding_session_indexes_new_events():
+  memory_service = InMemoryMemoryService()
+  events = [_event('e1', 'blue')]
+  memory_service.add_session_to_memory(_session('s1', *events))
+  events.append(_event('e2', 'blue sky'))
+  memory_service.add_session_to_memory(_session('s1', *events))
+
+  assert _search(memory_service, 'blue') == [('s1', ['e1', 'e2'])]
+  assert len(memory_service._indexes['app/user'].docs) == 2
+
+
+def test_readding_rewritten_session_replaces_events():
+  memory_service = InMemoryMemoryService()
+  memory_service.add_session_to_memory(
+      _session('s1', _event('e1', 'blue'), _event('e2', 'red'))
+  )
+  memory_service.add_session_to_memory(_session('s1', _event('e3', 'green')))
+
+  assert _search(memory_service, 'blue red') == []
+  assert _search(memory_service, 'green') == [('s1', ['e3'])]
+  index = memory_service._indexes['app/user']
+  assert set(index._postings) == {'green'}
@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import zlib
+
+from google.adk.events import Event
+from google.adk.memory.local_vector_memory_service import LocalVectorMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+DIM = 64
+
+
+class FakeEmbedding:
+  """Embeds a text as the counts of its words, hashed into DIM buckets."""
+
+  def __init__(self):
+    self.texts: list[str] = []
+
+  def __call__(self, texts: list[str]) -> list[list[float]]:
+    self.texts.extend(texts)
+    embeddings = []
+    for text in texts:
+      embedding = [0.0] * DIM
+      for word in re.findall(r'\w+', text.lower()):
+        embedding[zlib.crc32(word.encode()) % DIM] += 1.0
+      embeddings.append(embedding)
+    return embeddings
+
+
+def _event(event_id: str, text: str, author: str = 'user') -> Event:
+  return Event(
+      id=event_id,
+      invocation_id='invocation',
+      author=author,
+      content=types.Content(
+          role='user' if author == 'user' else 'model',
+          parts=[types.Part(text=text)],
+      ),
+  )
+
+
+def _session(session_id: str, *events: Event, user_id='user') -> Session:
+  return Session(
+      app_name='app', user_id=user_id, id=session_id, events=list(events)
+  )
+
+
+def _search(memory_service: LocalVectorMemoryService, query: str):
+  response = memory_service.search_memory(
+      app_name='app', user_id='user', query=query
+  )
+  return [
+      (memory.session_id, [event.id for event in memory.events])
+      for memory in response.memories
+  ]
+
+
+def _add_sessions(memory_service: LocalVectorMemoryService):
+  memory_service.add_session_to_memory(
+      _session(
+          's1',
+          _event('e1', 'my favorite color is blue'),
+          _event('e2', 'the weather is sunny today', author='agent'),
+      )
+  )
+  memory_service.add_session_to_memory(
+      _session('s2', _event('e3', 'I like the color red'))
+  )
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int8'])
+def test_search_ranks_events_by_similarity(dtype):
+  memory_service = LocalVectorMemoryService(
+      FakeEmbedding(), top_k=2, dtype=dtype
+  )
+  _add_sessions(memory_service)
+
+  assert _search(memory_service, 'favorite color blue') == [
+      ('s1', ['e1']),
+      ('s2', ['e3']),
+  ]
+  memory_service.top_k = 1
+  assert _search(memory_service, 'sunny weather') == [('s1', ['e2'])]
+
+
+def test_search_is_scoped_to_user():
+  memory_service = LocalVectorMemoryService(FakeEmbedding())
+  _add_sessions(memory_service)
+
+  response = memory_service.search_memory(
+      app_name='app', user_id='other', query='color'
+  )
+
+  assert not response.memories
+
+
+def test_readding_session_embeds_new_events_only():
+  embedding = FakeEmbedding()
+  memory_service = LocalVectorMemoryService(embedding)
+  events = [_event('e1', 'hello'), _event('e2', 'blue sky')]
+  memory_service.add_session_to_memory(_session('s1', *events[:1]))
+  memory_service.add_session_to_memory(_session('s1', *events))
+
+  assert embedding.texts == ['hello', 'blue sky']
+  assert _search(memory_service, 'blue sky') == [('s1', ['e1', 'e2'])]
+
+
+def test_readding_rewritten_session_replaces_events():
+  memory_service = LocalVectorMemoryService(FakeEmbedding())
+  memory_service.add_session_to_memory(_session('s1', _event('e1', 'blue')))
+  memory_service.add_session_to_memory(_session('s1', _event('e2', 'red')))
+
+  assert _search(memory_service, 'blue') == [('s1', ['e2'])]
+
+
+def test_ivf_index():
+  texts = [f'topic{i % 20} item{i} detail{i % 7}' for i in range(400)]
+  memory_service = LocalVectorMemoryService(
+      FakeEmbedding(), top_k=5, index='ivf', num_lists=4, num_probes=1
+  )
+  memory_service.add_session_to_memory(
+      _session('s1', *[_event(f'e{i}', text) for i, text in enumerate(texts)])
+  )
+  flat_memory_service = LocalVectorMemoryService(FakeEmbedding(), top_k=5)
+  flat_memory_service.add_session_to_memory(
+      _session('s1', *[_event(f'e{i}', text) for i, text in enumerate(texts)])
+  )
+
+  # The event equal to the query is in the cluster closest to the query.
+  assert 'e42' in _search(memory_service, texts[42])[0][1]
+  # Probing all the clusters is exhaustive.
+  memory_service.num_probes = 4
+  for query in ['topic3 detail1', texts[7]]:
+    assert _search(memory_service, query) == _search(flat_memory_service, query)
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int8'])
+def test_persistence(tmp_path, dtype):
+  embedding = FakeEmbedding()
+  memory_service = LocalVectorMemoryService(
+      embedding, dtype=dtype, path=str(tmp_path)
+  )
+  _add_sessions(memory_service)
+  memory_service.add_session_to_memory(
+      _session('s2', _event('e4', 'a rewritten session'))
+  )
+  expected = _search(memory_service, 'color')
+
+  restored = LocalVectorMemoryService(
+      embedding, dtype=dtype, path=str(tmp_path)
+  )
+
+  assert _search(restored, 'color') == expected
+  assert _search(restored, 'rewritten')[0] == ('s2', ['e4'])
+  # New events are appended to the memory-mapped embeddings.
+  embedding.texts.clear()
+  restored.add_session_to_memory(
+      _session(
+          's1',
+          _event('e1', 'my favorite color is blue'),
+          _event('e2', 'the weather is sunny today', author='agent'),
+          _event('e5', 'green grass'),
+      )
+  )
+  assert embedding.texts == ['green grass']
+  restored.top_k = 1
+  assert _search(restored, 'green grass') == [('s1', ['e5'])]
+
+
+def test_persisted_dtype_mismatch(tmp_path):
+  memory_service = LocalVectorMemoryService(FakeEmbedding(), path=str(tmp_path))
+  _add_sessions(memory_service)
+
+  with pytest.raises(ValueError):
+    LocalVectorMemoryService(FakeEmbedding(), dtype='int8', path=str(tmp_path))
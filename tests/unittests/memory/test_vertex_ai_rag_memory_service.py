@@ -0,0 +1,205 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+from google.adk.events import Event
+from google.adk.memory.vertex_ai_rag_memory_service import VertexAiRagMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+CORPUS = 'projects/p/locations/l/ragCorpora/c'
+
+
+class FakeRagClient:
+  """A local fake of the upload and retrieval functions of vertexai rag."""
+
+  def __init__(self):
+    self.files: list[tuple[str, str, str]] = []
+    """The corpus name, display name and text of each uploaded file."""
+    self.fail = False
+
+  def upload_file(self, *, corpus_name, path, display_name):
+    if self.fail:
+      raise ConnectionError('Upload failed.')
+    with open(path, encoding='utf-8') as f:
+      self.files.append((corpus_name, display_name, f.read()))
+
+  def retrieval_query(self, *, text, **kwargs):
+    # Each file is one chunk, returned if it contains the query.
+    return SimpleNamespace(
+        contexts=SimpleNamespace(
+            contexts=[
+                SimpleNamespace(source_display_name=display_name, text=chunk)
+                for _, display_name, chunk in self.files
+                if text in chunk
+            ]
+        )
+    )
+
+
+def _event(text: str, timestamp: float) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      timestamp=timestamp,
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+  )
+
+
+def _session(session_id: str, *events: Event, user_id='user') -> Session:
+  return Session(
+      app_name='app', user_id=user_id, id=session_id, events=list(events)
+  )
+
+
+def _search(memory_service, query, user_id='user'):
+  response = memory_service.search_memory(
+      app_name='app', user_id=user_id, query=query
+  )
+  return [
+      (
+          memory.session_id,
+          [event.content.parts[0].text for event in memory.events],
+      )
+      for memory in response.memories
+  ]
+
+
+@pytest.fixture
+def rag_client():
+  return FakeRagClient()
+
+
+def test_uploads_new_events_only(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, rag_client=rag_client
+  )
+  events = [_event('blue sky', 1), _event('red car', 2)]
+  memory_service.add_session_to_memory(_session('s1', events[0]))
+  memory_service.add_session_to_memory(_session('s1', *events))
+  memory_service.add_session_to_memory(_session('s1', *events))
+
+  assert len(rag_client.files) == 2
+  assert 'blue sky' not in rag_client.files[1][2]
+  assert rag_client.files[0][1] == 'app.user.s1'
+  assert _search(memory_service, 'red') == [('s1', ['red car'])]
+
+
+def test_uploads_event_with_same_timestamp_as_last_uploaded(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, rag_client=rag_client
+  )
+  events = [_event('blue sky', 1), _event('red car', 1)]
+  memory_service.add_session_to_memory(_session('s1', events[0]))
+  memory_service.add_session_to_memory(_session('s1', *events))
+
+  assert len(rag_client.files) == 2
+  assert 'red car' in rag_client.files[1][2]
+  assert 'blue sky' not in rag_client.files[1][2]
+
+
+def test_shared_high_water_marks_skip_uploaded_events(rag_client):
+  high_water_marks = {}
+  events = [_event('blue sky', 1), _event('red car', 2)]
+  VertexAiRagMemoryService(
+      rag_corpus=CORPUS,
+      rag_client=rag_client,
+      high_water_marks=high_water_marks,
+  ).add_session_to_memory(_session('s1', events[0]))
+  # Another replica, or the same service after a restart.
+  VertexAiRagMemoryService(
+      rag_corpus=CORPUS,
+      rag_client=rag_client,
+      high_water_marks=high_water_marks,
+  ).add_session_to_memory(_session('s1', *events))
+
+  assert len(rag_client.files) == 2
+  assert 'blue sky' not in rag_client.files[1][2]
+
+
+def test_batches_sessions(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, batch_size=2, rag_client=rag_client
+  )
+  memory_service.add_session_to_memory(_session('s1', _event('blue sky', 1)))
+
+  assert not rag_client.files
+
+  memory_service.add_session_to_memory(
+      _session('s2', _event('blue sea', 2), user_id='other')
+  )
+
+  assert len(rag_client.files) == 1
+  # The events of other users in the same batch are not returned.
+  assert _search(memory_service, 'blue') == [('s1', ['blue sky'])]
+  assert _search(memory_service, 'blue', user_id='other') == [
+      ('s2', ['blue sea'])
+  ]
+
+
+def test_flush_uploads_buffered_sessions(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, batch_size=10, rag_client=rag_client
+  )
+  memory_service.add_session_to_memory(_session('s1', _event('blue sky', 1)))
+  memory_service.flush()
+  memory_service.flush()
+
+  assert len(rag_client.files) == 1
+
+
+def test_uploads_to_resources_concurrently(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, rag_client=rag_client
+  )
+  memory_service.vertex_rag_store.rag_resources.append(
+      types.VertexRagStoreRagResource(rag_corpus='other-corpus')
+  )
+  memory_service.add_session_to_memory(_session('s1', _event('blue sky', 1)))
+
+  assert sorted(corpus for corpus, _, _ in rag_client.files) == [
+      'other-corpus',
+      CORPUS,
+  ]
+
+
+def test_failed_upload_is_retried(rag_client):
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, rag_client=rag_client
+  )
+  rag_client.fail = True
+  with pytest.raises(ConnectionError):
+    memory_service.add_session_to_memory(_session('s1', _event('blue sky', 1)))
+  rag_client.fail = False
+  memory_service.add_session_to_memory(
+      _session('s1', _event('blue sky', 1), _event('red car', 2))
+  )
+
+  assert len(rag_client.files) == 1
+  assert _search(memory_service, 'blue') == [('s1', ['blue sky', 'red car'])]
+
+
+def test_search_files_without_session_ids(rag_client):
+  rag_client.files.append((
+      CORPUS,
+      'app.user.s0',
+      '{"author": "user", "timestamp": 1, "text": "hi"}',
+  ))
+  memory_service = VertexAiRagMemoryService(
+      rag_corpus=CORPUS, rag_client=rag_client
+  )
+
+  assert _search(memory_service, 'hi') == [('s0', ['hi'])]
@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+from unittest import mock
+from unittest.mock import AsyncMock
+
+from anthropic import types as anthropic_types
+from google.adk.models.anthropic_llm import Claude
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools.function_tool import FunctionTool
+from google.genai import types
+import pytest
+
+MESSAGE = anthropic_types.Message(
+    id="msg_1",
+    type="message",
+    role="assistant",
+    model="claude-3-5-sonnet-v2@20241022",
+    content=[
+        anthropic_types.TextBlock(type="text", text="Let me check."),
+        anthropic_types.ToolUseBlock(
+            type="tool_use", id="tool_1", name="get_weather", input={}
+        ),
+        anthropic_types.ToolUseBlock(
+            type="tool_use", id="tool_2", name="get_time", input={"tz": "UTC"}
+        ),
+    ],
+    stop_reason="tool_use",
+    usage=anthropic_types.Usage(input_tokens=10, output_tokens=20),
+)
+
+
+class MockMessageStream:
+  """A stand-in for anthropic's AsyncMessageStream."""
+
+  def __init__(self, texts, message):
+    self._texts = texts
+    self._message = message
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc_info):
+    pass
+
+  async def __aiter__(self):
+    yield SimpleNamespace(type="message_start")
+    for text in self._texts:
+      yield SimpleNamespace(type="text", text=text)
+    yield SimpleNamespace(type="message_stop")
+
+  async def get_final_message(self):
+    return self._message
+
+
+@pytest.fixture
+def mock_client():
+  client = mock.MagicMock()
+  client.messages.create = AsyncMock(return_value=MESSAGE)
+  client.messages.stream = mock.Mock(
+      return_value=MockMessageStream(["Let me ", "check."], MESSAGE)
+  )
+  with mock.patch.object(Claude, "_anthropic_client", client):
+    yield client
+
+
+def get_weather():
+  """Gets the weather."""
+  return "sunny"
+
+
+@pytest.fixture
+def llm_request():
+  return LlmRequest(
+      model="claude-3-5-sonnet-v2@20241022",
+      contents=[
+          types.Content(role="user", parts=[types.Part.from_text(text="Hello")])
+      ],
+      config=types.GenerateContentConfig(
+          system_instruction="You are a helpful assistant",
+          tools=[
+              types.Tool(
+                  function_declarations=[
+                      types.FunctionDeclaration(
+                          name="get_weather", description="Gets the weather"
+                      )
+                  ]
+              )
+          ],
+      ),
+      tools_dict={"get_weather": FunctionTool(get_weather)},
+  )
+
+
+@pytest.mark.asyncio
+async def test_generate_content_async(mock_client, llm_request):
+  responses = [
+      response
+      async for response in Claude().generate_content_async(llm_request)
+  ]
+
+  assert len(responses) == 1
+  parts = responses[0].content.parts
+  assert parts[0].text == "Let me check."
+  assert parts[1].function_call.id == "tool_1"
+  assert parts[1].function_call.name == "get_weather"
+  assert parts[2].function_call.id == "tool_2"
+  assert parts[2].function_call.args == {"tz": "UTC"}
+  mock_client.messages.stream.assert_not_called()
+  _, kwargs = mock_client.messages.create.call_args
+  assert kwargs["system"] == "You are a helpful assistant"
+  assert kwargs["tools"][0]["name"] == "get_weather"
+  assert not kwargs["tool_choice"]["disable_parallel_tool_use"]
+
+
+@pytest.mark.asyncio
+async def test_generate_content_async_stream(mock_client, llm_request):
+  responses = [
+      response
+      async for response in Claude().generate_content_async(
+          llm_request, stream=True
+      )
+  ]
+
+  assert len(responses) == 3
+  assert responses[0].partial
+  assert responses[0].content.parts[0].text == "Let me "
+  assert responses[1].partial
+  assert responses[1].content.parts[0].text == "check."
+  assert not responses[2].partial
+  assert [part.function_call.id for part in responses[2].content.parts[1:]] == [
+      "tool_1",
+      "tool_2",
+  ]
+  mock_client.messages.create.assert_not_called()
+  _, kwargs = mock_client.messages.stream.call_args
+  assert kwargs["model"] == "claude-3-5-sonnet-v2@20241022"
+  assert kwargs["messages"][0]["content"][0]["text"] == "Hello"
@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+
+from google.adk.models.cached_llm import CachedLlm
+from google.adk.models.cached_llm import get_llm_request_key
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.llm_response_cache import InMemoryLlmResponseCache
+from google.adk.models.llm_response_cache import SqliteLlmResponseCache
+from google.genai import types
+from pydantic import BaseModel
+import pytest
+
+from .. import utils
+
+
+def _llm_request(text: str = 'Hello') -> LlmRequest:
+  return LlmRequest(
+      model='mock',
+      contents=[
+          types.Content(role='user', parts=[types.Part.from_text(text=text)])
+      ],
+      config=types.GenerateContentConfig(temperature=0.1),
+  )
+
+
+def _content(text: str) -> types.Content:
+  return types.Content(role='model', parts=[types.Part.from_text(text=text)])
+
+
+def _text(responses: list[LlmResponse]) -> list[str]:
+  return [response.content.parts[0].text for response in responses]
+
+
+async def _generate(llm, llm_request, stream=False) -> list[LlmResponse]:
+  return [
+      response
+      async for response in llm.generate_content_async(
+          llm_request, stream=stream
+      )
+  ]
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmp_path):
+  if request.param == 'memory':
+    return InMemoryLlmResponseCache()
+  return SqliteLlmResponseCache(str(tmp_path / 'cache.db'))
+
+
+@pytest.mark.asyncio
+async def test_cached_llm_returns_cached_response(cache):
+  mock_model = utils.MockModel.create(responses=['response1', 'response2'])
+  llm = CachedLlm(llm=mock_model, cache=cache)
+
+  assert llm.model == 'mock'
+  assert _text(await _generate(llm, _llm_request())) == ['response1']
+  assert _text(await _generate(llm, _llm_request())) == ['response1']
+  assert _text(await _generate(llm, _llm_request('Bye'))) == ['response2']
+  assert len(mock_model.requests) == 2
+  assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_cached_llm_replays_streamed_chunks(cache):
+  class StreamingModel(utils.MockModel):
+
+    async def generate_content_async(self, llm_request, stream=False):
+      self.requests.append(llm_request)
+      for text in ['Hel', 'lo']:
+        yield LlmResponse(content=_content(text), partial=True)
+      yield LlmResponse(content=_content('Hello'))
+
+  mock_model = StreamingModel(model='mock', responses=[])
+  llm = CachedLlm(llm=mock_model, cache=cache)
+
+  first = await _generate(llm, _llm_request(), stream=True)
+  second = await _generate(llm, _llm_request(), stream=True)
+
+  assert _text(second) == ['Hel', 'lo', 'Hello']
+  assert second == first
+  assert len(mock_model.requests) == 1
+  # A streaming call is cached separately from a non-streaming call.
+  await _generate(llm, _llm_request())
+  assert len(mock_model.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_llm_skips_error_responses(cache):
+  mock_model = utils.MockModel(
+      model='mock',
+      responses=[
+          LlmResponse(error_code='RESOURCE_EXHAUSTED'),
+          LlmResponse(content=_content('response1')),
+      ],
+  )
+  llm = CachedLlm(llm=mock_model, cache=cache)
+
+  await _generate(llm, _llm_request())
+  assert _text(await _generate(llm, _llm_request())) == ['response1']
+  assert len(mock_model.requests) == 2
+
+
+def test_cache_ttl(cache, mocker):
+  cache.ttl = 10
+  responses = [LlmResponse(content=_content('response1'))]
+  cache.set('key', responses)
+  assert cache.get('key') == responses
+
+  mocker.patch.object(time, 'time', return_value=time.time() + 11)
+  assert cache.get('key') is None
+
+
+def test_cache_lru_eviction(cache):
+  cache.max_entries = 2
+  responses = [LlmResponse(content=_content('response'))]
+  cache.set('a', responses)
+  cache.set('b', responses)
+  time.sleep(0.01)
+  cache.get('a')
+  cache.set('c', responses)
+
+  assert cache.get('b') is None
+  assert cache.get('a') == responses
+  assert cache.get('c') == responses
+  assert cache.evictions == 1
+
+
+def test_sqlite_cache_persists(tmp_path):
+  responses = [LlmResponse(content=_content('response1'))]
+  SqliteLlmResponseCache(str(tmp_path / 'cache.db')).set('key', responses)
+
+  assert (
+      SqliteLlmResponseCache(str(tmp_path / 'cache.db')).get('key') == responses
+  )
+
+
+def test_llm_request_key():
+  class Output(BaseModel):
+    answer: str
+
+  llm_request = _llm_request()
+  key = get_llm_request_key('model', llm_request, stream=False)
+
+  assert key == get_llm_request_key('model', _llm_request(), stream=False)
+  assert key != get_llm_request_key('model', llm_request, stream=True)
+  assert key != get_llm_request_key('other', llm_request, stream=False)
+  assert key != get_llm_request_key('model', _llm_request('Bye'), stream=False)
+
+  llm_request.set_output_schema(Output)
+  assert get_llm_request_key(
+      'model', llm_request, stream=False
+  ) == get_llm_request_key('model', llm_request, stream=False)
+  assert key != get_llm_request_key('model', llm_request, stream=False)
@@ -0,0 +1,276 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from google.adk.models.gemini_context_cache import GeminiContextCacheManager
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.token_estimator import estimate_request_tokens
+from google.genai import types
+import pytest
+
+MODEL = 'gemini-1.5-flash-002'
+SYSTEM_INSTRUCTION = 'You are a helpful assistant. ' * 100
+
+
+class FakeCaches:
+  """A local fake of the cached contents API."""
+
+  def __init__(self):
+    self.caches: dict[str, types.CreateCachedContentConfig] = {}
+    self.creations = 0
+    self.updates = 0
+    self.fail = False
+
+  async def create(self, *, model, config):
+    if self.fail:
+      raise ValueError('Cached content is too small.')
+    name = f'cachedContents/{self.creations}'
+    self.creations += 1
+    self.caches[name] = config
+    return self._get(name, config.ttl)
+
+  async def update(self, *, name, config):
+    self.updates += 1
+    return self._get(name, config.ttl)
+
+  async def delete(self, *, name):
+    del self.caches[name]
+
+  def _get(self, name, ttl):
+    return types.CachedContent(
+        name=name,
+        expire_time=datetime.datetime.now(datetime.timezone.utc)
+        + datetime.timedelta(seconds=int(ttl.rstrip('s'))),
+    )
+
+
+@pytest.fixture
+def fake_caches():
+  return FakeCaches()
+
+
+@pytest.fixture
+def client(fake_caches):
+  return SimpleNamespace(aio=SimpleNamespace(caches=fake_caches))
+
+
+def _content(role, text):
+  return types.Content(role=role, parts=[types.Part.from_text(text=text)])
+
+
+def _config():
+  return types.GenerateContentConfig(
+      system_instruction=SYSTEM_INSTRUCTION,
+      tools=[
+          types.Tool(
+              function_declarations=[
+                  types.FunctionDeclaration(name='get_weather')
+              ]
+          )
+      ],
+      temperature=0.1,
+  )
+
+
+@pytest.mark.asyncio
+async def test_caches_stable_prefix(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100)
+  contents = [
+      _content('user', 'Hello'),
+      _content('model', 'Hi'),
+      _content('user', 'How are you?'),
+  ]
+  config = _config()
+
+  sent_contents, sent_config = await manager.prepare_request(
+      client, MODEL, contents, config
+  )
+
+  assert len(fake_caches.caches) == 1
+  cache_config = fake_caches.caches[sent_config.cached_content]
+  assert cache_config.system_instruction == SYSTEM_INSTRUCTION
+  assert cache_config.contents == contents[:2]
+  assert sent_contents == contents[2:]
+  assert sent_config.system_instruction is None
+  assert sent_config.tools is None
+  assert sent_config.temperature == 0.1
+  # The arguments are not modified.
+  assert config.system_instruction == SYSTEM_INSTRUCTION
+  assert len(contents) == 3
+
+
+@pytest.mark.asyncio
+async def test_reuses_cache_for_next_turns(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100)
+  contents = [_content('user', 'Hello')]
+  for turn in range(3):
+    _, sent_config = await manager.prepare_request(
+        client, MODEL, contents, _config()
+    )
+    assert sent_config.cached_content == 'cachedContents/0'
+    contents += [_content('model', 'Hi'), _content('user', f'Turn {turn}')]
+
+  assert len(fake_caches.caches) == 1
+  assert manager.hits == 3
+  assert manager.hit_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_extends_cache_when_history_grows(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100)
+  contents = [_content('user', 'Hello')]
+  await manager.prepare_request(client, MODEL, contents, _config())
+  contents += [_content('model', 'Hi ' * 500), _content('user', 'Thanks')]
+
+  sent_contents, sent_config = await manager.prepare_request(
+      client, MODEL, contents, _config()
+  )
+
+  assert manager.creations == 2
+  assert fake_caches.caches[sent_config.cached_content].contents == (
+      contents[:2]
+  )
+  assert sent_contents == contents[2:]
+
+
+@pytest.mark.asyncio
+async def test_small_prefix_is_not_cached(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100_000)
+
+  sent_contents, sent_config = await manager.prepare_request(
+      client, MODEL, [_content('user', 'Hello')], _config()
+  )
+
+  assert not fake_caches.caches
+  assert sent_config.system_instruction == SYSTEM_INSTRUCTION
+  assert len(sent_contents) == 1
+  assert manager.misses == 1
+  assert manager.hit_rate == 0.0
+
+
+@pytest.mark.parametrize('extra_tokens, cached', [(0, True), (1, False)])
+@pytest.mark.asyncio
+async def test_prefix_size_uses_token_estimator(
+    client, fake_caches, extra_tokens, cached
+):
+  contents = [_content('user', 'Hello'), _content('model', 'Hi')]
+  prefix_tokens = estimate_request_tokens(
+      LlmRequest(contents=contents[:1], config=_config())
+  )
+  manager = GeminiContextCacheManager(min_tokens=prefix_tokens + extra_tokens)
+
+  await manager.prepare_request(client, MODEL, contents, _config())
+
+  assert bool(fake_caches.caches) == cached
+
+
+@pytest.mark.asyncio
+async def test_changed_prefix_creates_new_cache(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100)
+  await manager.prepare_request(
+      client, MODEL, [_content('user', 'Hello')], _config()
+  )
+  config = _config()
+  config.system_instruction = 'You are a pirate. ' * 100
+
+  _, sent_config = await manager.prepare_request(
+      client, MODEL, [_content('user', 'Hello')], config
+  )
+
+  assert manager.creations == 2
+  assert fake_caches.caches[sent_config.cached_content].system_instruction == (
+      config.system_instruction
+  )
+
+
+@pytest.mark.asyncio
+async def test_refreshes_cache_before_it_expires(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100, ttl=60)
+  contents = [_content('user', 'Hello')]
+  await manager.prepare_request(client, MODEL, contents, _config())
+  cached_prefix = next(iter(manager._caches.values()))[0]
+  cached_prefix.expire_time -= 40
+
+  await manager.prepare_request(client, MODEL, contents, _config())
+
+  assert fake_caches.updates == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_creation_falls_back(client, fake_caches):
+  fake_caches.fail = True
+  manager = GeminiContextCacheManager(min_tokens=100)
+
+  for _ in range(2):
+    _, sent_config = await manager.prepare_request(
+        client, MODEL, [_content('user', 'Hello')], _config()
+    )
+    assert sent_config.system_instruction == SYSTEM_INSTRUCTION
+
+  # The prefix is not retried until the ttl passes.
+  assert manager.failures == 1
+  assert manager.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_cache(client, fake_caches):
+  manager = GeminiContextCacheManager(min_tokens=100, max_caches=1)
+  await manager.prepare_request(
+      client, MODEL, [_content('user', 'Hello')], _config()
+  )
+  await manager.prepare_request(
+      client, 'gemini-2.0-flash-001', [_content('user', 'Hello')], _config()
+  )
+
+  assert list(fake_caches.caches) == ['cachedContents/1']
+
+  await manager.clear(client)
+
+  assert not fake_caches.caches
+
+
+@pytest.mark.asyncio
+async def test_gemini_uses_context_cache(client, fake_caches):
+  gemini = Gemini(
+      model=MODEL,
+      context_cache_manager=GeminiContextCacheManager(min_tokens=100),
+  )
+  llm_request = LlmRequest(
+      model=MODEL,
+      contents=[_content('user', 'Hello'), _content('model', 'Hi')],
+      config=_config(),
+  )
+  with mock.patch.object(gemini, 'api_client') as mock_client:
+    mock_client.aio.caches = fake_caches
+    mock_client.aio.models.generate_content = mock.AsyncMock(
+        return_value=types.GenerateContentResponse(
+            candidates=[types.Candidate(content=_content('model', 'Sure'))]
+        )
+    )
+
+    responses = [
+        response
+        async for response in gemini.generate_content_async(llm_request)
+    ]
+
+  assert responses[0].content.parts[0].text == 'Sure'
+  _, kwargs = mock_client.aio.models.generate_content.call_args
+  assert kwargs['config'].cached_content == 'cachedContents/0'
+  # Gemini appends a user content, which is the only one sent.
+  assert kwargs['contents'] == llm_request.contents[2:]
+  assert llm_request.config.system_instruction == SYSTEM_INSTRUCTION
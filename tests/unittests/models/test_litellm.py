@@ -168,6 +168,94 @@ STREAMING_MODEL_RESPONSE = [
     ),
 ]
 
+STREAMING_PARALLEL_FUNCTION_CALL_RESPONSE = [
+    ModelResponse(
+        choices=[
+            StreamingChoices(
+                finish_reason=None,
+                delta=Delta(
+                    role="assistant",
+                    tool_calls=[
+                        ChatCompletionDeltaToolCall(
+                            type="function",
+                            id="call_0",
+                            function=Function(
+                                name="get_weather",
+                                arguments='{"city": ',
+                            ),
+                            index=0,
+                        ),
+                        ChatCompletionDeltaToolCall(
+                            type="function",
+                            id="call_1",
+                            function=Function(
+                                name="get_time",
+                                arguments='{"city": ',
+                            ),
+                            index=1,
+                        ),
+                    ],
+                ),
+            )
+        ]
+    ),
+    ModelResponse(
+        choices=[
+            StreamingChoices(
+                finish_reason=None,
+                delta=Delta(
+                    role="assistant",
+                    tool_calls=[
+                        ChatCompletionDeltaToolCall(
+                            type="function",
+                            id=None,
+                            function=Function(
+                                name=None,
+                                arguments='"Tokyo"}',
+                            ),
+                            index=1,
+                        )
+                    ],
+                ),
+            )
+        ]
+    ),
+    ModelResponse(
+        choices=[
+            StreamingChoices(
+                finish_reason=None,
+                delta=Delta(
+                    role="assistant",
+                    tool_calls=[
+                        ChatCompletionDeltaToolCall(
+                            type="function",
+                            id=None,
+                            function=Function(
+                                name=None,
+                                arguments='"Paris"}',
+                            ),
+                            index=0,
+                        )
+                    ],
+                ),
+            )
+        ]
+    ),
+    ModelResponse(
+        choices=[
+            StreamingChoices(
+                finish_reason="tool_calls",
+            )
+        ]
+    ),
+]
+
+
+async def _async_iter(items):
+  for item in items:
+    yield item
+
+
 @pytest.fixture
 def mock_response():
   return ModelResponse(
@@ -748,7 +836,7 @@ async def test_acompletion_additional_args(mock_acompletion, mock_client):
 
 
 @pytest.mark.asyncio
-async def test_completion_additional_args(mock_completion, mock_client):
+async def test_completion_additional_args(mock_acompletion, mock_client):
   lite_llm_instance = LiteLlm(
       # valid args
       model="test_model",
@@ -767,7 +855,7 @@ async def test_completion_additional_args(mock_completion, mock_client):
       }],
   )
 
-  mock_completion.return_value = iter(STREAMING_MODEL_RESPONSE)
+  mock_acompletion.return_value = _async_iter(STREAMING_MODEL_RESPONSE)
 
   responses = [
       response
@@ -776,9 +864,9 @@ async def test_completion_additional_args(mock_completion, mock_client):
       )
   ]
   assert len(responses) == 4
-  mock_completion.assert_called_once()
+  mock_acompletion.assert_called_once()
 
-  _, kwargs = mock_completion.call_args
+  _, kwargs = mock_acompletion.call_args
 
   assert kwargs["model"] == "test_model"
   assert kwargs["messages"][0]["role"] == "user"
@@ -791,10 +879,10 @@ async def test_completion_additional_args(mock_completion, mock_client):
 
 @pytest.mark.asyncio
 async def test_generate_content_async_stream(
-    mock_completion, lite_llm_instance
+    mock_acompletion, lite_llm_instance
 ):
 
-  mock_completion.return_value = iter(STREAMING_MODEL_RESPONSE)
+  mock_acompletion.return_value = _async_iter(STREAMING_MODEL_RESPONSE)
 
   responses = [
       response
@@ -815,9 +903,9 @@ async def test_generate_content_async_stream(
       "test_arg": "test_value"
   }
   assert responses[3].content.parts[0].function_call.id == "test_tool_call_id"
-  mock_completion.assert_called_once()
+  mock_acompletion.assert_called_once()
 
-  _, kwargs = mock_completion.call_args
+  _, kwargs = mock_acompletion.call_args
   assert kwargs["model"] == "test_model"
   assert kwargs["messages"][0]["role"] == "user"
   assert kwargs["messages"][0]["content"] == "Test prompt"
@@ -832,3 +920,29 @@ async def test_generate_content_async_stream(
       ]
       == "string"
   )
+
+
+@pytest.mark.asyncio
+async def test_generate_content_async_stream_parallel_function_calls(
+    mock_acompletion, lite_llm_instance
+):
+
+  mock_acompletion.return_value = _async_iter(
+      STREAMING_PARALLEL_FUNCTION_CALL_RESPONSE
+  )
+
+  responses = [
+      response
+      async for response in lite_llm_instance.generate_content_async(
+          LLM_REQUEST_WITH_FUNCTION_DECLARATION, stream=True
+      )
+  ]
+  assert len(responses) == 1
+  parts = responses[0].content.parts
+  assert len(parts) == 2
+  assert parts[0].function_call.id == "call_0"
+  assert parts[0].function_call.name == "get_weather"
+  assert parts[0].function_call.args == {"city": "Paris"}
+  assert parts[1].function_call.id == "call_1"
+  assert parts[1].function_call.name == "get_time"
+  assert parts[1].function_call.args == {"city": "Tokyo"}
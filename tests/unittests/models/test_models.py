@@ -12,10 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import http.server
+import json
+import threading
+
 from google.adk import models
 from google.adk.models.anthropic_llm import Claude
 from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
 from google.adk.models.registry import LLMRegistry
+from google.genai import types
 import pytest
 
 
@@ -58,3 +65,88 @@ def test_non_exist_model():
   with pytest.raises(ValueError) as e_info:
     models.LLMRegistry.resolve('non-exist-model')
   assert 'Model non-exist-model not found.' in str(e_info.value)
+
+
+@pytest.mark.asyncio
+async def test_get_llm_shares_instances(monkeypatch):
+  llm = LLMRegistry.get_llm('gemini-1.5-flash')
+
+  assert isinstance(llm, Gemini)
+  assert LLMRegistry.get_llm('gemini-1.5-flash') is llm
+  assert LLMRegistry.get_llm('gemini-1.5-pro') is not llm
+
+  monkeypatch.setenv('GOOGLE_CLOUD_PROJECT', 'another_project')
+  assert LLMRegistry.get_llm('gemini-1.5-flash') is not llm
+
+
+def test_get_llm_outside_event_loop_returns_new_instances():
+  assert LLMRegistry.get_llm('gemini-1.5-flash') is not LLMRegistry.get_llm(
+      'gemini-1.5-flash'
+  )
+
+
+@pytest.mark.asyncio
+async def test_gemini_shares_api_clients(monkeypatch):
+  flash = Gemini(model='gemini-1.5-flash')
+  pro = Gemini(model='gemini-1.5-pro')
+
+  assert flash.api_client is pro.api_client
+
+  monkeypatch.setenv('GOOGLE_CLOUD_PROJECT', 'another_project')
+  assert Gemini(model='gemini-1.5-flash').api_client is not flash.api_client
+
+
+class _GenerateContentHandler(http.server.BaseHTTPRequestHandler):
+  # Keeps the connections alive, so that they are reused across requests.
+  protocol_version = 'HTTP/1.1'
+
+  def do_POST(self):
+    self.rfile.read(int(self.headers['Content-Length']))
+    body = json.dumps({
+        'candidates': [
+            {'content': {'role': 'model', 'parts': [{'text': 'response'}]}}
+        ]
+    }).encode()
+    self.send_response(200)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+
+def test_get_llm_across_event_loops(monkeypatch):
+  server = http.server.ThreadingHTTPServer(
+      ('localhost', 0), _GenerateContentHandler
+  )
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  monkeypatch.setenv(
+      'GOOGLE_GEMINI_BASE_URL', f'http://localhost:{server.server_port}'
+  )
+  monkeypatch.setenv('GOOGLE_GENAI_USE_VERTEXAI', '0')
+  monkeypatch.setenv('GOOGLE_API_KEY', 'test_key')
+  # The httpx transport is bound to the event loop it is first used in.
+  monkeypatch.setattr('google.genai._api_client.has_aiohttp', False)
+
+  async def generate():
+    llm = LLMRegistry.get_llm('gemini-1.5-flash')
+    llm_request = LlmRequest(
+        model='gemini-1.5-flash',
+        contents=[
+            types.Content(role='user', parts=[types.Part(text='request')])
+        ],
+        config=types.GenerateContentConfig(),
+    )
+    responses = [
+        response async for response in llm.generate_content_async(llm_request)
+    ]
+    return responses[0].content.parts[0].text
+
+  try:
+    assert asyncio.run(generate()) == 'response'
+    assert asyncio.run(generate()) == 'response'
+  finally:
+    server.shutdown()
+    server.server_close()
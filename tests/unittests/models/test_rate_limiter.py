@@ -0,0 +1,238 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+from typing import Any
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent
+from google.adk.compaction import SummarizingCompactor
+from google.adk.models import BaseLlm
+from google.adk.models import LlmRequest
+from google.adk.models import LlmResponse
+from google.adk.models import RateLimiter
+from google.adk.models import RoutingLlm
+from google.genai import errors
+from google.genai import types
+import pytest
+
+from .. import utils
+
+
+def _error(code: int) -> errors.APIError:
+  return errors.APIError(code, {'error': {'message': f'Error {code}'}})
+
+
+def _response(text: str) -> LlmResponse:
+  return LlmResponse(content=types.ModelContent(text))
+
+
+class FakeLlm(BaseLlm):
+  """Yields or raises the given outcomes, one per call."""
+
+  model: str = 'fake'
+  outcomes: list[Any] = []
+  """Exceptions to raise, or lists of responses and exceptions to yield."""
+  calls: int = 0
+  in_flight: int = 0
+  max_in_flight: int = 0
+
+  async def generate_content_async(
+      self, llm_request: LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[LlmResponse, None]:
+    outcome = self.outcomes[self.calls]
+    self.calls += 1
+    self.in_flight += 1
+    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    try:
+      await asyncio.sleep(0.01)
+      if isinstance(outcome, Exception):
+        raise outcome
+      for item in outcome:
+        if isinstance(item, Exception):
+          raise item
+        yield item
+    finally:
+      self.in_flight -= 1
+
+
+async def _call(
+    rate_limiter: RateLimiter, llm: BaseLlm, **kwargs
+) -> list[LlmResponse]:
+  return [
+      llm_response
+      async for llm_response in rate_limiter.generate_content_async(
+          llm, LlmRequest(), **kwargs
+      )
+  ]
+
+
+@pytest.mark.asyncio
+async def test_retries_throttled_call():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(outcomes=[_error(429), _error(503), [_response('Hi')]])
+
+  responses = await _call(rate_limiter, llm)
+
+  assert responses == [_response('Hi')]
+  assert llm.calls == 3
+  assert rate_limiter.get_throttles('fake') == 2
+  assert rate_limiter.get_retries() == 2
+  # The rate was halved twice, then increased after the success.
+  assert rate_limiter.get_rate('fake') == pytest.approx(10 / 4 + 0.1)
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(outcomes=[_error(400), [_response('Hi')]])
+
+  with pytest.raises(errors.APIError):
+    await _call(rate_limiter, llm)
+
+  assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_after_responses():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(outcomes=[[_response('Hi'), _error(503)], [_response('Hi')]])
+
+  with pytest.raises(errors.APIError):
+    await _call(rate_limiter, llm, stream=True)
+
+  assert llm.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+  rate_limiter = RateLimiter(max_retries=1, initial_retry_delay=0.01)
+  llm = FakeLlm(outcomes=[_error(429), _error(429), [_response('Hi')]])
+
+  with pytest.raises(errors.APIError):
+    await _call(rate_limiter, llm)
+
+  assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_limits_rate():
+  rate_limiter = RateLimiter(requests_per_second=20, burst=1)
+  llm = FakeLlm(outcomes=[[_response('Hi')]] * 4)
+  start = time.monotonic()
+
+  await asyncio.gather(*(_call(rate_limiter, llm) for _ in range(4)))
+
+  # The first call is sent right away, then one call every 50ms.
+  assert time.monotonic() - start >= 0.15
+  assert rate_limiter.get_queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency():
+  rate_limiter = RateLimiter(max_concurrent_calls=2)
+  llm = FakeLlm(outcomes=[[_response('Hi')]] * 5)
+
+  await asyncio.gather(*(_call(rate_limiter, llm) for _ in range(5)))
+
+  assert llm.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('stream', [False, True])
+async def test_releases_permit_while_paused(stream):
+  rate_limiter = RateLimiter(max_concurrent_calls=1)
+  llm = FakeLlm(
+      outcomes=[[_response('Hi'), _response('there')], [_response('Nested')]]
+  )
+
+  responses = []
+  async for llm_response in rate_limiter.generate_content_async(
+      llm, LlmRequest(), stream=stream
+  ):
+    responses.append(llm_response)
+    if len(responses) == 1:
+      # E.g. a tool of the response calls the model through the same limiter.
+      nested = await asyncio.wait_for(_call(rate_limiter, llm), timeout=1)
+      assert nested == [_response('Nested')]
+
+  assert responses == [_response('Hi'), _response('there')]
+
+
+@pytest.mark.asyncio
+async def test_deadline():
+  rate_limiter = RateLimiter(
+      requests_per_second=1, min_requests_per_second=1, burst=1
+  )
+  llm = FakeLlm(outcomes=[[_response('Hi')]] * 2)
+  await _call(rate_limiter, llm)
+
+  with pytest.raises(TimeoutError):
+    await _call(rate_limiter, llm, deadline=time.monotonic() + 0.05)
+
+  assert llm.calls == 1
+  assert rate_limiter.get_queue_depth('fake') == 0
+
+
+def test_agent_calls_through_rate_limiter():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(
+      outcomes=[_error(429), [_response('response1')]],
+      rate_limiter=rate_limiter,
+  )
+  runner = utils.InMemoryRunner(Agent(name='root_agent', model=llm))
+
+  assert utils.simplify_events(runner.run('test')) == [
+      ('root_agent', 'response1')
+  ]
+  assert rate_limiter.get_throttles('fake') == 1
+
+
+@pytest.mark.asyncio
+async def test_routing_llm_calls_routes_through_rate_limiter():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(
+      outcomes=[_error(429), [_response('Hi')]], rate_limiter=rate_limiter
+  )
+  routing_llm = RoutingLlm(routes=[llm])
+
+  responses = [
+      llm_response
+      async for llm_response in routing_llm.generate_content_async(LlmRequest())
+  ]
+
+  assert responses == [_response('Hi')]
+  assert rate_limiter.get_throttles('fake') == 1
+
+
+@pytest.mark.asyncio
+async def test_summarizing_compactor_calls_through_rate_limiter():
+  rate_limiter = RateLimiter(initial_retry_delay=0.01)
+  llm = FakeLlm(
+      outcomes=[_error(429), [_response('summary')]],
+      rate_limiter=rate_limiter,
+  )
+  compactor = SummarizingCompactor(model=llm, max_tokens=10)
+  contents = [
+      types.UserContent('x' * 400),
+      types.ModelContent('y'),
+      types.UserContent('z'),
+  ]
+
+  compaction = await compactor.compact(None, contents)
+
+  assert compaction.summary.parts[0].text.endswith('summary')
+  assert rate_limiter.get_throttles('fake') == 1
@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import time
+from typing import Any
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm
+from google.adk.models import LlmRequest
+from google.adk.models import LlmResponse
+from google.adk.models import RoutingLlm
+from google.genai import types
+import pytest
+
+
+class FakeLlm(BaseLlm):
+  """Responds after a delay, or raises, according to the call number."""
+
+  delays: list[float] = [0.0]
+  outcomes: list[Any] = []
+  """Exceptions to raise, or lists of texts to respond with."""
+  calls: int = 0
+  cancelled: int = 0
+  cancel_delay: float = 0.0
+  requests: list[LlmRequest] = []
+
+  async def generate_content_async(
+      self, llm_request: LlmRequest, stream: bool = False
+  ) -> AsyncGenerator[LlmResponse, None]:
+    call = self.calls
+    self.calls += 1
+    self.requests.append(llm_request)
+    try:
+      await asyncio.sleep(self.delays[min(call, len(self.delays) - 1)])
+    except asyncio.CancelledError:
+      self.cancelled += 1
+      await asyncio.sleep(self.cancel_delay)
+      raise
+    outcome = self.outcomes[min(call, len(self.outcomes) - 1)]
+    for item in outcome:
+      if isinstance(item, Exception):
+        raise item
+      yield LlmResponse(content=types.ModelContent(f'{self.model}: {item}'))
+
+  @classmethod
+  def create(cls, model: str, *outcomes: Any, delays=(0.0,)) -> 'FakeLlm':
+    return cls(
+        model=model,
+        outcomes=[
+            outcome if isinstance(outcome, list) else [outcome]
+            for outcome in outcomes
+        ],
+        delays=list(delays),
+    )
+
+
+async def _call(llm: BaseLlm, stream: bool = False) -> list[str]:
+  return [
+      llm_response.content.parts[0].text
+      async for llm_response in llm.generate_content_async(
+          LlmRequest(model=llm.model), stream=stream
+      )
+  ]
+
+
+def _prime_latencies(routing_llm: RoutingLlm, model: str, latency: float):
+  stats = routing_llm.get_route_stats()[model]
+  stats.latencies.extend([latency] * routing_llm.min_latency_samples)
+
+
+@pytest.mark.asyncio
+async def test_uses_first_route():
+  primary = FakeLlm.create('primary', 'Hi')
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary])
+
+  assert routing_llm.model == 'primary'
+  assert await _call(routing_llm) == ['primary: Hi']
+  assert secondary.calls == 0
+  assert primary.requests[0].model == 'primary'
+
+
+@pytest.mark.asyncio
+async def test_falls_back_on_error():
+  primary = FakeLlm.create('primary', ValueError('unavailable'))
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary])
+
+  assert await _call(routing_llm) == ['secondary: Hi']
+  # The request is sent with the model of the route.
+  assert secondary.requests[0].model == 'secondary'
+  stats = routing_llm.get_route_stats()
+  assert stats['primary'].failures == 1
+  assert stats['secondary'].fallbacks == 1
+  assert stats['secondary'].wins == 1
+
+
+@pytest.mark.asyncio
+async def test_raises_when_all_routes_fail():
+  routing_llm = RoutingLlm(
+      routes=[
+          FakeLlm.create('primary', ValueError('primary')),
+          FakeLlm.create('secondary', ValueError('secondary')),
+      ]
+  )
+
+  with pytest.raises(ValueError, match='secondary'):
+    await _call(routing_llm)
+
+
+@pytest.mark.asyncio
+async def test_does_not_fall_back_after_first_response():
+  primary = FakeLlm.create('primary', ['Hi', ValueError('disconnected')])
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary])
+
+  with pytest.raises(ValueError):
+    await _call(routing_llm, stream=True)
+
+  assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_streams_all_responses_of_winner():
+  routing_llm = RoutingLlm(
+      routes=[FakeLlm.create('primary', ['Hel', 'lo', 'Hello'])]
+  )
+
+  assert await _call(routing_llm, stream=True) == [
+      'primary: Hel',
+      'primary: lo',
+      'primary: Hello',
+  ]
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_call():
+  primary = FakeLlm.create('primary', 'Hi', delays=[1.0])
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary], hedge_percentile=95)
+  _prime_latencies(routing_llm, 'primary', 0.05)
+  start = time.monotonic()
+
+  assert await _call(routing_llm) == ['secondary: Hi']
+
+  assert time.monotonic() - start < 0.5
+  assert primary.cancelled == 1
+  stats = routing_llm.get_route_stats()
+  assert stats['secondary'].hedges == 1
+  # The primary ran for at least its hedge delay.
+  assert len(stats['primary'].latencies) == routing_llm.min_latency_samples + 1
+  assert stats['primary'].latencies[-1] >= 0.05
+  assert stats['primary'].wins == 0
+
+
+@pytest.mark.asyncio
+async def test_winner_latency_excludes_cancellation_of_losers():
+  primary = FakeLlm.create('primary', 'Hi', delays=[1.0])
+  primary.cancel_delay = 0.3
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary], hedge_percentile=95)
+  _prime_latencies(routing_llm, 'primary', 0.05)
+
+  assert await _call(routing_llm) == ['secondary: Hi']
+
+  stats = routing_llm.get_route_stats()['secondary']
+  assert stats.wins == 1
+  assert stats.latencies[-1] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_empty_response_is_not_a_win():
+  routing_llm = RoutingLlm(routes=[FakeLlm.create('primary', [])])
+
+  assert await _call(routing_llm) == []
+
+  stats = routing_llm.get_route_stats()['primary']
+  assert stats.wins == 0
+  assert not stats.latencies
+
+
+@pytest.mark.asyncio
+async def test_hedges_to_same_route():
+  llm = FakeLlm.create('primary', 'Slow', 'Fast', delays=[1.0, 0.0])
+  routing_llm = RoutingLlm(routes=[llm], hedge_percentile=95)
+  _prime_latencies(routing_llm, 'primary', 0.05)
+
+  assert await _call(routing_llm) == ['primary: Fast']
+  assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_does_not_hedge_without_latency_samples():
+  primary = FakeLlm.create('primary', 'Hi', delays=[0.1])
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary], hedge_percentile=95)
+
+  assert await _call(routing_llm) == ['primary: Hi']
+  assert secondary.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_latency_aware_ordering():
+  primary = FakeLlm.create('primary', 'Hi')
+  secondary = FakeLlm.create('secondary', 'Hi')
+  routing_llm = RoutingLlm(routes=[primary, secondary], latency_aware=True)
+  _prime_latencies(routing_llm, 'primary', 2.0)
+  _prime_latencies(routing_llm, 'secondary', 0.5)
+
+  assert await _call(routing_llm) == ['secondary: Hi']
+
+
+def test_route_stats_percentiles():
+  routing_llm = RoutingLlm(
+      routes=[FakeLlm.create('primary', 'Hi')], latency_window=10
+  )
+  stats = routing_llm.get_route_stats()['primary']
+  for latency in range(1, 21):
+    routing_llm._append(stats.latencies, float(latency))
+
+  # Only the last 10 latencies are kept.
+  assert stats.get_latency_percentile(50) == 15.0
+  assert stats.get_latency_percentile(90) == 19.0
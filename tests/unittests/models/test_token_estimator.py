@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from google.adk.models import LlmResponse
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.token_estimator import estimate_content_tokens
+from google.adk.models.token_estimator import estimate_request_tokens
+from google.adk.models.token_estimator import estimate_text_tokens
+from google.genai import types
+
+
+def test_estimate_text_tokens():
+  assert estimate_text_tokens('') == 0
+  assert estimate_text_tokens('abcd') == 1
+  assert estimate_text_tokens('abcde') == 2
+
+
+def test_estimate_content_tokens():
+  content = types.Content(
+      role='user',
+      parts=[
+          types.Part(text='x' * 40),
+          types.Part.from_function_response(
+              name='tool', response={'result': 'y' * 100}
+          ),
+          types.Part.from_bytes(data=b'image', mime_type='image/png'),
+      ],
+  )
+
+  # 40 chars of text, about 120 chars of json, and an image.
+  assert 400 > estimate_content_tokens(content) > 10 + 30 + 258
+
+
+def test_estimate_request_tokens_counts_instruction_and_tools():
+  contents = [types.Content(role='user', parts=[types.Part(text='Hello')])]
+  llm_request = LlmRequest(contents=contents)
+  base_tokens = estimate_request_tokens(llm_request)
+
+  llm_request.config = types.GenerateContentConfig(
+      system_instruction='x' * 400,
+      tools=[
+          types.Tool(
+              function_declarations=[
+                  types.FunctionDeclaration(
+                      name='get_weather', description='y' * 400
+                  )
+              ]
+          )
+      ],
+  )
+
+  assert estimate_request_tokens(llm_request) > base_tokens + 200
+
+
+def test_llm_response_keeps_usage_metadata():
+  usage_metadata = types.GenerateContentResponseUsageMetadata(
+      prompt_token_count=10, candidates_token_count=5, total_token_count=15
+  )
+  llm_response = LlmResponse.create(
+      types.GenerateContentResponse(
+          candidates=[
+              types.Candidate(
+                  content=types.ModelContent(parts=[types.Part(text='Hi')])
+              )
+          ],
+          usage_metadata=usage_metadata,
+      )
+  )
+
+  assert llm_response.usage_metadata == usage_metadata
@@ -13,15 +13,62 @@
 # limitations under the License.
 
 import enum
+import sqlite3
+
 import pytest
 
 from google.adk.events import Event
 from google.adk.events import EventActions
+from google.adk.events.event_actions import EventCompaction
 from google.adk.sessions import DatabaseSessionService
 from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
 from google.genai import types
 
 
+# The schema of the tables created by the first release of
+# DatabaseSessionService, before the columns that were added since.
+_BASELINE_SQLITE_SCHEMA = """
+CREATE TABLE sessions (
+    app_name VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    id VARCHAR NOT NULL,
+    state TEXT NOT NULL,
+    create_time DATETIME NOT NULL,
+    update_time DATETIME NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE app_states (
+    app_name VARCHAR NOT NULL,
+    state TEXT NOT NULL,
+    update_time DATETIME NOT NULL,
+    PRIMARY KEY (app_name)
+);
+CREATE TABLE user_states (
+    app_name VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    state TEXT NOT NULL,
+    update_time DATETIME NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE events (
+    id VARCHAR NOT NULL,
+    app_name VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL,
+    session_id VARCHAR NOT NULL,
+    invocation_id VARCHAR NOT NULL,
+    author VARCHAR NOT NULL,
+    branch VARCHAR,
+    timestamp DATETIME NOT NULL,
+    content TEXT NOT NULL,
+    actions BLOB NOT NULL,
+    PRIMARY KEY (id, app_name, user_id, session_id),
+    FOREIGN KEY(app_name, user_id, session_id)
+        REFERENCES sessions (app_name, user_id, id) ON DELETE CASCADE
+);
+"""
+
+
 class SessionServiceType(enum.Enum):
   IN_MEMORY = 'IN_MEMORY'
   DATABASE = 'DATABASE'
@@ -225,3 +272,350 @@ def test_create_new_session_will_merge_states(service_type):
   assert session_2.state.get('user:key1') == 'value1'
   assert not session_2.state.get('key1')
   assert not session_2.state.get('temp:key')
+
+
+@pytest.mark.parametrize(
+    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+)
+def test_get_session_returns_isolated_copies(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = session_service.create_session(
+      app_name=app_name, user_id=user_id, state={'key': 'value'}
+  )
+  session_1 = session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  session_2 = session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+      actions=EventActions(state_delta={'key': 'new_value'}),
+  )
+  session_service.append_event(session=session_1, event=event)
+
+  assert len(session_1.events) == 1
+  assert session_1.state['key'] == 'new_value'
+  # Sessions fetched before the append are not affected by it.
+  assert not session_2.events
+  assert session_2.state['key'] == 'value'
+
+  session_3 = session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert len(session_3.events) == 1
+  assert session_3.state['key'] == 'new_value'
+
+
+def test_in_memory_get_session_shares_events():
+  session_service = InMemorySessionService()
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  for i in range(3):
+    session_service.append_event(
+        session=session,
+        event=Event(
+            invocation_id='invocation',
+            author='user',
+            content=types.Content(
+                role='user', parts=[types.Part(text=f'text{i}')]
+            ),
+        ),
+    )
+
+  session_1 = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  session_2 = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  # Event objects are shared between snapshots, the event lists are not.
+  assert session_1.events is not session_2.events
+  assert all(a is b for a, b in zip(session_1.events, session_2.events))
+  session_1.events.pop()
+  assert len(session_2.events) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+)
+async def test_async_session_api(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session_async(
+      app_name=app_name, user_id=user_id, state={'key': 'value'}
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+      actions=EventActions(state_delta={'user:key': 'user_value'}),
+  )
+  await session_service.append_event_async(session=session, event=event)
+
+  got_session = await session_service.get_session_async(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert got_session.state == {'key': 'value', 'user:key': 'user_value'}
+  assert [e.id for e in got_session.events] == [event.id]
+
+  sessions = await session_service.list_sessions_async(
+      app_name=app_name, user_id=user_id
+  )
+  assert [s.id for s in sessions.sessions] == [session.id]
+
+  await session_service.delete_session_async(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert not await session_service.get_session_async(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+
+
+@pytest.mark.asyncio
+async def test_database_async_engine_shares_storage(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  session_service = DatabaseSessionService(db_url)
+  assert session_service.async_db_engine is not None
+  assert session_service.async_db_engine.url.drivername == 'sqlite+aiosqlite'
+
+  session = await session_service.create_session_async(
+      app_name='my_app', user_id='user', state={'key': 'value'}
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+  )
+  await session_service.append_event_async(session=session, event=event)
+
+  # Writes through the async engine are visible to the sync one.
+  got_session = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert got_session.state == {'key': 'value'}
+  assert [e.id for e in got_session.events] == [event.id]
+  await session_service.async_db_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_database_async_engine_kwargs(tmp_path):
+  session_service = DatabaseSessionService(
+      f'sqlite:///{tmp_path / "sessions.db"}',
+      pool_size=4,
+      pool_timeout=5,
+      async_engine_kwargs={'pool_size': 2},
+  )
+
+  assert session_service.db_engine.pool.size() == 4
+  assert session_service.async_db_engine.pool.size() == 2
+  assert session_service.async_db_engine.pool.timeout() == 5
+  await session_service.async_db_engine.dispose()
+
+
+def test_database_upgrades_baseline_schema(tmp_path):
+  db_path = tmp_path / 'sessions.db'
+  with sqlite3.connect(db_path) as connection:
+    connection.executescript(_BASELINE_SQLITE_SCHEMA)
+
+  session_service = DatabaseSessionService(f'sqlite:///{db_path}')
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  event = Event(
+      invocation_id='invocation',
+      author='agent',
+      content=types.Content(role='model', parts=[types.Part(text='response')]),
+      usage_metadata=types.GenerateContentResponseUsageMetadata(
+          total_token_count=100
+      ),
+  )
+  session_service.append_event(session, event)
+  # Compaction events have no content.
+  compaction_event = Event(
+      invocation_id='invocation',
+      author='agent',
+      actions=EventActions(
+          compaction=EventCompaction(
+              end_timestamp=event.timestamp,
+              summary=types.Content(
+                  role='user', parts=[types.Part(text='summary')]
+              ),
+          )
+      ),
+  )
+  session_service.append_event(session, compaction_event)
+
+  session = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session.events[0].content == event.content
+  assert session.events[0].usage_metadata == event.usage_metadata
+  assert session.events[1].content is None
+  assert session.events[1].actions.compaction == (
+      compaction_event.actions.compaction
+  )
+
+
+def test_database_in_memory_has_no_async_engine():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  assert session_service.async_db_engine is None
+
+
+def test_database_append_event_rejects_stale_session():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  stale_session = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+  )
+  session_service.append_event(session=session, event=event)
+  with pytest.raises(ValueError):
+    session_service.append_event(
+        session=stale_session,
+        event=Event(invocation_id='invocation', author='user'),
+    )
+
+  got_session = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [e.id for e in got_session.events] == [event.id]
+
+
+def test_database_rejects_concurrent_writers_in_same_second():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  first_copy, second_copy = [
+      session_service.get_session(
+          app_name='my_app', user_id='user', session_id=session.id
+      )
+      for _ in range(2)
+  ]
+
+  session_service.append_event(
+      session=first_copy,
+      event=Event(
+          invocation_id='invocation',
+          author='user',
+          actions=EventActions(state_delta={'k1': 1}),
+      ),
+  )
+  # The second copy was read in the same second as the first write, which the
+  # update time can't tell apart, but the version can.
+  second_copy.last_update_time = first_copy.last_update_time
+  second_event = Event(
+      invocation_id='invocation',
+      author='user',
+      actions=EventActions(state_delta={'k2': 2}),
+  )
+  with pytest.raises(ValueError):
+    session_service.append_event(session=second_copy, event=second_event)
+
+  second_copy = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert second_copy.state == {'k1': 1}
+  session_service.append_event(session=second_copy, event=second_event)
+  got_session = session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert got_session.state == {'k1': 1, 'k2': 2}
+
+
+def _append_text_events(session_service, session, timestamps):
+  events = []
+  for i, timestamp in enumerate(timestamps):
+    event = Event(
+        invocation_id='invocation',
+        author='user',
+        content=types.Content(role='user', parts=[types.Part(text=f'{i}')]),
+        timestamp=timestamp,
+    )
+    session_service.append_event(session=session, event=event)
+    events.append(event)
+  return events
+
+
+@pytest.mark.parametrize(
+    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+)
+def test_get_session_with_config(service_type):
+  session_service = get_session_service(service_type)
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  events = _append_text_events(
+      session_service, session, [1000.0 + i for i in range(5)]
+  )
+
+  def get_event_ids(config):
+    return [
+        e.id
+        for e in session_service.get_session(
+            app_name='my_app',
+            user_id='user',
+            session_id=session.id,
+            config=config,
+        ).events
+    ]
+
+  # The most recent events are returned in chronological order.
+  assert get_event_ids(GetSessionConfig(num_recent_events=2)) == [
+      e.id for e in events[-2:]
+  ]
+  assert get_event_ids(GetSessionConfig(after_timestamp=1002.0)) == [
+      e.id for e in events[2:]
+  ]
+  assert get_event_ids(
+      GetSessionConfig(num_recent_events=4, after_timestamp=1003.0)
+  ) == [e.id for e in events[3:]]
+
+
+@pytest.mark.parametrize(
+    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+)
+def test_list_events_pagination(service_type):
+  session_service = get_session_service(service_type)
+  session = session_service.create_session(app_name='my_app', user_id='user')
+  # Two events share a timestamp to exercise the tie-breaking.
+  events = _append_text_events(
+      session_service, session, [1000.0, 1001.0, 1001.0, 1002.0, 1003.0]
+  )
+  # Events with the same timestamp are ordered by id.
+  event_ids = [e.id for e in sorted(events, key=lambda e: (e.timestamp, e.id))]
+
+  all_events = session_service.list_events(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert not all_events.next_page_token
+  assert [e.id for e in all_events.events] == event_ids
+
+  listed_ids = []
+  page_token = None
+  num_pages = 0
+  while True:
+    response = session_service.list_events(
+        app_name='my_app',
+        user_id='user',
+        session_id=session.id,
+        page_size=2,
+        page_token=page_token,
+    )
+    listed_ids.extend(e.id for e in response.events)
+    num_pages += 1
+    page_token = response.next_page_token
+    if not page_token:
+      break
+
+  assert num_pages == 3
+  assert listed_ids == event_ids
@@ -0,0 +1,188 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+from typing import Any
+
+from google.adk.agents import Agent
+from google.adk.agents.run_config import EventWriteMode
+from google.adk.agents.run_config import RunConfig
+from google.adk.runners import Runner
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+import pytest
+
+from . import utils
+
+
+def function_call(args: dict[str, Any]) -> types.Part:
+  return types.Part.from_function_call(name='increase_by_one', args=args)
+
+
+def increase_by_one(x: int) -> int:
+  return x + 1
+
+
+class _CountingSessionService(InMemorySessionService):
+
+  def __init__(self):
+    super().__init__()
+    self.batch_sizes = []
+
+  async def append_events_async(self, session, events):
+    self.batch_sizes.append(len(events))
+    return await super().append_events_async(session=session, events=events)
+
+
+async def _run(runner: Runner, run_config: RunConfig) -> list:
+  session = runner.session_service.create_session(
+      app_name='test_app', user_id='test_user'
+  )
+  events = []
+  async for event in runner.run_async(
+      user_id='test_user',
+      session_id=session.id,
+      new_message=utils.UserContent('test'),
+      run_config=run_config,
+  ):
+    events.append(event)
+  return session.id, events
+
+
+@pytest.mark.asyncio
+async def test_write_behind_persists_events_in_batches():
+  mock_model = utils.MockModel.create(
+      responses=[
+          function_call({'x': 1}),
+          function_call({'x': 2}),
+          function_call({'x': 3}),
+          'response1',
+      ]
+  )
+  agent = Agent(name='root_agent', model=mock_model, tools=[increase_by_one])
+  session_service = _CountingSessionService()
+  runner = Runner(
+      app_name='test_app', agent=agent, session_service=session_service
+  )
+
+  session_id, events = await _run(
+      runner,
+      RunConfig(
+          event_write_mode=EventWriteMode.WRITE_BEHIND,
+          max_buffered_events=3,
+          max_event_buffer_delay=60,
+      ),
+  )
+
+  assert len(events) == 7
+  # Two full batches while running, the rest is flushed at the end.
+  assert session_service.batch_sizes == [3, 3, 1]
+  # The buffered events were visible to the model before being persisted.
+  assert len(mock_model.requests[-1].contents) == 7
+  session = session_service.get_session(
+      app_name='test_app', user_id='test_user', session_id=session_id
+  )
+  assert [e.id for e in session.events[1:]] == [e.id for e in events]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_with_database_session_service():
+  mock_model = utils.MockModel.create(
+      responses=[function_call({'x': 1}), 'response1']
+  )
+  agent = Agent(name='root_agent', model=mock_model, tools=[increase_by_one])
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  runner = Runner(
+      app_name='test_app', agent=agent, session_service=session_service
+  )
+
+  session_id, events = await _run(
+      runner, RunConfig(event_write_mode=EventWriteMode.WRITE_BEHIND)
+  )
+
+  session = session_service.get_session(
+      app_name='test_app', user_id='test_user', session_id=session_id
+  )
+  assert [e.id for e in session.events[1:]] == [e.id for e in events]
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_after_max_delay_while_idle():
+  session_service = _CountingSessionService()
+  batch_sizes_during_tool_call = []
+
+  async def slow_tool() -> str:
+    await asyncio.sleep(0.2)
+    batch_sizes_during_tool_call.extend(session_service.batch_sizes)
+    return 'done'
+
+  mock_model = utils.MockModel.create(
+      responses=[
+          types.Part.from_function_call(name='slow_tool', args={}),
+          'response1',
+      ]
+  )
+  agent = Agent(name='root_agent', model=mock_model, tools=[slow_tool])
+  runner = Runner(
+      app_name='test_app', agent=agent, session_service=session_service
+  )
+
+  await _run(
+      runner,
+      RunConfig(
+          event_write_mode=EventWriteMode.WRITE_BEHIND,
+          max_event_buffer_delay=0.05,
+      ),
+  )
+
+  # The function call was persisted while the tool was running.
+  assert batch_sizes_during_tool_call == [1]
+  assert sum(session_service.batch_sizes) == 3
+
+
+class _FailingSessionService(InMemorySessionService):
+
+  async def append_events_async(self, session, events):
+    raise RuntimeError('Storage is down.')
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flush_error_does_not_hide_agent_error(caplog):
+  def failing_tool() -> str:
+    raise ValueError('Tool failed.')
+
+  mock_model = utils.MockModel.create(
+      responses=[types.Part.from_function_call(name='failing_tool', args={})]
+  )
+  agent = Agent(name='root_agent', model=mock_model, tools=[failing_tool])
+  runner = Runner(
+      app_name='test_app',
+      agent=agent,
+      session_service=_FailingSessionService(),
+  )
+
+  with caplog.at_level(logging.ERROR):
+    with pytest.raises(ValueError, match='Tool failed.'):
+      await _run(
+          runner, RunConfig(event_write_mode=EventWriteMode.WRITE_BEHIND)
+      )
+
+  assert 'Failed to persist the buffered events' in caplog.text
+
+
+def test_max_buffered_events_must_be_positive():
+  with pytest.raises(ValueError):
+    RunConfig(max_buffered_events=0)
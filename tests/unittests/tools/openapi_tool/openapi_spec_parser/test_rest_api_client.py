@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import httpx
+import pytest
+
+from google.adk.tools.openapi_tool.openapi_spec_parser.rest_api_client import RestApiClient
+
+
+def _mock_client(mocker, client: RestApiClient, handler):
+  requests = []
+
+  def record(request: httpx.Request) -> httpx.Response:
+    requests.append(request)
+    return handler(request)
+
+  mocker.patch.object(
+      client,
+      "_get_client",
+      return_value=httpx.AsyncClient(transport=httpx.MockTransport(record)),
+  )
+  return requests
+
+
+@pytest.mark.asyncio
+async def test_request_converts_params(mocker):
+  client = RestApiClient()
+  requests = _mock_client(
+      mocker, client, lambda request: httpx.Response(200, json={"ok": True})
+  )
+
+  response = await client.request(
+      method="post",
+      url="https://example.com/items",
+      params={"q": "x"},
+      headers={"Content-Type": "text/plain"},
+      cookies={"session": "abc"},
+      data="raw body",
+  )
+
+  assert response.json() == {"ok": True}
+  assert str(requests[0].url) == "https://example.com/items?q=x"
+  assert requests[0].headers["Cookie"] == "session=abc"
+  assert requests[0].content == b"raw body"
+
+
+@pytest.mark.asyncio
+async def test_request_retries_idempotent_methods(mocker):
+  client = RestApiClient(max_retries=2, backoff_factor=0)
+  responses = iter([httpx.Response(503), httpx.Response(200)])
+  requests = _mock_client(mocker, client, lambda request: next(responses))
+
+  response = await client.request(method="get", url="https://example.com")
+
+  assert response.status_code == 200
+  assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_request_does_not_retry_post_on_status(mocker):
+  client = RestApiClient(max_retries=2, backoff_factor=0)
+  requests = _mock_client(mocker, client, lambda request: httpx.Response(503))
+
+  response = await client.request(method="post", url="https://example.com")
+
+  assert response.status_code == 503
+  assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_request_retries_connect_errors(mocker):
+  client = RestApiClient(max_retries=1, backoff_factor=0)
+
+  def fail(request: httpx.Request) -> httpx.Response:
+    raise httpx.ConnectError("refused", request=request)
+
+  requests = _mock_client(mocker, client, fail)
+
+  with pytest.raises(httpx.ConnectError):
+    await client.request(method="post", url="https://example.com")
+  assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_request_follows_redirects(mocker):
+  client = RestApiClient()
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/old":
+      return httpx.Response(
+          301, headers={"Location": "https://example.com/new"}
+      )
+    return httpx.Response(200, json={"path": request.url.path})
+
+  async_client = httpx.AsyncClient
+  mocker.patch.object(
+      httpx,
+      "AsyncClient",
+      side_effect=lambda **kwargs: async_client(
+          transport=httpx.MockTransport(handler), **kwargs
+      ),
+  )
+
+  response = await client.request(method="get", url="https://example.com/old")
+
+  assert response.json() == {"path": "/new"}
+  await client.aclose()
+
+
+def test_backoff():
+  client = RestApiClient(backoff_factor=0.5, max_backoff=3)
+
+  assert [client._get_backoff(attempt) for attempt in range(4)] == [
+      0.5,
+      1,
+      2,
+      3,
+  ]
+  assert (
+      client._get_backoff(0, httpx.Response(429, headers={"Retry-After": "2"}))
+      == 2
+  )
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused():
+  client = RestApiClient()
+
+  assert client._get_client() is client._get_client()
+  await client.aclose()
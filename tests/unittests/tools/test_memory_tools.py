@@ -0,0 +1,98 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import Session
+from google.adk.tools import preload_memory
+from google.adk.tools.load_memory_tool import load_memory
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .. import utils
+
+
+class CountingMemoryService(InMemoryMemoryService):
+
+  def __init__(self):
+    super().__init__()
+    self.queries: list[str] = []
+    self.add_session_to_memory(
+        Session(
+            app_name='test_app',
+            user_id='test_user',
+            id='past_session',
+            events=[
+                Event(
+                    author='user',
+                    content=types.Content(
+                        role='user', parts=[types.Part(text='I like blue')]
+                    ),
+                )
+            ],
+        )
+    )
+
+  def search_memory(self, *, app_name, user_id, query):
+    self.queries.append(query)
+    return super().search_memory(
+        app_name=app_name, user_id=user_id, query=query
+    )
+
+
+def test_preload_memory_searches_once_per_invocation():
+  def get_weather() -> str:
+    return 'sunny'
+
+  weather_call = types.Part.from_function_call(name='get_weather', args={})
+  mock_model = utils.MockModel.create(
+      responses=[weather_call, weather_call, 'response1', 'response2']
+  )
+  agent = Agent(
+      name='root_agent',
+      model=mock_model,
+      tools=[preload_memory, get_weather],
+  )
+  runner = utils.InMemoryRunner(agent)
+  memory_service = CountingMemoryService()
+  runner.runner.memory_service = memory_service
+
+  runner.run('What color do I like?')
+
+  assert len(mock_model.requests) == 3
+  assert memory_service.queries == ['What color do I like?']
+  assert 'I like blue' in mock_model.requests[2].config.system_instruction
+
+  # A new invocation searches again.
+  runner.run('What color do I like?')
+
+  assert memory_service.queries == ['What color do I like?'] * 2
+
+
+def test_load_memory_searches_once_per_invocation():
+  memory_service = CountingMemoryService()
+  invocation_context = utils.create_invocation_context(
+      Agent(name='root_agent', model=utils.MockModel.create(responses=[]))
+  )
+  invocation_context.memory_service = memory_service
+  tool_context = ToolContext(invocation_context)
+
+  first = load_memory('blue', tool_context)
+  second = load_memory('blue', ToolContext(invocation_context))
+  load_memory('color', tool_context)
+
+  assert first[0].session_id == 'past_session'
+  assert second == first
+  assert memory_service.queries == ['blue', 'color']
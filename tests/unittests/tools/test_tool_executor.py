@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import time
+
+from google.adk.agents import Agent
+from google.adk.tools import ToolContext
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_executor import ToolExecutor
+import pytest
+
+from .. import utils
+
+
+def _square(x: int) -> int:
+  return x * x
+
+
+@pytest.mark.asyncio
+async def test_sync_function_tool_does_not_block_event_loop():
+  def block(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+  tool = FunctionTool(func=block)
+  agent = Agent(name='root_agent', model='gemini-1.5-flash', tools=[tool])
+  invocation_context = utils.create_invocation_context(agent)
+  invocation_context.tool_executor = ToolExecutor()
+  tool_context = ToolContext(invocation_context)
+
+  ticks = 0
+
+  async def tick():
+    nonlocal ticks
+    while True:
+      await asyncio.sleep(0.01)
+      ticks += 1
+
+  ticker = asyncio.create_task(tick())
+  thread_name = await tool.run_async(
+      args={'seconds': 0.2}, tool_context=tool_context
+  )
+  ticker.cancel()
+
+  assert thread_name.startswith('adk_tool')
+  assert ticks > 5
+  assert invocation_context.tool_executor.max_event_loop_lag >= 0
+
+
+@pytest.mark.asyncio
+async def test_sync_function_tool_without_executor_runs_inline():
+  tool = FunctionTool(func=lambda: threading.current_thread().name)
+  agent = Agent(name='root_agent', model='gemini-1.5-flash', tools=[tool])
+  tool_context = ToolContext(utils.create_invocation_context(agent))
+
+  assert (
+      await tool.run_async(args={}, tool_context=tool_context)
+      == threading.current_thread().name
+  )
+
+
+@pytest.mark.asyncio
+async def test_max_queue_size(mocker):
+  executor = ToolExecutor(max_workers=1, max_queue_size=1)
+  get_thread_pool = mocker.spy(executor, '_get_thread_pool')
+  release = threading.Event()
+
+  tasks = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(4)]
+  await asyncio.sleep(0.05)
+  # One call is running and one is queued, the others wait for a slot.
+  assert get_thread_pool.call_count == 2
+
+  release.set()
+  assert await asyncio.gather(*tasks) == [True] * 4
+  assert get_thread_pool.call_count == 4
+  executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_in_process():
+  executor = ToolExecutor(max_process_workers=1)
+  try:
+    assert await executor.run_in_process(_square, 3) == 9
+  finally:
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_in_process_disabled():
+  with pytest.raises(ValueError, match='process pool is disabled'):
+    await ToolExecutor().run_in_process(_square, 3)
+
+
+def test_function_tool_run_in_process_rejects_tool_context():
+  def uses_context(tool_context: ToolContext) -> None:
+    pass
+
+  with pytest.raises(ValueError, match='cannot run in a process'):
+    FunctionTool(func=uses_context, run_in_process=True)
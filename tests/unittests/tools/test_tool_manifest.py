@@ -0,0 +1,140 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.tools import function_tool
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+import pytest
+
+
+def get_weather(city: str) -> str:
+  """Gets the weather of a city."""
+  return 'sunny'
+
+
+def get_time(city: str) -> str:
+  """Gets the time of a city."""
+  return '12:00'
+
+
+class _InstructionTool(BaseTool):
+  """A tool that adds an instruction to each request."""
+
+  def __init__(self):
+    super().__init__(name='instruction_tool', description='')
+    self.calls = 0
+
+  async def process_llm_request(
+      self, *, tool_context: ToolContext, llm_request: LlmRequest
+  ) -> None:
+    self.calls += 1
+    llm_request.append_instructions([f'Call {self.calls}.'])
+
+
+def _create_invocation_context(agent: LlmAgent) -> InvocationContext:
+  session_service = InMemorySessionService()
+  session = session_service.create_session(
+      app_name='test_app', user_id='test_user'
+  )
+  return InvocationContext(
+      invocation_id='test_id',
+      agent=agent,
+      session=session,
+      session_service=session_service,
+  )
+
+
+@pytest.mark.asyncio
+async def test_declarations_are_built_once():
+  agent = LlmAgent(name='test_agent', tools=[get_weather, get_time])
+  invocation_context = _create_invocation_context(agent)
+
+  with mock.patch.object(
+      function_tool,
+      'build_function_declaration',
+      wraps=function_tool.build_function_declaration,
+  ) as build_function_declaration:
+    for _ in range(3):
+      llm_request = LlmRequest()
+      await agent._get_tool_manifest().process_llm_request(
+          invocation_context, llm_request
+      )
+      declarations = llm_request.config.tools[0].function_declarations
+      assert [declaration.name for declaration in declarations] == [
+          'get_weather',
+          'get_time',
+      ]
+      assert list(llm_request.tools_dict) == ['get_weather', 'get_time']
+
+  assert build_function_declaration.call_count == 2
+
+
+def test_manifest_is_rebuilt_when_tools_change():
+  agent = LlmAgent(name='test_agent', tools=[get_weather])
+  manifest = agent._get_tool_manifest()
+
+  assert agent._get_tool_manifest() is manifest
+  assert agent.canonical_tools[0] is agent.canonical_tools[0]
+
+  agent.tools.append(get_time)
+
+  assert agent._get_tool_manifest() is not manifest
+  assert [tool.name for tool in agent.canonical_tools] == [
+      'get_weather',
+      'get_time',
+  ]
+
+
+@pytest.mark.asyncio
+async def test_tools_that_process_requests_run_each_time():
+  instruction_tool = _InstructionTool()
+  agent = LlmAgent(name='test_agent', tools=[instruction_tool, get_weather])
+  invocation_context = _create_invocation_context(agent)
+
+  for _ in range(2):
+    llm_request = LlmRequest(config=types.GenerateContentConfig())
+    await agent._get_tool_manifest().process_llm_request(
+        invocation_context, llm_request
+    )
+
+  assert instruction_tool.calls == 2
+  assert llm_request.config.system_instruction == 'Call 2.'
+  assert 'get_weather' in llm_request.tools_dict
+
+
+@pytest.mark.asyncio
+async def test_requests_get_copies_of_declarations():
+  agent = LlmAgent(name='test_agent', tools=[get_weather])
+  invocation_context = _create_invocation_context(agent)
+  llm_request = LlmRequest()
+  await agent._get_tool_manifest().process_llm_request(
+      invocation_context, llm_request
+  )
+  # E.g. a before_model_callback that rewrites the description.
+  llm_request.config.tools[0].function_declarations[0].description = 'Changed'
+
+  llm_request = LlmRequest()
+  await agent._get_tool_manifest().process_llm_request(
+      invocation_context, llm_request
+  )
+
+  declaration = llm_request.config.tools[0].function_declarations[0]
+  assert declaration.description == 'Gets the weather of a city.'
@@ -0,0 +1,174 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.tools.tool_selector import Bm25ToolSelector
+from google.adk.tools.tool_selector import EmbeddingToolSelector
+from google.genai import types
+import pytest
+
+
+def get_weather(city: str) -> str:
+  """Gets the current weather forecast of a city."""
+  return 'sunny'
+
+
+def send_email(recipient: str, subject: str) -> str:
+  """Sends an email message."""
+  return 'sent'
+
+
+def create_calendarEvent(title: str) -> str:
+  """Creates an event in the calendar."""
+  return 'created'
+
+
+def list_invoices(customer_id: str) -> str:
+  """Lists the invoices of a customer."""
+  return '[]'
+
+
+_TOOLS = [get_weather, send_email, create_calendarEvent, list_invoices]
+
+
+def _create_llm_request(*contents: types.Content) -> LlmRequest:
+  return LlmRequest(
+      contents=list(contents), config=types.GenerateContentConfig()
+  )
+
+
+def _user_content(text: str) -> types.Content:
+  return types.Content(role='user', parts=[types.Part.from_text(text=text)])
+
+
+async def _get_declared_tools(
+    agent: LlmAgent, llm_request: LlmRequest
+) -> list[str]:
+  session_service = InMemorySessionService()
+  invocation_context = InvocationContext(
+      invocation_id='test_id',
+      agent=agent,
+      session=session_service.create_session(
+          app_name='test_app', user_id='test_user'
+      ),
+      session_service=session_service,
+  )
+  await agent._get_tool_manifest().process_llm_request(
+      invocation_context, llm_request, agent.tool_selector
+  )
+  return [
+      declaration.name
+      for declaration in llm_request.config.tools[0].function_declarations
+  ]
+
+
+@pytest.mark.asyncio
+async def test_bm25_selects_relevant_tools():
+  agent = LlmAgent(
+      name='test_agent', tools=_TOOLS, tool_selector=Bm25ToolSelector(top_k=1)
+  )
+  llm_request = _create_llm_request(
+      _user_content('What is the weather in Paris?')
+  )
+
+  assert await _get_declared_tools(agent, llm_request) == ['get_weather']
+  # The other tools can still run.
+  assert set(llm_request.tools_dict) == {
+      'get_weather',
+      'send_email',
+      'create_calendarEvent',
+      'list_invoices',
+  }
+
+
+@pytest.mark.asyncio
+async def test_bm25_matches_camel_case_names():
+  agent = LlmAgent(
+      name='test_agent', tools=_TOOLS, tool_selector=Bm25ToolSelector(top_k=1)
+  )
+  llm_request = _create_llm_request(_user_content('Add a calendar event'))
+
+  assert await _get_declared_tools(agent, llm_request) == [
+      'create_calendarEvent'
+  ]
+
+
+@pytest.mark.asyncio
+async def test_called_tools_are_pinned():
+  agent = LlmAgent(
+      name='test_agent', tools=_TOOLS, tool_selector=Bm25ToolSelector(top_k=1)
+  )
+  llm_request = _create_llm_request(
+      _user_content('What is the weather in Paris?'),
+      types.Content(
+          role='model',
+          parts=[
+              types.Part.from_function_call(
+                  name='get_weather', args={'city': 'Paris'}
+              )
+          ],
+      ),
+      types.Content(
+          role='user',
+          parts=[
+              types.Part.from_function_response(
+                  name='get_weather', response={'result': 'sunny'}
+              )
+          ],
+      ),
+      _user_content('Email the forecast to Bob.'),
+  )
+
+  assert await _get_declared_tools(agent, llm_request) == [
+      'get_weather',
+      'send_email',
+  ]
+
+
+@pytest.mark.asyncio
+async def test_all_tools_are_declared_within_top_k():
+  agent = LlmAgent(
+      name='test_agent', tools=_TOOLS, tool_selector=Bm25ToolSelector(top_k=4)
+  )
+  llm_request = _create_llm_request(_user_content('Hello'))
+
+  assert len(await _get_declared_tools(agent, llm_request)) == 4
+
+
+@pytest.mark.asyncio
+async def test_embedding_selector():
+  keywords = ['weather', 'email', 'calendar', 'invoice']
+
+  def embed(texts: list[str]) -> list[list[float]]:
+    return [
+        [float(keyword in text.lower()) for keyword in keywords]
+        for text in texts
+    ]
+
+  agent = LlmAgent(
+      name='test_agent',
+      tools=_TOOLS,
+      tool_selector=EmbeddingToolSelector(embed, top_k=1),
+  )
+  llm_request = _create_llm_request(_user_content('Show me my invoices'))
+
+  assert await _get_declared_tools(agent, llm_request) == ['list_invoices']
+
+
+def test_top_k_must_be_positive():
+  with pytest.raises(ValueError):
+    Bm25ToolSelector(top_k=0)